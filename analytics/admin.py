@@ -0,0 +1,32 @@
+from django.contrib import admin
+
+from .models import CategoryDay, RollupCursor, SellerDay, SellerFact
+
+
+@admin.register(SellerDay)
+class SellerDayAdmin(admin.ModelAdmin):
+    list_display = ("seller", "day", "bids", "bid_volume", "orders", "gmv")
+    list_select_related = ("seller",)
+    date_hierarchy = "day"
+    raw_id_fields = ("seller",)
+
+
+@admin.register(CategoryDay)
+class CategoryDayAdmin(admin.ModelAdmin):
+    list_display = ("category", "day", "bids", "bid_volume", "orders", "gmv")
+    list_select_related = ("category",)
+    list_filter = ("category",)
+    date_hierarchy = "day"
+
+
+@admin.register(SellerFact)
+class SellerFactAdmin(admin.ModelAdmin):
+    list_display = ("seller", "day", "listings", "auctions_closed", "auctions_sold", "buy_now_sold", "bids")
+    list_select_related = ("seller",)
+    date_hierarchy = "day"
+    raw_id_fields = ("seller",)
+
+
+@admin.register(RollupCursor)
+class RollupCursorAdmin(admin.ModelAdmin):
+    list_display = ("name", "last_id", "updated_at")
@@ -0,0 +1,169 @@
+# analytics/facts.py
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from auctions.models import Bid, Order, Product, Watchlist
+from .models import SellerFact
+
+CHUNK_DAYS = 7
+SUMMED = (
+    "listings", "auctions_closed", "auctions_sold", "final_price_total", "starting_bid_total",
+    "buy_now_sold", "buy_now_revenue", "watches", "bids", "bidders",
+)
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def day_chunks(first, last, size=CHUNK_DAYS):
+    """``(first, last)`` day ranges of at most ``size`` days covering first..last."""
+    while first <= last:
+        end = min(first + timedelta(days=size - 1), last)
+        yield first, end
+        first = end + timedelta(days=1)
+
+
+def _by_seller_day(queryset, field, seller="seller_id", **aggregates):
+    return (
+        queryset.annotate(day=TruncDate(field))
+        .values(seller, "day")
+        .annotate(**aggregates)
+        .order_by()
+    )
+
+
+def collect(first, last):
+    """``{(seller_id, day): {column: value}}`` for every seller active first..last."""
+    start, end = day_start(first), day_start(last + timedelta(days=1))
+    facts = defaultdict(dict)
+
+    for row in _by_seller_day(
+        Product.objects.filter(created_at__gte=start, created_at__lt=end),
+        "created_at", listings=Count("pk"),
+    ):
+        facts[row["seller_id"], row["day"]]["listings"] = row["listings"]
+
+    # an auction bought out with buy-now has an order from its winner;
+    # that sale happened at the order's price, whatever the bids reached
+    buy_out = (
+        Order.objects.filter(product=OuterRef("pk"), buyer=OuterRef("winner"))
+        .exclude(status="CANCELLED")
+        .values("price")[:1]
+    )
+    closed = (
+        Product.objects.filter(listing_type="BID", closed_at__gte=start, closed_at__lt=end)
+        .annotate(
+            day=TruncDate("closed_at"), top_bid=Max("bids__amount"), buy_out=Subquery(buy_out)
+        )
+        .values_list("seller_id", "day", "winner_id", "starting_bid", "top_bid", "buy_out")
+    )
+    for seller_id, day, winner_id, starting_bid, top_bid, buy_out_price in closed:
+        row = facts[seller_id, day]
+        row["auctions_closed"] = row.get("auctions_closed", 0) + 1
+        final = buy_out_price if buy_out_price is not None else top_bid
+        if winner_id is not None and final is not None:
+            row["auctions_sold"] = row.get("auctions_sold", 0) + 1
+            row["final_price_total"] = row.get("final_price_total", Decimal(0)) + final
+            row["starting_bid_total"] = row.get("starting_bid_total", Decimal(0)) + (starting_bid or 0)
+
+    for row in _by_seller_day(
+        Order.objects.filter(product__listing_type="BUY", created_at__gte=start, created_at__lt=end)
+        .exclude(status="CANCELLED"),
+        "created_at", seller="product__seller_id", sold=Count("pk"), revenue=Sum("price"),
+    ):
+        fact = facts[row["product__seller_id"], row["day"]]
+        fact["buy_now_sold"], fact["buy_now_revenue"] = row["sold"], row["revenue"]
+
+    for row in _by_seller_day(
+        Watchlist.objects.filter(created_at__gte=start, created_at__lt=end),
+        "created_at", seller="product__seller_id", watches=Count("pk"),
+    ):
+        facts[row["product__seller_id"], row["day"]]["watches"] = row["watches"]
+
+    for row in _by_seller_day(
+        Bid.objects.filter(product__isnull=False, created_at__gte=start, created_at__lt=end),
+        "created_at", seller="product__seller_id",
+        bids=Count("pk"), bidders=Count("bidder", distinct=True),
+    ):
+        fact = facts[row["product__seller_id"], row["day"]]
+        fact["bids"], fact["bidders"] = row["bids"], row["bidders"]
+    return facts
+
+
+def materialize(first, last):
+    """
+    Rebuild the SellerFact rows for days first..last (inclusive) from the
+    source tables: five grouped queries, then a delete and bulk insert in
+    one transaction, so running it twice gives the same rows.
+    Returns the number of rows written.
+    """
+    rows = [
+        SellerFact(seller_id=seller_id, day=day, **values)
+        for (seller_id, day), values in collect(first, last).items()
+    ]
+    with transaction.atomic():
+        SellerFact.objects.filter(day__gte=first, day__lte=last).delete()
+        SellerFact.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+@dataclass
+class Summary:
+    """A seller's SellerFact rows summed over a period, with the ratios the page shows."""
+
+    listings: int = 0
+    auctions_closed: int = 0
+    auctions_sold: int = 0
+    final_price_total: Decimal = Decimal(0)
+    starting_bid_total: Decimal = Decimal(0)
+    buy_now_sold: int = 0
+    buy_now_revenue: Decimal = Decimal(0)
+    watches: int = 0
+    bids: int = 0
+    bidders: int = 0
+
+    @staticmethod
+    def _ratio(part, whole):
+        return part / whole if whole else None
+
+    @property
+    def conversion(self):
+        """Closed auctions that found a winner."""
+        return self._ratio(self.auctions_sold, self.auctions_closed)
+
+    @property
+    def sell_through(self):
+        """Items sold (auctions won plus buy-now sales) per listing started."""
+        return self._ratio(self.auctions_sold + self.buy_now_sold, self.listings)
+
+    @property
+    def average_final_price(self):
+        return self._ratio(self.final_price_total, self.auctions_sold)
+
+    @property
+    def average_starting_bid(self):
+        return self._ratio(self.starting_bid_total, self.auctions_sold)
+
+    @property
+    def final_to_start(self):
+        """How far sold auctions went above their starting bid (2.0 = doubled)."""
+        return self._ratio(self.final_price_total, self.starting_bid_total)
+
+    @property
+    def watch_to_bid(self):
+        """Bids received per watchlist add."""
+        return self._ratio(self.bids, self.watches)
+
+
+def summarize(queryset):
+    totals = queryset.aggregate(**{name: Sum(name) for name in SUMMED})
+    return Summary(**{name: value for name, value in totals.items() if value is not None})
@@ -0,0 +1,22 @@
+# analytics/facts_process.py
+#
+# Kept free of model imports: spawned children unpickle this module's
+# functions before Django is set up.
+
+
+def init_worker():
+    import django
+
+    django.setup()
+
+
+def materialize_chunk(first, last):
+    """Entry point for ``backfill_seller_facts --processes`` children."""
+    from django.db import connection
+
+    from .facts import materialize
+
+    try:
+        return materialize(first, last)
+    finally:
+        connection.close()
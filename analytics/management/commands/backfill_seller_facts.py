@@ -0,0 +1,55 @@
+import multiprocessing
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from analytics import facts, facts_process
+from auctions.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-seller daily facts for a range of days, in chunks spread over processes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='First day (YYYY-MM-DD; default: the first listing).')
+        parser.add_argument('--until', help='Last day (YYYY-MM-DD; default: today).')
+        parser.add_argument('--chunk-days', type=int, default=facts.CHUNK_DAYS)
+        parser.add_argument('--processes', type=int, default=1)
+
+    def _day(self, value, default):
+        if not value:
+            return default
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f'Bad date {value!r}; use YYYY-MM-DD.')
+        return day
+
+    def handle(self, *args, **opts):
+        today = timezone.localdate()
+        first_listing = Product.objects.aggregate(first=Min('created_at'))['first']
+        since = self._day(opts['since'], timezone.localdate(first_listing) if first_listing else today)
+        until = self._day(opts['until'], today)
+        if since > until:
+            raise CommandError('--since is after --until.')
+        chunks = list(facts.day_chunks(since, until, opts['chunk_days']))
+
+        started = time.perf_counter()
+        if opts['processes'] > 1:
+            # children open their own connections
+            connections.close_all()
+            ctx = multiprocessing.get_context('spawn')
+            with ctx.Pool(opts['processes'], initializer=facts_process.init_worker) as pool:
+                counts = pool.starmap(facts_process.materialize_chunk, chunks)
+        else:
+            counts = [facts.materialize(first, last) for first, last in chunks]
+
+        days = (until - since + timedelta(days=1)).days
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {sum(counts)} seller facts for {days} days '
+            f'({len(chunks)} chunks) in {time.perf_counter() - started:.1f}s.'
+        ))
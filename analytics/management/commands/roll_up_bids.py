@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from analytics import rollups
+
+
+class Command(BaseCommand):
+    help = 'Fold new bids and auction orders into the analytics rollups (what the roll_up job does).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=rollups.BATCH_SIZE)
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Drop the rollups first and fold all history again.')
+
+    def handle(self, *args, **opts):
+        if opts['rebuild']:
+            rollups.rebuild()
+        bids = rollups.roll_up_bids(opts['batch_size'])
+        orders = rollups.roll_up_orders(opts['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Folded {bids} bids and {orders} orders.'))
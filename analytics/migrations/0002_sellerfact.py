@@ -0,0 +1,37 @@
+# Generated by Django 5.0.7 on 2026-10-19 07:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SellerFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('listings', models.PositiveIntegerField(default=0)),
+                ('auctions_closed', models.PositiveIntegerField(default=0)),
+                ('auctions_sold', models.PositiveIntegerField(default=0)),
+                ('final_price_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('starting_bid_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('buy_now_sold', models.PositiveIntegerField(default=0)),
+                ('buy_now_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('watches', models.PositiveIntegerField(default=0)),
+                ('bids', models.PositiveIntegerField(default=0)),
+                ('bidders', models.PositiveIntegerField(default=0)),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('seller', 'day')},
+            },
+        ),
+    ]
@@ -0,0 +1,97 @@
+# analytics/models.py
+
+from django.contrib.auth.models import User
+from django.db import models
+
+from auctions.models import Category, Product
+
+
+class RollupCursor(models.Model):
+    """Highest source pk (bids, orders) already folded into the rollups."""
+
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_id}"
+
+
+class BidMinute(models.Model):
+    """Open/high/low/close and count of one auction's bids in one minute."""
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="bid_minutes")
+    minute = models.DateTimeField()
+    open = models.DecimalField(max_digits=10, decimal_places=2)
+    high = models.DecimalField(max_digits=10, decimal_places=2)
+    low = models.DecimalField(max_digits=10, decimal_places=2)
+    close = models.DecimalField(max_digits=10, decimal_places=2)
+    bids = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # also the index the chart endpoint reads a product's range through
+        unique_together = ("product", "minute")
+
+    def __str__(self):
+        return f"{self.product_id} {self.minute:%Y-%m-%d %H:%M}"
+
+
+class DailyTotals(models.Model):
+    """Bid volume and GMV (non-cancelled auction orders) for one day."""
+
+    day = models.DateField()
+    bids = models.PositiveIntegerField(default=0)
+    bid_volume = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    orders = models.PositiveIntegerField(default=0)
+    gmv = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        abstract = True
+
+
+class SellerDay(DailyTotals):
+    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+
+    class Meta:
+        unique_together = ("seller", "day")
+
+    def __str__(self):
+        return f"{self.seller_id} {self.day}"
+
+
+class CategoryDay(DailyTotals):
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="+")
+
+    class Meta:
+        unique_together = ("category", "day")
+
+    def __str__(self):
+        return f"{self.category_id} {self.day}"
+
+
+class SellerFact(models.Model):
+    """
+    One seller's activity on one (local) day, rebuilt whole by
+    analytics.facts.materialize. Ratios are left to the reader: sum the
+    rows for a period, then divide.
+    """
+
+    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    day = models.DateField()
+    listings = models.PositiveIntegerField(default=0)
+    auctions_closed = models.PositiveIntegerField(default=0)
+    auctions_sold = models.PositiveIntegerField(default=0)
+    # winning bids and the starting bids of those same sold auctions
+    final_price_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    starting_bid_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    buy_now_sold = models.PositiveIntegerField(default=0)
+    buy_now_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    watches = models.PositiveIntegerField(default=0)
+    bids = models.PositiveIntegerField(default=0)
+    bidders = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("seller", "day")
+
+    def __str__(self):
+        return f"{self.seller_id} {self.day}"
@@ -0,0 +1,217 @@
+# analytics/rollups.py
+
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from auctions.models import Bid, Order
+from .models import BidMinute, CategoryDay, RollupCursor, SellerDay
+
+BATCH_SIZE = 5000
+# rows younger than this are left for the next run: a transaction that took
+# a lower pk may still be about to commit, and the cursor only moves forward
+SETTLE = timedelta(seconds=30)
+DAILY_FIELDS = ("bids", "bid_volume", "orders", "gmv")
+
+
+def minute_of(moment):
+    return moment.replace(second=0, microsecond=0)
+
+
+def fold_bids(rows, buckets=None):
+    """
+    Fold ``(product_id, amount, created_at)`` rows, oldest first, into
+    ``{(product_id, minute): [open, high, low, close, count]}``.
+    """
+    buckets = {} if buckets is None else buckets
+    for product_id, amount, created_at in rows:
+        key = (product_id, minute_of(created_at))
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = [amount, amount, amount, amount, 1]
+        else:
+            bucket[1] = max(bucket[1], amount)
+            bucket[2] = min(bucket[2], amount)
+            bucket[3] = amount
+            bucket[4] += 1
+    return buckets
+
+
+def _merge_minutes(buckets):
+    product_ids = {product_id for product_id, _ in buckets}
+    minutes = [minute for _, minute in buckets]
+    existing = {
+        (row.product_id, row.minute): row
+        for row in BidMinute.objects.filter(
+            product_id__in=product_ids, minute__gte=min(minutes), minute__lte=max(minutes)
+        )
+    }
+    changed, new = [], []
+    for (product_id, minute), (open_, high, low, close, count) in buckets.items():
+        row = existing.get((product_id, minute))
+        if row is None:
+            new.append(BidMinute(
+                product_id=product_id, minute=minute,
+                open=open_, high=high, low=low, close=close, bids=count,
+            ))
+            continue
+        row.high = max(row.high, high)
+        row.low = min(row.low, low)
+        row.close = close
+        row.bids += count
+        changed.append(row)
+    BidMinute.objects.bulk_update(changed, ["high", "low", "close", "bids"])
+    BidMinute.objects.bulk_create(new)
+
+
+def _add_daily(model, owner, totals):
+    """Add ``{(owner_id, day): {field: increment}}`` onto ``model`` rows."""
+    if not totals:
+        return
+    owner_id = f"{owner}_id"
+    existing = {
+        (getattr(row, owner_id), row.day): row
+        for row in model.objects.filter(**{
+            f"{owner_id}__in": {key[0] for key in totals},
+            "day__in": {key[1] for key in totals},
+        })
+    }
+    changed, new = [], []
+    for (owner_pk, day), increments in totals.items():
+        row = existing.get((owner_pk, day))
+        if row is None:
+            new.append(model(**{owner_id: owner_pk, "day": day}, **increments))
+            continue
+        for name, value in increments.items():
+            setattr(row, name, getattr(row, name) + value)
+        changed.append(row)
+    model.objects.bulk_update(changed, DAILY_FIELDS)
+    model.objects.bulk_create(new)
+
+
+def _daily_totals():
+    return defaultdict(lambda: {"bids": 0, "bid_volume": Decimal(0), "orders": 0, "gmv": Decimal(0)})
+
+
+def _roll_up(name, queryset, apply, batch_size, now):
+    """
+    Feed ``queryset`` rows past the ``name`` cursor to ``apply`` in pk
+    order, one transaction per batch; the cursor row is locked for the
+    batch, so two workers never fold the same rows.
+    """
+    settled = (now or timezone.now()) - SETTLE
+    total = 0
+    while True:
+        with transaction.atomic():
+            cursor, _ = RollupCursor.objects.select_for_update().get_or_create(name=name)
+            rows = list(
+                queryset.filter(pk__gt=cursor.last_id, created_at__lte=settled)
+                .order_by("pk")[:batch_size]
+            )
+            if rows:
+                apply(rows)
+                cursor.last_id = rows[-1][0]
+                cursor.save(update_fields=["last_id", "updated_at"])
+        total += len(rows)
+        if len(rows) < batch_size:
+            return total
+
+
+def _apply_bids(rows):
+    _merge_minutes(fold_bids((product_id, amount, at) for _, product_id, _, _, amount, at in rows))
+    sellers, categories = _daily_totals(), _daily_totals()
+    for _, _, seller_id, category_id, amount, created_at in rows:
+        day = timezone.localdate(created_at)
+        for totals, key in ((sellers, seller_id), (categories, category_id)):
+            if key is not None:
+                totals[key, day]["bids"] += 1
+                totals[key, day]["bid_volume"] += amount
+    _add_daily(SellerDay, "seller", sellers)
+    _add_daily(CategoryDay, "category", categories)
+
+
+def _apply_orders(rows):
+    sellers, categories = _daily_totals(), _daily_totals()
+    for _, seller_id, category_id, price, created_at in rows:
+        day = timezone.localdate(created_at)
+        for totals, key in ((sellers, seller_id), (categories, category_id)):
+            if key is not None:
+                totals[key, day]["orders"] += 1
+                totals[key, day]["gmv"] += price
+    _add_daily(SellerDay, "seller", sellers)
+    _add_daily(CategoryDay, "category", categories)
+
+
+def roll_up_bids(batch_size=BATCH_SIZE, now=None):
+    """
+    Fold new bids into per-auction minute buckets and seller/category
+    daily bid volume. Returns the number of bids folded.
+    """
+    bids = Bid.objects.filter(product__isnull=False).values_list(
+        "pk", "product_id", "product__seller_id", "product__category_id", "amount", "created_at"
+    )
+    return _roll_up("bids", bids, _apply_bids, batch_size, now)
+
+
+def roll_up_orders(batch_size=BATCH_SIZE, now=None):
+    """
+    Fold new auction orders into seller/category daily GMV. An order
+    cancelled after it was folded stays counted.
+    Returns the number of orders folded.
+    """
+    orders = Order.objects.exclude(status="CANCELLED").values_list(
+        "pk", "product__seller_id", "product__category_id", "price", "created_at"
+    )
+    return _roll_up("orders", orders, _apply_orders, batch_size, now)
+
+
+def rebuild():
+    """Drop every rollup row and cursor; the next runs fold all history again."""
+    with transaction.atomic():
+        for model in (BidMinute, SellerDay, CategoryDay, RollupCursor):
+            model.objects.all().delete()
+
+
+RESOLUTIONS = {
+    "minute": minute_of,
+    "hour": lambda moment: moment.replace(minute=0, second=0, microsecond=0),
+    "day": lambda moment: timezone.localtime(moment).replace(hour=0, minute=0, second=0, microsecond=0),
+}
+
+
+def price_history(product_id, resolution="minute"):
+    """
+    ``[(start, open, high, low, close, count)]`` for one auction, oldest
+    first: the stored minute buckets plus the bids the job hasn't folded
+    yet, so a live auction's chart is never a run behind.
+    """
+    last_id = RollupCursor.objects.filter(name="bids").values_list("last_id", flat=True).first() or 0
+    buckets = {
+        (product_id, row[0]): list(row[1:])
+        for row in BidMinute.objects.filter(product_id=product_id)
+        .order_by("minute")
+        .values_list("minute", "open", "high", "low", "close", "bids")
+    }
+    tail = (
+        Bid.objects.filter(product_id=product_id, pk__gt=last_id)
+        .order_by("pk")
+        .values_list("product_id", "amount", "created_at")
+    )
+    fold_bids(tail, buckets)
+
+    truncate = RESOLUTIONS[resolution]
+    series = {}
+    for (_, minute), (open_, high, low, close, count) in sorted(buckets.items()):
+        start = truncate(minute)
+        point = series.get(start)
+        if point is None:
+            series[start] = [open_, high, low, close, count]
+        else:
+            point[1] = max(point[1], high)
+            point[2] = min(point[2], low)
+            point[3] = close
+            point[4] += count
+    return [(start, *point) for start, point in series.items()]
@@ -0,0 +1,18 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from jobs.queue import task
+from . import facts, rollups
+
+
+@task(every=timedelta(minutes=1))
+def roll_up(batch_size=rollups.BATCH_SIZE):
+    return rollups.roll_up_bids(batch_size) + rollups.roll_up_orders(batch_size)
+
+
+@task(every=timedelta(minutes=15))
+def refresh_seller_facts():
+    """Rebuild today's seller facts, and yesterday's for anything that landed late."""
+    today = timezone.localdate()
+    return facts.materialize(today - timedelta(days=1), today)
@@ -0,0 +1,236 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from auctions.models import Bid, Category, Order, Product, Watchlist
+from .facts import day_chunks, materialize
+from .models import BidMinute, CategoryDay, SellerDay, SellerFact
+from .rollups import roll_up_bids, roll_up_orders
+
+
+class RollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user("seller")
+        cls.bidder = User.objects.create_user("bidder")
+        cls.category = Category.objects.create(name="Clocks", slug="clocks")
+        cls.auction = Product.objects.create(
+            seller=cls.seller, category=cls.category, title="Clock", price=100,
+            listing_type="BID", starting_bid=5, auction_end=timezone.now() + timedelta(days=1),
+        )
+        # an hour ago, on a minute boundary, so every bid lands on the same day
+        cls.start = (timezone.now() - timedelta(hours=1)).replace(second=0, microsecond=0)
+
+    def bid(self, amount, seconds):
+        bid = Bid.objects.create(product=self.auction, bidder=self.bidder, amount=amount)
+        Bid.objects.filter(pk=bid.pk).update(created_at=self.start + timedelta(seconds=seconds))
+        return bid
+
+    def test_bids_fold_into_minute_ohlc_incrementally(self):
+        self.bid(10, 1)
+        self.bid(15, 20)
+        self.bid(12, 70)
+        self.assertEqual(roll_up_bids(batch_size=2), 3)
+
+        self.bid(9, 40)  # same first minute, folded by a later run
+        self.assertEqual(roll_up_bids(), 1)
+        self.assertEqual(roll_up_bids(), 0)
+
+        first, second = BidMinute.objects.order_by("minute")
+        self.assertEqual(first.minute, self.start)
+        self.assertEqual(
+            (first.open, first.high, first.low, first.close, first.bids),
+            (Decimal("10"), Decimal("15"), Decimal("9"), Decimal("9"), 3),
+        )
+        self.assertEqual((second.open, second.bids), (Decimal("12"), 1))
+
+        day = SellerDay.objects.get(seller=self.seller)
+        self.assertEqual((day.bids, day.bid_volume), (4, Decimal("46")))
+        self.assertEqual(CategoryDay.objects.get(category=self.category).bids, 4)
+
+    def test_orders_add_gmv_except_cancelled(self):
+        Order.objects.create(buyer=self.bidder, product=self.auction, price=40)
+        Order.objects.create(buyer=self.bidder, product=self.auction, price=60, status="COMPLETED")
+        Order.objects.create(buyer=self.bidder, product=self.auction, price=99, status="CANCELLED")
+        self.assertEqual(roll_up_orders(now=timezone.now() + timedelta(minutes=1)), 2)
+
+        day = SellerDay.objects.get(seller=self.seller)
+        self.assertEqual((day.orders, day.gmv, day.bids), (2, Decimal("100"), 0))
+        self.assertEqual(CategoryDay.objects.get(category=self.category).gmv, Decimal("100"))
+
+    def test_fresh_bids_wait_for_the_next_run(self):
+        Bid.objects.create(product=self.auction, bidder=self.bidder, amount=20)
+        self.assertEqual(roll_up_bids(), 0)
+        self.assertEqual(roll_up_bids(now=timezone.now() + timedelta(minutes=1)), 1)
+
+    def test_command_rebuilds(self):
+        self.bid(10, 1)
+        roll_up_bids()
+        out = StringIO()
+        call_command("roll_up_bids", "--rebuild", stdout=out)
+        self.assertIn("Folded 1 bids and 0 orders.", out.getvalue())
+        self.assertEqual(BidMinute.objects.get().bids, 1)
+
+
+class AnalyticsEndpointTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user("seller")
+        cls.staff = User.objects.create_user("staff", is_staff=True)
+        cls.category = Category.objects.create(name="Clocks", slug="clocks")
+        cls.auction = Product.objects.create(
+            seller=cls.seller, category=cls.category, title="Clock", price=100,
+            listing_type="BID", starting_bid=5, auction_end=timezone.now() + timedelta(days=1),
+        )
+        start = (timezone.now() - timedelta(hours=3)).replace(minute=0, second=0, microsecond=0)
+        for n, amount in enumerate([10, 14, 12]):
+            bid = Bid.objects.create(product=cls.auction, bidder=cls.staff, amount=amount)
+            Bid.objects.filter(pk=bid.pk).update(created_at=start + timedelta(minutes=n * 5))
+
+    def test_history_merges_rollups_with_unfolded_bids(self):
+        roll_up_bids()
+        Bid.objects.create(product=self.auction, bidder=self.staff, amount=30)
+        url = reverse("analytics:auction_history", args=[self.auction.pk])
+
+        data = self.client.get(url).json()
+        self.assertEqual(len(data["t"]), 4)
+        self.assertEqual(data["close"], ["10.00", "14.00", "12.00", "30.00"])
+
+        data = self.client.get(url, {"resolution": "hour"}).json()
+        self.assertEqual(data["open"][0], "10.00")
+        self.assertEqual(data["high"][0], "14.00")
+        self.assertEqual(data["close"][0], "12.00")
+        self.assertEqual(data["bids"], [3, 1])
+
+        self.assertEqual(self.client.get(url, {"resolution": "week"}).status_code, 400)
+        buy_now = Product.objects.create(seller=self.seller, title="Mug", price=5)
+        response = self.client.get(reverse("analytics:auction_history", args=[buy_now.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_seller_daily_is_zero_filled(self):
+        roll_up_bids()
+        url = reverse("analytics:seller_daily")
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+        self.client.force_login(self.seller)
+        data = self.client.get(url, {"days": 7}).json()
+        self.assertEqual(len(data["days"]), 7)
+        self.assertEqual(sum(data["bids"]), 3)
+        self.assertEqual(data["gmv"], ["0.00"] * 7)
+        self.assertEqual(self.client.get(url, {"days": "x"}).status_code, 400)
+
+    def test_category_daily_is_staff_only(self):
+        roll_up_bids()
+        url = reverse("analytics:category_daily", args=["clocks"])
+        self.client.force_login(self.seller)
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.force_login(self.staff)
+        data = self.client.get(url).json()
+        self.assertEqual(data["category"], "clocks")
+        self.assertEqual(sum(data["bids"]), 3)
+
+
+class SellerFactTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user("seller")
+        cls.other = User.objects.create_user("other")
+        buyers = [User.objects.create_user(f"buyer{n}") for n in range(3)]
+        now = timezone.now()
+        ended = now - timedelta(minutes=5)
+
+        sold = Product.objects.create(
+            seller=cls.seller, title="Sold", price=100, listing_type="BID",
+            starting_bid=10, auction_end=ended,
+        )
+        unsold = Product.objects.create(
+            seller=cls.seller, title="Unsold", price=100, listing_type="BID",
+            starting_bid=50, auction_end=ended,
+        )
+        mug = Product.objects.create(seller=cls.seller, title="Mug", price=15)
+        Product.objects.create(seller=cls.other, title="Elsewhere", price=5)
+
+        for buyer, amount in zip(buyers, [12, 20, 30]):
+            Bid.objects.create(product=sold, bidder=buyer, amount=amount)
+        for buyer in buyers:
+            Watchlist.objects.create(user=buyer, product=sold)
+        Watchlist.objects.create(user=buyers[0], product=unsold)
+        Order.objects.create(buyer=buyers[1], product=mug, price=15)
+        Order.objects.create(buyer=buyers[2], product=mug, price=15, status="CANCELLED")
+
+        Product.objects.filter(pk=sold.pk).update(is_active=False, winner=buyers[2], closed_at=now)
+        Product.objects.filter(pk=unsold.pk).update(is_active=False, closed_at=now)
+
+    def test_materialize_is_idempotent(self):
+        today = timezone.localdate()
+        self.assertEqual(materialize(today, today), 2)
+        self.assertEqual(materialize(today, today), 2)
+
+        fact = SellerFact.objects.get(seller=self.seller)
+        self.assertEqual(fact.day, today)
+        self.assertEqual((fact.listings, fact.auctions_closed, fact.auctions_sold), (3, 2, 1))
+        self.assertEqual((fact.final_price_total, fact.starting_bid_total), (Decimal("30"), Decimal("10")))
+        self.assertEqual((fact.buy_now_sold, fact.buy_now_revenue), (1, Decimal("15")))
+        self.assertEqual((fact.watches, fact.bids, fact.bidders), (4, 3, 3))
+
+    def test_bought_out_auction_sells_at_the_order_price(self):
+        buyer = User.objects.get(username="buyer0")
+        now = timezone.now()
+        for title, bids in (("Quiet", []), ("Busy", [40])):
+            auction = Product.objects.create(
+                seller=self.other, title=title, price=80, listing_type="BID",
+                starting_bid=20, auction_end=now + timedelta(days=1),
+            )
+            for amount in bids:
+                Bid.objects.create(product=auction, bidder=buyer, amount=amount)
+            Product.objects.filter(pk=auction.pk).update(is_active=False, winner=buyer, closed_at=now)
+            Order.objects.create(buyer=buyer, product=auction, price=80, status="COMPLETED")
+
+        today = timezone.localdate()
+        materialize(today, today)
+        fact = SellerFact.objects.get(seller=self.other)
+        self.assertEqual((fact.auctions_closed, fact.auctions_sold), (2, 2))
+        self.assertEqual(fact.final_price_total, Decimal("160"))
+        self.assertEqual((fact.buy_now_sold, fact.buy_now_revenue), (0, Decimal(0)))
+
+    def test_dashboard_reads_only_fact_rows(self):
+        today = timezone.localdate()
+        materialize(today, today)
+        self.client.force_login(self.seller)
+        url = reverse("analytics:seller_dashboard")
+        # session, user, the totals and the daily rows: no source tables
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {"days": 7})
+        summary = response.context["summary"]
+        self.assertEqual(summary.conversion, 0.5)
+        self.assertEqual(summary.sell_through, 2 / 3)
+        self.assertEqual(summary.final_to_start, Decimal(3))
+        self.assertEqual(summary.watch_to_bid, 0.75)
+        self.assertContains(response, "50%")
+
+        self.client.force_login(self.other)
+        response = self.client.get(url)
+        self.assertEqual(response.context["summary"].listings, 1)
+        self.assertIsNone(response.context["summary"].conversion)
+
+    def test_backfill_command_covers_history_in_chunks(self):
+        today = timezone.localdate()
+        first = today - timedelta(days=9)
+        self.assertEqual(
+            list(day_chunks(first, today, 4)),
+            [(first, first + timedelta(days=3)), (first + timedelta(days=4), first + timedelta(days=7)),
+             (first + timedelta(days=8), today)],
+        )
+        out = StringIO()
+        call_command(
+            "backfill_seller_facts", "--since", first.isoformat(), "--chunk-days", "4", stdout=out
+        )
+        self.assertIn("Wrote 2 seller facts for 10 days (3 chunks)", out.getvalue())
+        self.assertEqual(SellerFact.objects.count(), 2)
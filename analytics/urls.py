@@ -0,0 +1,12 @@
+from django.urls import path
+
+from . import views
+
+app_name = "analytics"
+
+urlpatterns = [
+    path("auctions/<int:pk>/history.json", views.auction_history, name="auction_history"),
+    path("sellers/me/", views.seller_dashboard, name="seller_dashboard"),
+    path("sellers/me/daily.json", views.seller_daily, name="seller_daily"),
+    path("categories/<slug:slug>/daily.json", views.category_daily, name="category_daily"),
+]
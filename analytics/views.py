@@ -0,0 +1,132 @@
+# analytics/views.py
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.utils import timezone
+
+from auctions.models import Category, Product
+from core.querybudget import query_budget
+from core.routing import replica_reads
+from .facts import summarize
+from .models import CategoryDay, SellerDay, SellerFact
+from .rollups import DAILY_FIELDS, RESOLUTIONS, price_history
+
+CENTS = Decimal("0.01")
+DEFAULT_DAYS = 30
+MAX_DAYS = 366
+DASHBOARD_PERIODS = (7, 30, 90, 365)
+
+
+def _error(message, status=400):
+    return JsonResponse({"error": message}, status=status)
+
+
+def _days(request):
+    return min(max(int(request.GET.get("days", DEFAULT_DAYS)), 1), MAX_DAYS)
+
+
+def _daily_series(queryset, days):
+    """Column arrays for the last ``days`` days, today included; empty days are zeros."""
+    today = timezone.localdate()
+    first = today - timedelta(days=days - 1)
+    rows = {
+        row[0]: row[1:]
+        for row in queryset.filter(day__gte=first, day__lte=today).values_list("day", *DAILY_FIELDS)
+    }
+    dates = [first + timedelta(days=n) for n in range(days)]
+    data = {"days": [day.isoformat() for day in dates]}
+    for index, name in enumerate(DAILY_FIELDS):
+        data[name] = [rows[day][index] if day in rows else 0 for day in dates]
+    for name in ("bid_volume", "gmv"):
+        data[name] = [str(Decimal(value).quantize(CENTS)) for value in data[name]]
+    return data
+
+
+@replica_reads
+@query_budget(queries=4)
+def auction_history(request, pk):
+    """
+    Price-over-time for one auction as chart-ready column arrays:
+    ``t``, ``open``, ``high``, ``low``, ``close``, ``bids``.
+    ``?resolution=minute|hour|day`` (default minute).
+    """
+    resolution = request.GET.get("resolution", "minute")
+    if resolution not in RESOLUTIONS:
+        return _error("resolution must be minute, hour or day.")
+    if not Product.objects.filter(pk=pk, listing_type="BID").exists():
+        raise Http404("No such auction.")
+
+    points = price_history(pk, resolution)
+    return JsonResponse({
+        "id": pk,
+        "resolution": resolution,
+        "t": [start.isoformat() for start, *_ in points],
+        "open": [str(p[1]) for p in points],
+        "high": [str(p[2]) for p in points],
+        "low": [str(p[3]) for p in points],
+        "close": [str(p[4]) for p in points],
+        "bids": [p[5] for p in points],
+    })
+
+
+@replica_reads
+@query_budget(queries=3)
+def seller_daily(request):
+    """
+    The logged-in seller's daily bids, bid volume, orders and GMV for the
+    last ``?days=`` days (default 30), from the rollups (a minute behind).
+    """
+    if not request.user.is_authenticated:
+        return _error("Authentication required.", status=401)
+    try:
+        days = _days(request)
+    except ValueError:
+        return _error("Bad days value.")
+    return JsonResponse(_daily_series(SellerDay.objects.filter(seller=request.user), days))
+
+
+@staff_member_required
+@replica_reads
+@query_budget(queries=4)
+def category_daily(request, slug):
+    """Same daily series for one category, across every seller."""
+    category = get_object_or_404(Category, slug=slug)
+    try:
+        days = _days(request)
+    except ValueError:
+        return _error("Bad days value.")
+    data = _daily_series(CategoryDay.objects.filter(category=category), days)
+    return JsonResponse({"category": category.slug, **data})
+
+
+@login_required
+@replica_reads
+@query_budget(queries=4)
+def seller_dashboard(request):
+    """
+    Conversion, sell-through, final price against starting bid and
+    watch-to-bid for the last ``?days=`` days, read only from SellerFact
+    rows (refreshed every 15 minutes), however many listings the seller has.
+    """
+    try:
+        days = int(request.GET.get("days", DEFAULT_DAYS))
+    except ValueError:
+        days = DEFAULT_DAYS
+    if days not in DASHBOARD_PERIODS:
+        days = DEFAULT_DAYS
+    today = timezone.localdate()
+    facts = SellerFact.objects.filter(
+        seller=request.user, day__gt=today - timedelta(days=days), day__lte=today
+    )
+    context = {
+        "days": days,
+        "periods": DASHBOARD_PERIODS,
+        "summary": summarize(facts),
+        "daily": facts.order_by("-day"),
+    }
+    return render(request, "analytics/seller_dashboard.html", context)
@@ -0,0 +1,288 @@
+# api/resources.py
+
+import base64
+import json
+from decimal import Decimal
+
+from django.db.models import Max, Prefetch, Q
+from django.utils.dateparse import parse_datetime
+
+from auctions.models import Bid, Product, Watchlist
+from catalog.models import Product as CatalogProduct
+
+
+CENTS = Decimal("0.01")
+
+
+class BadRequest(ValueError):
+    """Unknown field/include, bad cursor or filter: answered with a 400."""
+
+
+class Field:
+    """
+    One output key: the columns ``.only()`` must load for it and how to read
+    it off the instance (plain attribute by default).
+    """
+
+    def __init__(self, columns=None, get=None, annotate=None):
+        self.columns = columns
+        self.get = get
+        # name -> expression for values computed in SQL (e.g. the top bid)
+        self.annotate = annotate or {}
+
+
+class Include:
+    """
+    A related object (``select``: FK, one JOIN) or list (``prefetch``: one
+    extra query per page), rendered with a fixed small set of fields.
+    Prefetched lists land in a plain list attribute, which also lets the
+    queryset be sliced (top N per parent).
+    """
+
+    def __init__(self, path, fields, select=True, queryset=None):
+        self.path = path
+        self.fields = fields
+        self.select = select
+        self.queryset = queryset
+        self.to_attr = f"api_{path}"
+
+    def columns(self):
+        return [f"{self.path}__{name}" for name in self.fields] if self.select else []
+
+    def render(self, obj):
+        if not self.select:
+            return [_row(item, self.fields) for item in getattr(obj, self.to_attr)]
+        related = getattr(obj, self.path)
+        return _row(related, self.fields) if related is not None else None
+
+
+def _row(obj, names):
+    return {name: getattr(obj, name) for name in names}
+
+
+def _money(value):
+    # SQLite hands back aggregates like Max() unquantized (27 rather than 27.00)
+    return value.quantize(CENTS) if value is not None else None
+
+
+def _image_url(obj):
+    return obj.image.url if obj.image else None
+
+
+class Resource:
+    """
+    A read-only collection: default and optional fields, includes, query
+    filters and keyset pagination on (``order_field``, pk), newest first.
+    Each page is one query plus one per prefetched include, however many
+    fields or includes are asked for.
+    """
+
+    model = None
+    fields = {}
+    default_fields = ()
+    includes = {}
+    filters = {}
+    order_field = "created_at"
+    login_required = False
+
+    def base_queryset(self, request):
+        return self.model._default_manager.all()
+
+    def parse(self, params):
+        """``(field names, includes)`` from ``fields=a,b`` and ``include=x,y``."""
+        names = _split(params.get("fields")) or list(self.default_fields)
+        unknown = set(names) - set(self.fields)
+        if unknown:
+            raise BadRequest(f"Unknown fields: {', '.join(sorted(unknown))}.")
+        if "id" not in names:
+            names.insert(0, "id")
+        includes = _split(params.get("include"))
+        unknown = set(includes) - set(self.includes)
+        if unknown:
+            raise BadRequest(f"Unknown includes: {', '.join(sorted(unknown))}.")
+        return names, includes
+
+    def queryset(self, request, names, includes):
+        qs = self.base_queryset(request)
+        columns = {"pk", self.order_field}
+        for name in names:
+            spec = self.fields[name]
+            columns.update(spec.columns if spec.columns is not None else [name])
+            if spec.annotate:
+                qs = qs.annotate(**spec.annotate)
+        for name in includes:
+            include = self.includes[name]
+            if include.select:
+                qs = qs.select_related(include.path)
+                columns.update(include.columns())
+            else:
+                qs = qs.prefetch_related(
+                    Prefetch(include.path, queryset=include.queryset, to_attr=include.to_attr)
+                )
+        return qs.only(*columns)
+
+    def filter(self, qs, params):
+        for param, lookup in self.filters.items():
+            if params.get(param):
+                qs = qs.filter(**{lookup: params[param]})
+        return qs
+
+    def page(self, qs, cursor, limit):
+        """``(objects, next cursor or None)``, newest first."""
+        qs = qs.order_by(f"-{self.order_field}", "-pk")
+        if cursor:
+            value, pk = decode_cursor(cursor)
+            qs = qs.filter(
+                Q(**{f"{self.order_field}__lt": value})
+                | Q(**{self.order_field: value, "pk__lt": pk})
+            )
+        objects = list(qs[:limit + 1])
+        if len(objects) <= limit:
+            return objects, None
+        objects = objects[:limit]
+        last = objects[-1]
+        return objects, encode_cursor(getattr(last, self.order_field), last.pk)
+
+    def render(self, obj, names, includes):
+        data = {}
+        for name in names:
+            spec = self.fields[name]
+            data[name] = spec.get(obj) if spec.get else getattr(obj, name)
+        for name in includes:
+            data[name] = self.includes[name].render(obj)
+        return data
+
+
+def encode_cursor(value, pk):
+    raw = json.dumps([value.isoformat(), pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        value, pk = json.loads(raw)
+        value = parse_datetime(value)
+        if value is None:
+            raise ValueError(cursor)
+        return value, int(pk)
+    except (ValueError, TypeError, UnicodeDecodeError) as exc:
+        raise BadRequest("Bad cursor.") from exc
+
+
+def _split(value):
+    return [part.strip() for part in (value or "").split(",") if part.strip()]
+
+
+USER = ("id", "username")
+CATEGORY = ("id", "name", "slug")
+
+
+class Listings(Resource):
+    """Active auction and buy-now listings, like the listing pages."""
+
+    model = Product
+    fields = {
+        "id": Field(),
+        "title": Field(),
+        "description": Field(),
+        "listing_type": Field(),
+        "price": Field(),
+        "starting_bid": Field(),
+        "min_increment": Field(),
+        "auction_end": Field(),
+        "is_active": Field(),
+        "watch_count": Field(),
+        "image": Field(get=_image_url),
+        # Product.highest_bid reads the top_bid annotation instead of querying
+        "highest_bid": Field(
+            columns=["listing_type", "starting_bid"],
+            get=lambda o: _money(o.highest_bid),
+            annotate={"top_bid": Max("bids__amount")},
+        ),
+        "created_at": Field(),
+    }
+    default_fields = ("title", "listing_type", "price", "highest_bid", "auction_end", "image")
+    includes = {
+        "seller": Include("seller", USER),
+        "category": Include("category", CATEGORY),
+        # the five latest (so highest) bids per listing, one windowed query
+        # per page; ordering the window by the decimal amount breaks on SQLite
+        "bids": Include(
+            "bids", ("id", "amount", "created_at"), select=False,
+            queryset=Bid.objects.only("id", "product", "amount", "created_at")
+            .order_by("-created_at", "-pk")[:5],
+        ),
+    }
+    filters = {
+        "listing_type": "listing_type",
+        "category": "category__slug",
+        "seller": "seller__username",
+    }
+
+    def base_queryset(self, request):
+        return Product.objects.filter(is_active=True)
+
+
+class ListingDetail(Listings):
+    def base_queryset(self, request):
+        return Product.objects.all()
+
+
+class Bids(Resource):
+    model = Bid
+    fields = {
+        "id": Field(),
+        "listing_id": Field(columns=["product"], get=lambda o: o.product_id),
+        "amount": Field(),
+        "created_at": Field(),
+    }
+    default_fields = ("listing_id", "amount", "created_at")
+    includes = {
+        "bidder": Include("bidder", USER),
+        "listing": Include("product", ("id", "title")),
+    }
+    filters = {"listing": "product_id", "bidder": "bidder__username"}
+
+
+class MyWatchlist(Resource):
+    """The logged-in user's watchlist."""
+
+    model = Watchlist
+    fields = {
+        "id": Field(),
+        "listing_id": Field(columns=["product"], get=lambda o: o.product_id),
+        "created_at": Field(),
+    }
+    default_fields = ("listing_id", "created_at")
+    includes = {
+        "listing": Include(
+            "product", ("id", "title", "listing_type", "price", "auction_end", "is_active")
+        ),
+    }
+    login_required = True
+
+    def base_queryset(self, request):
+        return Watchlist.objects.filter(user=request.user)
+
+
+class ShopProducts(Resource):
+    """Shop (catalog) products."""
+
+    model = CatalogProduct
+    fields = {
+        "id": Field(),
+        "title": Field(),
+        "slug": Field(),
+        "description": Field(),
+        "price": Field(),
+        "available": Field(columns=["stock", "reserved"], get=lambda o: o.available),
+        "image": Field(get=_image_url),
+        "created_at": Field(),
+    }
+    default_fields = ("title", "slug", "price", "available", "image")
+    includes = {"category": Include("category", CATEGORY)}
+    filters = {"category": "category__slug"}
+
+    def base_queryset(self, request):
+        return CatalogProduct.objects.filter(is_active=True)
@@ -0,0 +1,120 @@
+import json
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from auctions.models import Bid, Category, Product, Watchlist
+from catalog.models import Category as ShopCategory, Product as ShopProduct
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user("seller")
+        cls.bidder = User.objects.create_user("bidder")
+        cls.category = Category.objects.create(name="Lamps", slug="lamps")
+        end = timezone.now() + timedelta(days=1)
+        cls.listings = Product.objects.bulk_create([
+            Product(
+                seller=cls.seller, category=cls.category, title=f"Lot {i}",
+                description="A long description " * 20, price=100,
+                listing_type="BID", starting_bid=10, min_increment=1, auction_end=end,
+            )
+            for i in range(30)
+        ])
+        Bid.objects.bulk_create([
+            Bid(product=p, bidder=cls.bidder, amount=20 + step)
+            for p in cls.listings
+            for step in range(8)
+        ])
+
+    def get(self, name, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse(f"api:{name}"), params)
+        return response, len(ctx.captured_queries)
+
+    def test_cursor_pagination_walks_every_listing_once(self):
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 7, "fields": "title"}
+            if cursor:
+                params["cursor"] = cursor
+            response, _ = self.get("listing_list", **params)
+            body = response.json()
+            seen += [row["id"] for row in body["data"]]
+            cursor = body["next"]
+            if not cursor:
+                break
+        self.assertEqual(len(seen), 30)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+    def test_sparse_fields_and_includes_keep_queries_constant(self):
+        response, plain = self.get("listing_list", fields="title,highest_bid")
+        row = response.json()["data"][0]
+        self.assertEqual(set(row), {"id", "title", "highest_bid"})
+        self.assertEqual(row["highest_bid"], "27.00")
+
+        response, full = self.get(
+            "listing_list", limit=30,
+            fields="title,price,image,highest_bid", include="seller,category,bids",
+        )
+        row = response.json()["data"][0]
+        self.assertEqual(row["seller"], {"id": self.seller.pk, "username": "seller"})
+        self.assertEqual(row["category"]["slug"], "lamps")
+        self.assertEqual([b["amount"] for b in row["bids"]], ["27.00", "26.00", "25.00", "24.00", "23.00"])
+        # one page query, plus one for the prefetched bids
+        self.assertEqual(full, plain + 1)
+
+    def test_only_requested_columns_are_loaded(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("api:listing_list"), {"fields": "title"})
+        page = [q["sql"] for q in ctx.captured_queries if 'FROM "auctions_product"' in q["sql"]]
+        self.assertEqual(len(page), 1)
+        self.assertNotIn('"description"', page[0])
+
+    def test_bad_requests(self):
+        self.assertEqual(self.get("listing_list", fields="secret")[0].status_code, 400)
+        self.assertEqual(self.get("listing_list", include="owner")[0].status_code, 400)
+        self.assertEqual(self.get("listing_list", cursor="nope")[0].status_code, 400)
+        self.assertEqual(self.get("bid_list", listing="abc")[0].status_code, 400)
+
+    def test_payload_is_a_fraction_of_the_html(self):
+        html = self.client.get(reverse("auctions:listing_list"))
+        api = self.client.get(reverse("api:listing_list"), {"limit": 30})
+        self.assertEqual(len(api.json()["data"]), 30)
+        self.assertLess(len(api.content) * 5, len(html.content))
+
+    def test_bids_watchlist_and_detail(self):
+        listing = self.listings[0]
+        response, queries = self.get("bid_list", listing=listing.pk, include="bidder,listing")
+        rows = response.json()["data"]
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(rows[0]["bidder"]["username"], "bidder")
+        self.assertEqual(rows[0]["listing"]["title"], "Lot 0")
+
+        self.assertEqual(self.get("watchlist")[0].status_code, 401)
+        Watchlist.objects.create(user=self.bidder, product=listing)
+        self.client.force_login(self.bidder)
+        rows = self.get("watchlist", include="listing")[0].json()["data"]
+        self.assertEqual([r["listing"]["id"] for r in rows], [listing.pk])
+
+        url = reverse("api:listing_detail", args=[listing.pk])
+        data = self.client.get(url, {"fields": "title,highest_bid"}).json()["data"]
+        self.assertEqual(data, {"id": listing.pk, "title": "Lot 0", "highest_bid": "27.00"})
+        self.assertEqual(self.client.get(reverse("api:listing_detail", args=[0])).status_code, 404)
+
+    def test_shop_products(self):
+        category = ShopCategory.objects.create(name="Lamps", slug="lamps")
+        ShopProduct.objects.create(
+            category=category, title="Desk lamp", slug="desk-lamp", price=25, stock=5, reserved=2
+        )
+        response, _ = self.get("product_list", category="lamps", include="category")
+        row = response.json()["data"][0]
+        self.assertEqual(row["available"], 3)
+        self.assertEqual(row["category"]["name"], "Lamps")
+        self.assertEqual(json.loads(response.content)["next"], None)
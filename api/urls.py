@@ -0,0 +1,17 @@
+from django.urls import path
+
+from . import resources, views
+
+app_name = "api"
+
+# mounted under /api/v1/; a breaking change gets a new prefix, not a new meaning
+urlpatterns = [
+    path("listings/", views.resource_list, {"resource": resources.Listings()}, name="listing_list"),
+    path("listings/<int:pk>/", views.resource_detail, {"resource": resources.ListingDetail()},
+         name="listing_detail"),
+    path("bids/", views.resource_list, {"resource": resources.Bids()}, name="bid_list"),
+    path("watchlist/", views.resource_list, {"resource": resources.MyWatchlist()}, name="watchlist"),
+    path("products/", views.resource_list, {"resource": resources.ShopProducts()}, name="product_list"),
+    path("products/<int:pk>/", views.resource_detail, {"resource": resources.ShopProducts()},
+         name="product_detail"),
+]
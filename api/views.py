@@ -0,0 +1,62 @@
+# api/views.py
+
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+
+from core.querybudget import query_budget
+from core.routing import replica_reads
+from .resources import BadRequest
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+def _json(data, status=200):
+    # compact separators: the mobile client pays for every byte
+    return JsonResponse(data, status=status, json_dumps_params={"separators": (",", ":")})
+
+
+def _error(message, status=400):
+    return _json({"error": message}, status=status)
+
+
+@replica_reads
+@query_budget(queries=4)
+def resource_list(request, resource):
+    """
+    One page of ``resource`` (see api.resources):
+    - ``fields=a,b`` picks the keys (and the columns loaded), ``include=x``
+      adds related objects, other known params filter
+    - ``limit`` (max 100) and ``cursor`` page newest-first; the response
+      carries ``next``, the cursor for the following page, or null
+    """
+    if resource.login_required and not request.user.is_authenticated:
+        return _error("Authentication required.", status=401)
+    try:
+        limit = min(max(int(request.GET.get("limit", DEFAULT_LIMIT)), 1), MAX_LIMIT)
+        names, includes = resource.parse(request.GET)
+        qs = resource.filter(resource.queryset(request, names, includes), request.GET)
+        objects, next_cursor = resource.page(qs, request.GET.get("cursor"), limit)
+    except BadRequest as exc:
+        return _error(str(exc))
+    except (ValueError, ValidationError):
+        return _error("Bad limit or filter value.")
+    return _json({
+        "data": [resource.render(obj, names, includes) for obj in objects],
+        "next": next_cursor,
+    })
+
+
+@replica_reads
+@query_budget(queries=4)
+def resource_detail(request, resource, pk):
+    if resource.login_required and not request.user.is_authenticated:
+        return _error("Authentication required.", status=401)
+    try:
+        names, includes = resource.parse(request.GET)
+    except BadRequest as exc:
+        return _error(str(exc))
+    obj = resource.queryset(request, names, includes).filter(pk=pk).first()
+    if obj is None:
+        return _error("Not found.", status=404)
+    return _json({"data": resource.render(obj, names, includes)})
@@ -3,7 +3,10 @@
 from django.contrib import admin
 from django.utils.html import format_html
 
+from core.exports import export_csv, export_jsonl
+from core.largetables import LargeTableAdmin
 from .models import Category, Product, Bid, Watchlist, Order
+from .watching import recount_watch_counts
 
 
 @admin.register(Category)
@@ -14,7 +17,7 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(LargeTableAdmin):
     list_display = (
         "title",
         "seller",
@@ -28,9 +31,14 @@ class ProductAdmin(admin.ModelAdmin):
         "created_at",
         "preview",          # image preview column
     )
-    list_filter = ("listing_type", "is_active", "category", "created_at")
-    search_fields = ("title", "description", "seller__username")
+    list_select_related = ("seller", "category")
+    list_filter = ("listing_type", "is_active", "category")
+    date_hierarchy = "created_at"
+    # prefix matches can use the title/username indexes; "=id" jumps straight to a row
+    search_fields = ("=id", "^title", "^seller__username")
+    autocomplete_fields = ("seller", "category", "winner")
     ordering = ("-created_at",)
+    actions = [export_csv, export_jsonl]
     list_editable = ("is_active",)
     readonly_fields = ("created_at",)
 
@@ -46,24 +54,50 @@ class ProductAdmin(admin.ModelAdmin):
 
 
 @admin.register(Bid)
-class BidAdmin(admin.ModelAdmin):
+class BidAdmin(LargeTableAdmin):
     list_display = ("product", "bidder", "amount", "created_at")
-    list_filter = ("created_at",)
-    search_fields = ("product__title", "bidder__username")
+    list_select_related = ("product", "bidder")
+    date_hierarchy = "created_at"
+    search_fields = ("^product__title", "^bidder__username")
+    autocomplete_fields = ("product", "bidder")
     ordering = ("-created_at",)
+    actions = [export_csv, export_jsonl]
 
 
 @admin.register(Watchlist)
-class WatchlistAdmin(admin.ModelAdmin):
+class WatchlistAdmin(LargeTableAdmin):
     list_display = ("user", "product", "created_at")
-    list_filter = ("created_at",)
-    search_fields = ("user__username", "product__title")
+    list_select_related = ("user", "product")
+    date_hierarchy = "created_at"
+    search_fields = ("^user__username", "^product__title")
+    autocomplete_fields = ("user", "product")
     ordering = ("-created_at",)
 
+    # Product.watch_count is kept by toggle_watchlist; rows changed here
+    # recount the products they touch
+
+    def save_model(self, request, obj, form, change):
+        before = Watchlist.objects.filter(pk=obj.pk).values_list("product_id", flat=True).first()
+        super().save_model(request, obj, form, change)
+        recount_watch_counts(Product.objects.filter(pk__in={before, obj.product_id} - {None}))
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        recount_watch_counts(Product.objects.filter(pk=obj.product_id))
+
+    def delete_queryset(self, request, queryset):
+        product_ids = set(queryset.values_list("product_id", flat=True))
+        super().delete_queryset(request, queryset)
+        recount_watch_counts(Product.objects.filter(pk__in=product_ids))
+
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(LargeTableAdmin):
     list_display = ("id", "buyer", "product", "price", "status", "created_at")
-    list_filter = ("status", "created_at")
-    search_fields = ("buyer__username", "product__title")
+    list_select_related = ("buyer", "product")
+    list_filter = ("status",)
+    date_hierarchy = "created_at"
+    search_fields = ("=id", "^buyer__username", "^product__title")
+    autocomplete_fields = ("buyer", "product")
     ordering = ("-created_at",)
+    actions = [export_csv, export_jsonl]
@@ -0,0 +1,126 @@
+# auctions/ending.py
+
+import base64
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .models import Product
+
+FEED_WINDOW = timedelta(hours=1)
+FEED_CACHE_SECONDS = 5
+BUCKETS_CACHE_SECONDS = 60
+
+
+class BadCursor(ValueError):
+    pass
+
+
+def encode_cursor(product):
+    raw = f"{product.auction_end.timestamp()}:{product.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, pk = raw.split(":")
+        return datetime.fromtimestamp(float(ts), tz=dt_timezone.utc), int(pk)
+    except (ValueError, OverflowError, OSError, UnicodeDecodeError) as exc:
+        raise BadCursor(cursor) from exc
+
+
+def _ending_qs(now, window):
+    # matches product_ending_idx: equality on the first two columns, range on the third
+    return Product.objects.filter(
+        listing_type="BID",
+        is_active=True,
+        auction_end__gt=now,
+        auction_end__lte=now + window,
+    )
+
+
+def _page_query(cursor, limit, window):
+    after = decode_cursor(cursor) if cursor else None
+    key = f"auctions:ending:{cursor or '-'}:{limit}:{int(window.total_seconds())}"
+    qs = _ending_qs(timezone.now(), window)
+    if after:
+        end, pk = after
+        qs = qs.filter(Q(auction_end__gt=end) | Q(auction_end=end, pk__gt=pk))
+    qs = (
+        qs.select_related("seller")
+        .annotate(top_bid=Max("bids__amount"))
+        .order_by("auction_end", "pk")[: limit + 1]
+    )
+    return key, qs
+
+
+def _page(products, limit):
+    next_cursor = encode_cursor(products[limit - 1]) if len(products) > limit else None
+    return products[:limit], next_cursor
+
+
+def ending_soon_page(cursor=None, limit=24, window=FEED_WINDOW):
+    """
+    One page of active auctions ordered by end time, keyset-paginated on
+    (auction_end, pk). Pages are shared through the cache for a few seconds.
+    Returns (products, next_cursor).
+    """
+    key, qs = _page_query(cursor, limit, window)
+    page = cache.get(key)
+    if page is None:
+        page = _page(list(qs), limit)
+        cache.set(key, page, FEED_CACHE_SECONDS)
+    return page
+
+
+async def aending_soon_page(cursor=None, limit=24, window=FEED_WINDOW):
+    """Async ending_soon_page for the async views; same cache entries."""
+    key, qs = _page_query(cursor, limit, window)
+    page = await cache.aget(key)
+    if page is None:
+        page = _page([product async for product in qs], limit)
+        await cache.aset(key, page, FEED_CACHE_SECONDS)
+    return page
+
+
+def minute_buckets(now=None):
+    """
+    Active auctions ending in the next hour, grouped by the minute they end in:
+    ``{minute_start: [(pk, title, auction_end), ...]}`` in end order.
+    Computed with one range scan and cached per minute, so the homepage widget
+    and the ending-soon notification sweep read the same snapshot.
+    """
+    now = now or timezone.now()
+    minute = now.replace(second=0, microsecond=0)
+    key = f"auctions:ending:buckets:{int(minute.timestamp())}"
+
+    buckets = cache.get(key)
+    if buckets is None:
+        buckets = defaultdict(list)
+        rows = (
+            _ending_qs(minute, FEED_WINDOW + timedelta(minutes=1))
+            .order_by("auction_end", "pk")
+            .values_list("pk", "title", "auction_end")
+        )
+        for pk, title, end in rows:
+            buckets[end.replace(second=0, microsecond=0)].append((pk, title, end))
+        buckets = dict(buckets)
+        cache.set(key, buckets, BUCKETS_CACHE_SECONDS)
+    return buckets
+
+
+def ending_within(window, now=None):
+    """Flattened (pk, title, auction_end) rows from the buckets ending within ``window``."""
+    now = now or timezone.now()
+    limit = now + window
+    return [
+        row
+        for minute, rows in sorted(minute_buckets(now).items())
+        if minute <= limit
+        for row in rows
+        if now < row[2] <= limit
+    ]
@@ -0,0 +1,55 @@
+# auctions/exports.py
+
+from core.exports import Dataset, register
+from .models import Bid, Order, Product
+
+register(Dataset(
+    name="products",
+    model=Product,
+    columns={
+        "id": "id",
+        "title": "title",
+        "seller": "seller__username",
+        "category": "category__name",
+        "listing_type": "listing_type",
+        "price": "price",
+        "starting_bid": "starting_bid",
+        "min_increment": "min_increment",
+        "auction_end": "auction_end",
+        "is_active": "is_active",
+        "winner": "winner__username",
+        "closed_at": "closed_at",
+        "created_at": "created_at",
+    },
+    owner="seller",
+))
+
+register(Dataset(
+    name="bids",
+    model=Bid,
+    columns={
+        "id": "id",
+        "product_id": "product_id",
+        "product": "product__title",
+        "bidder": "bidder__username",
+        "amount": "amount",
+        "created_at": "created_at",
+    },
+    # sellers export the bids on their own listings
+    owner="product__seller",
+))
+
+register(Dataset(
+    name="auction-orders",
+    model=Order,
+    columns={
+        "id": "id",
+        "product_id": "product_id",
+        "product": "product__title",
+        "buyer": "buyer__username",
+        "price": "price",
+        "status": "status",
+        "created_at": "created_at",
+    },
+    owner="product__seller",
+))
@@ -78,26 +78,40 @@ class ProductForm(forms.ModelForm):
         - If listing_type == 'BID', require starting_bid, min_increment, auction_end.
         """
         cleaned = super().clean()
-        listing_type = cleaned.get("listing_type")
-        starting_bid = cleaned.get("starting_bid")
-        min_increment = cleaned.get("min_increment")
-        auction_end = cleaned.get("auction_end")
+        for field, message in auction_field_errors(cleaned).items():
+            self.add_error(field, message)
+        return cleaned
 
-        if listing_type == "BID":
-            if starting_bid is None:
-                self.add_error(
-                    "starting_bid",
-                    "Starting bid is required for auction listings.",
-                )
-            if min_increment is None:
-                self.add_error(
-                    "min_increment",
-                    "Minimum increment is required for auction listings.",
-                )
-            if auction_end is None:
-                self.add_error(
-                    "auction_end",
-                    "End date/time is required for auction listings.",
-                )
 
-        return cleaned
+AUCTION_REQUIRED = {
+    "starting_bid": "Starting bid is required for auction listings.",
+    "min_increment": "Minimum increment is required for auction listings.",
+    "auction_end": "End date/time is required for auction listings.",
+}
+
+
+def auction_field_errors(cleaned):
+    """
+    ``{field: message}`` for the auction fields a BID listing is missing.
+    Shared by ProductForm and the bulk importer (auctions.importing).
+    """
+    if cleaned.get("listing_type") != "BID":
+        return {}
+    return {
+        field: message
+        for field, message in AUCTION_REQUIRED.items()
+        if cleaned.get(field) is None
+    }
+
+
+class ProductImportForm(forms.Form):
+    file = forms.FileField(
+        help_text="CSV with a header row, or JSON lines (.jsonl).",
+        widget=forms.ClearableFileInput(attrs={"class": "form-control", "accept": ".csv,.jsonl"}),
+    )
+
+    def clean_file(self):
+        upload = self.cleaned_data["file"]
+        if not upload.name.lower().endswith((".csv", ".jsonl")):
+            raise forms.ValidationError("Upload a .csv or .jsonl file.")
+        return upload
@@ -0,0 +1,203 @@
+# auctions/importing.py
+
+import csv
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, UnidentifiedImageError
+
+from .forms import ProductForm, auction_field_errors
+from .models import Category, Product
+from .tasks import MAX_IMAGE_SIDE
+
+BATCH_SIZE = 1000
+IMAGE_WORKERS = 8
+# errors past this many are counted but not kept
+MAX_REPORTED_ERRORS = 1000
+
+# ProductForm's own field objects, built once: each row is cleaned with the
+# same rules as the create form without instantiating a form per row
+FORM_FIELDS = {
+    name: ProductForm.base_fields[name]
+    for name in ProductForm.Meta.fields
+    if name != "image"
+}
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    failed: int = 0
+    # (line, {field: [messages]}) for the first MAX_REPORTED_ERRORS bad rows
+    errors: list = field(default_factory=list)
+
+    def add_error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, errors))
+
+
+def format_for(filename):
+    return "jsonl" if str(filename).lower().endswith(".jsonl") else "csv"
+
+
+def read_rows(fileobj, fmt):
+    """
+    Yield ``(line, row)`` from a binary CSV (header row) or JSON-lines
+    stream, one row at a time. A JSONL line that isn't an object gives None.
+    """
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line, raw in enumerate(text, 1):
+        if not raw.strip():
+            continue
+        try:
+            row = json.loads(raw)
+        except ValueError:
+            row = None
+        yield line, row if isinstance(row, dict) else None
+
+
+def category_lookup():
+    """Category pk by lower-cased name and by slug."""
+    lookup = {}
+    for pk, name, slug in Category.objects.values_list("pk", "name", "slug"):
+        lookup[name.lower()] = lookup[slug] = pk
+    return lookup
+
+
+def _text(value):
+    """A cell as the stripped string a form would post, whatever type JSON gave it."""
+    return "" if value is None else str(value).strip()
+
+
+def clean_row(row, categories):
+    """``(cleaned, errors)``: ProductForm's field and auction rules, plus category."""
+    cleaned, errors = {}, {}
+    for name, formfield in FORM_FIELDS.items():
+        value = row.get(name)
+        if isinstance(value, (list, dict)):
+            errors[name] = ["Expected a single value."]
+            continue
+        try:
+            cleaned[name] = formfield.clean(_text(value))
+        except ValidationError as exc:
+            errors[name] = exc.messages
+    for name, message in auction_field_errors(cleaned).items():
+        errors.setdefault(name, []).append(message)
+
+    category = _text(row.get("category"))
+    if category:
+        pk = categories.get(category) or categories.get(category.lower())
+        if pk is None:
+            errors["category"] = [f"Unknown category {category!r}."]
+        cleaned["category_id"] = pk
+    return cleaned, errors
+
+
+def image_path(value, images_dir):
+    """Resolve a row's image inside ``images_dir``; paths outside it are refused."""
+    root = Path(images_dir).resolve()
+    path = (root / value).resolve()
+    if root not in path.parents:
+        raise ValidationError("Image path must be inside the images directory.")
+    return path
+
+
+def store_image(path, save=True):
+    """
+    Check ``path`` is an image and copy it into media storage, scaled down
+    like process_image does for uploads. Runs on the importer's thread pool.
+    """
+    with Image.open(path) as img:
+        img.load()
+        if not save:
+            return ""
+        name = Product._meta.get_field("image").generate_filename(None, path.name)
+        if max(img.size) <= MAX_IMAGE_SIDE:
+            with open(path, "rb") as fh:
+                return default_storage.save(name, File(fh))
+        fmt = img.format
+        img.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE))
+        buf = io.BytesIO()
+        img.save(buf, format=fmt, optimize=True)
+        return default_storage.save(name, ContentFile(buf.getvalue()))
+
+
+def import_products(fileobj, fmt, seller, images_dir=None, batch_size=BATCH_SIZE,
+                    workers=IMAGE_WORKERS, dry_run=False):
+    """
+    Stream listings from ``fileobj`` into Product rows owned by ``seller``.
+    - Bad rows are reported by line and skipped; good ones are inserted
+      with bulk_create, one transaction per batch.
+    - ``image`` columns name files under ``images_dir`` (None refuses
+      them); they are read and stored on a thread pool while later rows
+      are being parsed.
+    - ``dry_run`` validates everything (images included) and writes nothing.
+    - A file that isn't UTF-8 or isn't valid CSV stops the import with a
+      "file" error; rows read before that point are still imported.
+    Returns an ImportReport.
+    """
+    report = ImportReport()
+    categories = category_lookup()
+    pending = []
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        line = 0
+        try:
+            for line, row in read_rows(fileobj, fmt):
+                if row is None:
+                    report.add_error(line, {"row": ["Not a JSON object."]})
+                    continue
+                cleaned, errors = clean_row(row, categories)
+                image = _text(row.get("image"))
+                future = None
+                if image and not errors:
+                    if images_dir is None:
+                        errors["image"] = ["Images can only be attached by the import_products command."]
+                    else:
+                        try:
+                            future = pool.submit(store_image, image_path(image, images_dir), not dry_run)
+                        except ValidationError as exc:
+                            errors["image"] = exc.messages
+                if errors:
+                    report.add_error(line, errors)
+                    continue
+                pending.append((line, Product(seller=seller, **cleaned), future))
+                if len(pending) >= batch_size:
+                    _insert(pending, report, dry_run)
+                    pending = []
+        except UnicodeDecodeError:
+            report.add_error(line + 1, {"file": ["The file must be UTF-8 encoded."]})
+        except csv.Error as exc:
+            report.add_error(line + 1, {"file": [f"Malformed CSV: {exc}"]})
+        _insert(pending, report, dry_run)
+    return report
+
+
+def _insert(pending, report, dry_run):
+    products = []
+    for line, product, future in pending:
+        if future is not None:
+            try:
+                product.image = future.result()
+            except (OSError, UnidentifiedImageError) as exc:
+                report.add_error(line, {"image": [f"Could not read image: {exc}"]})
+                continue
+        products.append(product)
+    if products and not dry_run:
+        with transaction.atomic():
+            Product.objects.bulk_create(products)
+    report.created += len(products)
@@ -1,15 +1,12 @@
 from django.core.management.base import BaseCommand
-from django.utils import timezone
-from auctions.models import Listing
+from auctions.tasks import close_expired_auctions
 
 class Command(BaseCommand):
     help = 'Close auctions whose end time has passed.'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+
     def handle(self, *args, **kwargs):
-        qs = Listing.objects.filter(is_closed=False, ends_at__lte=timezone.now())
-        count = 0
-        for l in qs:
-            l.is_closed = True
-            l.save(update_fields=['is_closed'])
-            count += 1
+        count = close_expired_auctions(batch_size=kwargs['batch_size'])
         self.stdout.write(self.style.SUCCESS(f'Closed {count} expired listings.'))
@@ -0,0 +1,46 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from auctions.importing import BATCH_SIZE, IMAGE_WORKERS, format_for, import_products
+
+
+class Command(BaseCommand):
+    help = 'Bulk-create listings for a seller from a CSV or JSON-lines file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV with a header row, or .jsonl')
+        parser.add_argument('--seller', required=True, help='username that will own the listings')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='default: from the file extension')
+        parser.add_argument('--images-dir', help='directory the image column is relative to')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=IMAGE_WORKERS, help='threads storing images')
+        parser.add_argument('--dry-run', action='store_true', help='validate only')
+        parser.add_argument('--show-errors', type=int, default=50, help='bad rows to print')
+
+    def handle(self, *args, **opts):
+        try:
+            seller = User.objects.get(username=opts['seller'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user {opts['seller']!r}.")
+        try:
+            fh = open(opts['path'], 'rb')
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        with fh:
+            report = import_products(
+                fh,
+                opts['format'] or format_for(opts['path']),
+                seller,
+                images_dir=opts['images_dir'],
+                batch_size=opts['batch_size'],
+                workers=opts['workers'],
+                dry_run=opts['dry_run'],
+            )
+
+        for line, errors in report.errors[:opts['show_errors']]:
+            detail = '; '.join(f"{name}: {' '.join(msgs)}" for name, msgs in errors.items())
+            self.stdout.write(f'line {line}: {detail}')
+        verb = 'Would import' if opts['dry_run'] else 'Imported'
+        message = f'{verb} {report.created} listings, rejected {report.failed} rows.'
+        self.stdout.write(self.style.SUCCESS(message) if not report.failed else self.style.WARNING(message))
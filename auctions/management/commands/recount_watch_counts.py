@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from auctions.watching import recount_watch_counts
+
+class Command(BaseCommand):
+    help = 'Reset every listing\'s watch count from its watchlist rows (e.g. after deleting users).'
+
+    def handle(self, *args, **kwargs):
+        count = recount_watch_counts()
+        self.stdout.write(self.style.SUCCESS(f'Recounted {count} listings.'))
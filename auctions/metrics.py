@@ -0,0 +1,23 @@
+# auctions/metrics.py
+
+from metrics.registry import counter, histogram
+
+BIDS = counter(
+    "auction_bids",
+    "Bids placed through place_bid, by outcome and rejection reason.",
+    ["outcome", "reason"],
+)
+AUCTIONS_CLOSED = counter(
+    "auctions_closed", "Auctions closed, by what closed them.", ["via"]
+)
+CLOSE_LAG = histogram(
+    "auction_close_lag_seconds",
+    "Delay between an auction's end time and it being closed.",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 900, 3600),
+)
+BUY_NOW = counter("auction_buy_now", "Buy-now attempts by outcome.", ["outcome"])
+
+
+def auction_closed(via, auction_end, closed_at):
+    AUCTIONS_CLOSED.inc(via=via)
+    CLOSE_LAG.observe(max((closed_at - auction_end).total_seconds(), 0))
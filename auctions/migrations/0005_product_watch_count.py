@@ -0,0 +1,34 @@
+# Generated by Django 5.0.7 on 2026-10-19 06:26
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_watch_count(apps, schema_editor):
+    Product = apps.get_model('auctions', 'Product')
+    Watchlist = apps.get_model('auctions', 'Watchlist')
+    counts = (
+        Watchlist.objects
+        .filter(product=OuterRef('pk'))
+        .values('product')
+        .annotate(n=Count('pk'))
+        .values('n')
+    )
+    Product.objects.update(watch_count=Coalesce(Subquery(counts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0004_category_product_closed_at_product_winner_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='watch_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_watch_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.7 on 2026-10-19 06:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0005_product_watch_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['listing_type', 'is_active', 'auction_end'], name='product_ending_idx'),
+        ),
+    ]
@@ -4,6 +4,8 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+from .metrics import auction_closed
+
 
 class Category(models.Model):
     name = models.CharField(max_length=80, unique=True)
@@ -36,7 +38,7 @@ class Product(models.Model):
         related_name="products",
     )
 
-    title = models.CharField(max_length=200)
+    title = models.CharField(max_length=200, db_index=True)
     description = models.TextField(blank=True)
     image = models.ImageField(upload_to="products/", blank=True, null=True)
 
@@ -74,7 +76,10 @@ class Product(models.Model):
     )
 
     is_active = models.BooleanField(default=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    # Denormalized Watchlist count, kept in step by toggle_watchlist
+    watch_count = models.PositiveIntegerField(default=0)
 
     # Winner / closing info for auctions
     winner = models.ForeignKey(
@@ -86,6 +91,15 @@ class Product(models.Model):
     )
     closed_at = models.DateTimeField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # range scans for the "ending soon" feed and buckets
+            models.Index(
+                fields=["listing_type", "is_active", "auction_end"],
+                name="product_ending_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -105,6 +119,9 @@ class Product(models.Model):
     def highest_bid(self):
         if not self.is_auction:
             return None
+        if hasattr(self, "top_bid"):
+            # list views annotate Max("bids__amount") instead of a query per row
+            return self.top_bid if self.top_bid is not None else self.starting_bid
         top = self.highest_bid_obj
         return top.amount if top else self.starting_bid
 
@@ -118,18 +135,34 @@ class Product(models.Model):
     def close_if_finished(self):
         """
         If auction end time passed, close auction and set winner.
-        Safe to call multiple times.
+        Safe to call multiple times, and concurrently: the close is a
+        conditional UPDATE, so only one caller closes (and counts) it.
         """
         if not self.is_auction or not self.auction_end:
             return
 
         if self.is_active and timezone.now() >= self.auction_end:
             top_bid = self.highest_bid_obj
-            if top_bid:
-                self.winner = top_bid.bidder
+            now = timezone.now()
+            winner = top_bid.bidder if top_bid else None
+            claimed = (
+                Product.objects
+                .filter(pk=self.pk, is_active=True)
+                .update(winner=winner, is_active=False, closed_at=now)
+            )
+            if claimed:
+                auction_closed("page_view", self.auction_end, now)
+            else:
+                # someone else closed it (or bought it out) first; take their result
+                closed = (
+                    Product.objects.select_related("winner")
+                    .only("closed_at", "winner")
+                    .get(pk=self.pk)
+                )
+                winner, now = closed.winner, closed.closed_at
+            self.winner = winner
             self.is_active = False
-            self.closed_at = timezone.now()
-            self.save()
+            self.closed_at = now
 
 
 class Bid(models.Model):
@@ -146,7 +179,7 @@ class Bid(models.Model):
         related_name="bids",
     )
     amount = models.DecimalField(max_digits=10, decimal_places=2)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     def __str__(self):
         return f"{self.bidder.username} → {self.product} ({self.amount})"
@@ -163,7 +196,7 @@ class Watchlist(models.Model):
         on_delete=models.CASCADE,
         related_name="watchlisted_by",
     )
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
         unique_together = ("user", "product")
@@ -195,7 +228,7 @@ class Order(models.Model):
         choices=STATUS_CHOICES,
         default="PENDING",
     )
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     def __str__(self):
         return f"Order #{self.pk} - {self.product.title}"
@@ -0,0 +1,63 @@
+# auctions/tasks.py
+
+from datetime import timedelta
+
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from PIL import Image
+
+from jobs.queue import task
+from .metrics import auction_closed
+from .models import Bid, Product
+
+# uploads larger than this (either side, px) are scaled down
+MAX_IMAGE_SIDE = 1600
+
+
+@task(every=timedelta(minutes=1))
+def close_expired_auctions(batch_size=200):
+    """
+    Close auctions whose end time has passed and record the winner.
+    - Winners are looked up with one correlated subquery per batch.
+    - Each close is a conditional UPDATE, so a concurrent buy-now or
+      close_if_finished can't be overwritten.
+    Returns the number of auctions closed.
+    """
+    closed = 0
+    while True:
+        now = timezone.now()
+        top_bidder = (
+            Bid.objects
+            .filter(product=OuterRef("pk"))
+            .order_by("-amount", "-created_at")
+            .values("bidder")[:1]
+        )
+        batch = list(
+            Product.objects
+            .filter(listing_type="BID", is_active=True, auction_end__lte=now)
+            .annotate(top_bidder=Subquery(top_bidder))
+            .values_list("pk", "top_bidder", "auction_end")[:batch_size]
+        )
+        for pk, winner_id, auction_end in batch:
+            if (
+                Product.objects
+                .filter(pk=pk, is_active=True)
+                .update(is_active=False, winner_id=winner_id, closed_at=now)
+            ):
+                closed += 1
+                auction_closed("job", auction_end, now)
+        if len(batch) < batch_size:
+            return closed
+
+
+@task()
+def process_image(product_id):
+    """Scale oversized product uploads down in place so list pages stay light."""
+    product = Product.objects.filter(pk=product_id).only("image").first()
+    if not product or not product.image:
+        return
+    with Image.open(product.image.path) as img:
+        if max(img.size) <= MAX_IMAGE_SIDE:
+            return
+        img.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE))
+        img.save(product.image.path, format=img.format, optimize=True)
@@ -5,11 +5,14 @@ app_name = "auctions"
 
 urlpatterns = [
     path("", views.auction_list, name="listing_list"),
+    path("ending-soon/", views.ending_soon, name="ending_soon"),
+    path("ending-soon/json/", views.ending_soon_json, name="ending_soon_json"),
     path("<int:pk>/", views.auction_detail, name="listing_detail"),
     path("<int:pk>/bid/", views.place_bid, name="place_bid"),
     path("<int:pk>/buy-now/", views.buy_now, name="buy_now"),
 
     path("product/add/", views.product_create, name="product_add"),
+    path("product/import/", views.product_import, name="product_import"),
     path("<int:pk>/status/", views.product_status_json, name="status_json"),
 
     # NEW
@@ -1,13 +1,25 @@
 # auctions/views.py
 
 from decimal import Decimal
+from asgiref.sync import sync_to_async
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
-from django.shortcuts import get_object_or_404, redirect
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Q
+from django.http import Http404, JsonResponse
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect
 from django.utils import timezone
-from .forms import ProductForm
+from core.idempotency import idempotent
+from core.querybudget import query_budget
+from core.routing import replica_reads
+from jobs.queue import enqueue
+from notifications.outbox import record_bid
+from .ending import BadCursor, aending_soon_page
+from .forms import ProductForm, ProductImportForm
+from .importing import format_for, import_products
+from .metrics import BIDS, BUY_NOW
 from .models import Product, Bid, Watchlist, Order
+from .watching import awatched_ids, forget_watched_ids, watched_ids
 from django.shortcuts import render
 
 
@@ -16,6 +28,7 @@ from django.shortcuts import render
 # =========================
 
 @login_required
+@query_budget(queries=8)
 def my_dashboard(request):
     """
     Simple dashboard for the logged-in user:
@@ -29,6 +42,7 @@ def my_dashboard(request):
     selling = (
         Product.objects
         .filter(seller=user)
+        .annotate(top_bid=Max("bids__amount"))
         .order_by("-created_at")
     )
 
@@ -55,36 +69,92 @@ def my_dashboard(request):
 
     # small stats
     now = timezone.now()
-    active_auctions = selling.filter(listing_type="BID", is_active=True).count()
-    active_buy_now = selling.filter(listing_type="BUY", is_active=True).count()
+    counts = Product.objects.filter(seller=user, is_active=True).aggregate(
+        auctions=Count("pk", filter=Q(listing_type="BID")),
+        buy_now=Count("pk", filter=Q(listing_type="BUY")),
+    )
 
     context = {
         "selling": selling,
         "my_bids": my_bids,
         "watch_items": watch_items,
         "orders": orders,
-        "active_auctions": active_auctions,
-        "active_buy_now": active_buy_now,
+        "active_auctions": counts["auctions"],
+        "active_buy_now": counts["buy_now"],
         "now": now,
     }
     return render(request, "auctions/dashboard.html", context)
 
-def auction_list(request):
+@replica_reads
+@query_budget(queries=4)
+async def auction_list(request):
     """
     Show all active products (both Buy Now & Auction).
+    Async: under ASGI a slow client doesn't hold a worker thread.
     """
-    products = (
-        Product.objects.filter(is_active=True)
+    products = [
+        product
+        async for product in Product.objects.filter(is_active=True)
         .select_related("seller", "category")
+        .annotate(top_bid=Max("bids__amount"))
         .order_by("-created_at")
-    )
-    return render(
+    ]
+    return await sync_to_async(render)(
         request,
         "auctions/listing_list.html",
-        {"products": products},
+        {"products": products, "watched_ids": await awatched_ids(request)},
+    )
+
+
+@replica_reads
+async def ending_soon(request):
+    """
+    Active auctions ending within the hour, soonest first.
+    """
+    try:
+        products, next_cursor = await aending_soon_page(request.GET.get("cursor"))
+    except BadCursor:
+        products, next_cursor = await aending_soon_page()
+    return await sync_to_async(render)(
+        request,
+        "auctions/ending_soon.html",
+        {
+            "products": products,
+            "next_cursor": next_cursor,
+            "watched_ids": await awatched_ids(request),
+        },
     )
 
 
+@replica_reads
+async def ending_soon_json(request):
+    """
+    JSON version of the ending-soon feed, with cursor pagination.
+    """
+    try:
+        limit = min(max(int(request.GET.get("limit", 24)), 1), 100)
+        products, next_cursor = await aending_soon_page(request.GET.get("cursor"), limit)
+    except (BadCursor, ValueError):
+        return JsonResponse({"error": "Invalid cursor or limit."}, status=400)
+
+    data = {
+        "results": [
+            {
+                "id": p.pk,
+                "title": p.title,
+                "auction_end": p.auction_end.isoformat(),
+                "time_left": p.time_left_seconds,
+                "current_bid": str(p.top_bid or p.starting_bid),
+                "watch_count": p.watch_count,
+            }
+            for p in products
+        ],
+        "next_cursor": next_cursor,
+    }
+    return JsonResponse(data)
+
+
+@query_budget(queries=8)
 def auction_detail(request, pk):
     """
     Detail page for a single product (auction or buy-now).
@@ -96,16 +166,12 @@ def auction_detail(request, pk):
     product.close_if_finished()
 
     bids = (
-        product.bids.order_by("-amount", "-created_at")
+        product.bids.select_related("bidder").order_by("-amount", "-created_at")
         if product.is_auction
         else []
     )
 
-    is_watching = False
-    if request.user.is_authenticated:
-        is_watching = Watchlist.objects.filter(
-            user=request.user, product=product
-        ).exists()
+    is_watching = product.pk in watched_ids(request)
 
     context = {
         "product": product,
@@ -130,6 +196,8 @@ def product_create(request):
             product = form.save(commit=False)
             product.seller = request.user
             product.save()
+            if product.image:
+                enqueue("auctions.process_image", {"product_id": product.pk})
             messages.success(request, "Product created successfully.")
             return redirect("auctions:listing_detail", pk=product.pk)
     else:
@@ -142,11 +210,38 @@ def product_create(request):
     )
 
 
+@login_required
+def product_import(request):
+    """
+    Bulk-create listings from an uploaded CSV/JSONL file (see auctions.importing).
+    - Rows are streamed from the upload and checked with ProductForm's rules.
+    - Bad rows are listed by line; the rest are created.
+    - Images need the import_products command, which reads them from disk.
+    """
+    report = None
+    if request.method == "POST":
+        form = ProductImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data["file"]
+            report = import_products(upload.file, format_for(upload.name), request.user)
+            if report.created:
+                messages.success(request, f"Imported {report.created} listings.")
+    else:
+        form = ProductImportForm()
+
+    return render(
+        request,
+        "auctions/product_import.html",
+        {"form": form, "report": report},
+    )
+
+
 # =========================
 # BIDDING
 # =========================
 
 @login_required
+@idempotent("place_bid")
 def place_bid(request, pk):
     """
     Place a bid on an active auction.
@@ -161,6 +256,7 @@ def place_bid(request, pk):
     # refresh status if auction passed its end time
     product.close_if_finished()
     if not product.is_active:
+        BIDS.inc(outcome="rejected", reason="ended")
         messages.error(request, "This auction has already ended.")
         return redirect("auctions:listing_detail", pk=product.pk)
 
@@ -168,17 +264,20 @@ def place_bid(request, pk):
         try:
             amount = Decimal(request.POST.get("amount", "0"))
         except Exception:
+            BIDS.inc(outcome="rejected", reason="invalid_amount")
             messages.error(request, "Invalid bid amount.")
             return redirect("auctions:listing_detail", pk=product.pk)
 
         # minimum allowed = highest bid + min_increment (or starting_bid)
         min_allowed = product.starting_bid or Decimal("0")
-        current_top = product.highest_bid
+        leader = product.highest_bid_obj
+        current_top = leader.amount if leader else product.starting_bid
         if current_top is not None:
             increment = product.min_increment or Decimal("1.00")
             min_allowed = current_top + increment
 
         if amount < min_allowed:
+            BIDS.inc(outcome="rejected", reason="too_low")
             messages.error(
                 request,
                 f"Your bid must be at least {min_allowed}.",
@@ -189,6 +288,14 @@ def place_bid(request, pk):
                 bidder=request.user,
                 amount=amount,
             )
+            # watchers and the previous leader are told by a batched job
+            record_bid(
+                product,
+                request.user,
+                amount,
+                previous_leader_id=leader.bidder_id if leader else None,
+            )
+            BIDS.inc(outcome="accepted", reason="")
             messages.success(request, "Bid placed successfully!")
 
     return redirect("auctions:listing_detail", pk=product.pk)
@@ -199,11 +306,12 @@ def place_bid(request, pk):
 # =========================
 
 @login_required
+@idempotent("buy_now")
 def buy_now(request, pk):
     """
     Simple 'buy now' flow:
-      - create an Order
-      - mark product inactive
+      - claim the product with one conditional UPDATE (is_active -> False)
+      - only the buyer whose UPDATE matched a row gets an Order
       - set winner for auctions
     """
     product = get_object_or_404(
@@ -217,23 +325,36 @@ def buy_now(request, pk):
         product.close_if_finished()
 
         if not product.is_active:
+            BUY_NOW.inc(outcome="unavailable")
             messages.error(request, "This listing is no longer available.")
             return redirect("auctions:listing_detail", pk=product.pk)
 
-        Order.objects.create(
-            buyer=request.user,
-            product=product,
-            price=product.price,
-            status="COMPLETED",
-        )
-
         # Mark product inactive and, if auction, set winner.
-        product.is_active = False
+        # Only these columns are written, and only if nobody got there first.
+        now = timezone.now()
+        claim = {"is_active": False}
+        available = Product.objects.filter(pk=product.pk, is_active=True)
         if product.is_auction:
-            product.winner = request.user
-            product.closed_at = timezone.now()
-        product.save()
+            claim.update(winner=request.user, closed_at=now)
+            # a BUY listing's auction_end means nothing; an auction's is a deadline
+            available = available.filter(Q(auction_end__isnull=True) | Q(auction_end__gt=now))
+
+        with transaction.atomic():
+            claimed = available.update(**claim)
+            if claimed:
+                Order.objects.create(
+                    buyer=request.user,
+                    product=product,
+                    price=product.price,
+                    status="COMPLETED",
+                )
+
+        if not claimed:
+            BUY_NOW.inc(outcome="lost_race")
+            messages.error(request, "This listing is no longer available.")
+            return redirect("auctions:listing_detail", pk=product.pk)
 
+        BUY_NOW.inc(outcome="purchased")
         messages.success(request, "You purchased this item (demo order).")
         return redirect("auctions:listing_detail", pk=product.pk)
 
@@ -249,37 +370,61 @@ def buy_now(request, pk):
 def toggle_watchlist(request, pk):
     """
     Add or remove a product from the user's watchlist.
+    - Removing is a single DELETE plus a counter decrement.
+    - Adding bumps Product.watch_count (404 if the product is gone) and inserts the row.
     """
-    product = get_object_or_404(Product, pk=pk)
-
-    watch_item, created = Watchlist.objects.get_or_create(
-        user=request.user,
-        product=product,
-    )
-
-    if not created:
-        # already there -> remove
-        watch_item.delete()
-        messages.info(request, "Removed from your watchlist.")
-    else:
+    added = False
+    with transaction.atomic():
+        removed = Watchlist.objects.filter(
+            user=request.user, product_id=pk
+        ).delete()[0]
+        if removed:
+            # never below zero, even if the count drifted (see recount_watch_counts)
+            Product.objects.filter(pk=pk, watch_count__gt=0).update(
+                watch_count=F("watch_count") - 1
+            )
+        else:
+            added = True
+            try:
+                with transaction.atomic():
+                    if not Product.objects.filter(pk=pk).update(watch_count=F("watch_count") + 1):
+                        raise Http404("No such product.")
+                    Watchlist.objects.create(user=request.user, product_id=pk)
+            except IntegrityError:
+                # a concurrent request added it first; the savepoint undid our bump
+                pass
+
+    forget_watched_ids(request)
+    if added:
         messages.success(request, "Added to your watchlist.")
+    else:
+        messages.info(request, "Removed from your watchlist.")
 
-    return redirect("auctions:listing_detail", pk=product.pk)
+    return redirect("auctions:listing_detail", pk=pk)
 
 
 # =========================
 # STATUS JSON (for AJAX / polling)
 # =========================
 
-def product_status_json(request, pk):
+@replica_reads
+async def product_status_json(request, pk):
     """
-    Small JSON endpoint with live status.
-    Can be used later by JS polling if you want.
+    Small JSON endpoint with live status, polled by the detail page.
+    One query: the top bid is annotated and the winner joined in.
     """
-    product = get_object_or_404(Product, pk=pk)
-    product.close_if_finished()
+    product = await aget_object_or_404(
+        Product.objects.select_related("winner").annotate(top_bid=Max("bids__amount")),
+        pk=pk,
+    )
+    if product.is_active and product.auction_end and timezone.now() >= product.auction_end:
+        # the rare poll that closes the auction takes the sync path
+        await sync_to_async(product.close_if_finished)()
 
     highest = product.highest_bid
+    if highest is not None:
+        # SQLite hands back Max() unquantized (7 rather than 7.00)
+        highest = highest.quantize(Decimal("0.01"))
     data = {
         "id": product.pk,
         "is_active": product.is_active,
@@ -291,16 +436,20 @@ def product_status_json(request, pk):
     return JsonResponse(data)
 
 @login_required
+@query_budget(queries=4)
 def my_watchlist(request):
     """
     Show all products the current user has added to their watchlist.
     """
-    items = (
+    items = list(
         Watchlist.objects
         .filter(user=request.user)
         .select_related("product", "product__seller")
+        .annotate(top_bid=Max("product__bids__amount"))
         .order_by("-created_at")
     )
+    for item in items:
+        item.product.top_bid = item.top_bid
 
     return render(
         request,
@@ -328,6 +477,8 @@ def product_edit(request, pk):
             # keep the original seller
             obj.seller = product.seller
             obj.save()
+            if "image" in form.changed_data and obj.image:
+                enqueue("auctions.process_image", {"product_id": obj.pk})
             messages.success(request, "Product updated successfully.")
             return redirect("auctions:listing_detail", pk=obj.pk)
     else:
@@ -0,0 +1,87 @@
+# auctions/watching.py
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Product, Watchlist
+
+WATCHED_IDS_TTL = getattr(settings, "WATCHED_IDS_TTL", 300)
+
+
+def _cache_key(user_id):
+    return f"auctions:watched:{user_id}"
+
+
+def watched_ids(request):
+    """
+    Ids of products the current user watches.
+    - Loaded at most once per request (memoized on the request) and shared
+      between requests through the cache.
+    - Lets list/detail pages mark watched cards without a query per card.
+    """
+    if not request.user.is_authenticated:
+        return frozenset()
+
+    ids = getattr(request, "_watched_ids", None)
+    if ids is None:
+        key = _cache_key(request.user.pk)
+        ids = cache.get(key)
+        if ids is None:
+            ids = frozenset(
+                Watchlist.objects
+                .filter(user=request.user)
+                .values_list("product_id", flat=True)
+            )
+            cache.set(key, ids, WATCHED_IDS_TTL)
+        request._watched_ids = ids
+    return ids
+
+
+def _request_user(request):
+    # loads the lazy request.user off the event loop, so the template's
+    # context processors reuse it instead of querying for it again
+    return request.user if request.user.is_authenticated else None
+
+
+async def awatched_ids(request):
+    """Async watched_ids, sharing the same memo and cache entry."""
+    user = await sync_to_async(_request_user)(request)
+    if user is None:
+        return frozenset()
+
+    ids = getattr(request, "_watched_ids", None)
+    if ids is None:
+        key = _cache_key(user.pk)
+        ids = await cache.aget(key)
+        if ids is None:
+            ids = frozenset([
+                product_id
+                async for product_id in Watchlist.objects
+                .filter(user=user)
+                .values_list("product_id", flat=True)
+            ])
+            await cache.aset(key, ids, WATCHED_IDS_TTL)
+        request._watched_ids = ids
+    return ids
+
+
+def forget_watched_ids(request):
+    """Drop the cached set after the user's watchlist changed."""
+    cache.delete(_cache_key(request.user.pk))
+    request.__dict__.pop("_watched_ids", None)
+
+
+def recount_watch_counts(products=None):
+    """
+    Reset Product.watch_count from the Watchlist rows, for ``products``
+    (a queryset; default all) in one UPDATE. Returns the number of products.
+    """
+    counts = (
+        Watchlist.objects.filter(product=OuterRef("pk"))
+        .values("product").annotate(n=Count("pk")).values("n")
+    )
+    products = Product.objects.all() if products is None else products
+    return products.update(watch_count=Coalesce(Subquery(counts), 0))
@@ -0,0 +1,3 @@
+"""
+Load/benchmark suite for the hot endpoints (see ``python -m benchmarks --help``).
+"""
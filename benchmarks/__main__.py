@@ -0,0 +1,181 @@
+"""
+Benchmark the hot endpoints and compare runs.
+
+    python -m benchmarks run --out var/baseline.json
+    python -m benchmarks run --baseline var/baseline.json
+    python -m benchmarks compare var/baseline.json var/bench.json
+    python -m benchmarks concurrency --scenario status_poll --clients 2000 --rate 150
+    python -m benchmarks admission --readers 4000 --bidders 200 --rate 400
+
+``concurrency`` puts many slow clients on one endpoint, first through the
+WSGI app on a fixed thread pool, then through the ASGI app on one event
+loop, and reports throughput, p50/p99 latency and peak thread count.
+
+``admission`` floods the listing page with anonymous reads while bids
+come in, once without admission control and once with it, and reports
+p50/p99 latency and status codes for reads and bids separately.
+
+In-process runs go through django.test.Client against var/bench.sqlite3
+(created and migrated on first use). To measure a real server instead:
+
+    python -m benchmarks setup
+    DJANGO_SETTINGS_MODULE=benchmarks.settings python manage.py runserver --noreload
+    python -m benchmarks run --url http://127.0.0.1:8000
+"""
+
+import argparse
+import json
+import os
+import sys
+
+
+def _setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+    import django
+
+    django.setup()
+
+
+def _dataset(args):
+    from django.core.management import call_command
+
+    from . import fixtures
+
+    call_command("migrate", verbosity=0)
+    return fixtures.build(users=args.users, auctions=args.auctions)
+
+
+def _load(path):
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def _write(output, path):
+    if path:
+        with open(path, "w") as fh:
+            fh.write(output + "\n")
+    else:
+        print(output)
+
+
+def _report_regressions(baseline, report, tolerance):
+    from .runner import compare
+
+    regressions = compare(baseline, report, tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    if not regressions:
+        print("No regressions against the baseline.", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("setup", "run", "concurrency", "admission"):
+        p = sub.add_parser(name)
+        p.add_argument("--users", type=int, default=50)
+        p.add_argument("--auctions", type=int, default=200)
+
+    run = sub.choices["run"]
+    run.add_argument("--scenario", action="append", dest="scenarios",
+                     help="Scenario to run (repeatable, default: all).")
+    run.add_argument("--requests", type=int, default=200, help="Requests per scenario.")
+    run.add_argument("--concurrency", type=int, default=8)
+    run.add_argument("--bidders", type=int, default=16,
+                     help="Concurrent bidders for place_bid.")
+    run.add_argument("--url", help="Benchmark a running server instead of in-process.")
+    run.add_argument("--out", help="Write the JSON report here (default: stdout).")
+    run.add_argument("--baseline", help="Compare against this report; exit 1 on regressions.")
+    run.add_argument("--tolerance", type=float, default=0.2)
+
+    conc = sub.choices["concurrency"]
+    conc.add_argument("--scenario", default="status_poll",
+                      help="Anonymous GET scenario to hit (default: status_poll).")
+    conc.add_argument("--mode", action="append", dest="modes", choices=["wsgi", "asgi"],
+                      help="Server model to run (repeatable, default: both).")
+    conc.add_argument("--clients", type=int, default=500, help="Simultaneous clients.")
+    conc.add_argument("--workers", type=int, default=16, help="WSGI worker threads.")
+    conc.add_argument("--drain-ms", type=int, default=200,
+                      help="How long each client takes to read its response.")
+    conc.add_argument("--rate", type=float, default=0,
+                      help="Client arrivals per second (default: all at once).")
+    conc.add_argument("--out", help="Write the JSON report here (default: stdout).")
+
+    adm = sub.choices["admission"]
+    adm.add_argument("--readers", type=int, default=2000, help="Anonymous listing-page reads.")
+    adm.add_argument("--bidders", type=int, default=200, help="Bids mixed into the reads.")
+    adm.add_argument("--workers", type=int, default=32, help="WSGI worker threads.")
+    adm.add_argument("--rate", type=float, default=400,
+                     help="Client arrivals per second (0: all at once).")
+    adm.add_argument("--out", help="Write the JSON report here (default: stdout).")
+
+    cmp = sub.add_parser("compare")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--tolerance", type=float, default=0.2)
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        _setup_django()
+        return _report_regressions(_load(args.baseline), _load(args.current), args.tolerance)
+
+    _setup_django()
+    data = _dataset(args)
+    if args.command == "setup":
+        print(f"{len(data.users)} users, {len(data.auctions)} auctions, {len(data.skus)} SKUs ready.")
+        return 0
+
+    if args.command == "concurrency":
+        from .concurrency import MODES, run_concurrency
+
+        report = {
+            mode: run_concurrency(
+                args.scenario, data, mode,
+                clients=args.clients, workers=args.workers, drain_ms=args.drain_ms,
+                rate=args.rate,
+            )
+            for mode in args.modes or MODES
+        }
+        _write(json.dumps(report, indent=2), args.out)
+        return 0
+
+    if args.command == "admission":
+        from .admission import run_admission
+
+        report = {
+            ("on" if admission else "off"): run_admission(
+                data, admission,
+                readers=args.readers, bidders=args.bidders, workers=args.workers, rate=args.rate,
+            )
+            for admission in (False, True)
+        }
+        _write(json.dumps(report, indent=2), args.out)
+        return 0
+
+    from .runner import run as run_benchmarks
+    from .scenarios import registry
+
+    scenarios = args.scenarios or list(registry)
+    unknown = set(scenarios) - set(registry)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    report = run_benchmarks(
+        data,
+        scenarios,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        bidders=args.bidders,
+        url=args.url,
+    )
+    _write(json.dumps(report, indent=2), args.out)
+
+    if args.baseline:
+        return _report_regressions(_load(args.baseline), report, args.tolerance)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+# benchmarks/admission.py
+
+import io
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.wsgi import get_wsgi_application
+from django.test import Client, override_settings
+
+from .runner import _round, percentile
+
+# any 32 alphanumerics are a valid CSRF secret; the header repeats the cookie
+CSRF_TOKEN = "b" * 32
+READ_PATH = "/auctions/"
+
+
+def _environ(method, path, cookies="", body=b""):
+    environ = {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "REMOTE_ADDR": "127.0.0.1",
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+    }
+    if cookies:
+        environ["HTTP_COOKIE"] = cookies
+    if body:
+        environ["CONTENT_TYPE"] = "application/x-www-form-urlencoded"
+        environ["CONTENT_LENGTH"] = str(len(body))
+        environ["HTTP_X_CSRFTOKEN"] = CSRF_TOKEN
+    return environ
+
+
+def _bidder_cookies(user_ids):
+    """A ``Cookie`` header per bench user, each with a logged-in session."""
+    cookies = []
+    for user in User.objects.filter(pk__in=user_ids).order_by("pk"):
+        client = Client()
+        client.force_login(user)
+        session = client.cookies[settings.SESSION_COOKIE_NAME].value
+        cookies.append(
+            f"{settings.SESSION_COOKIE_NAME}={session}; {settings.CSRF_COOKIE_NAME}={CSRF_TOKEN}"
+        )
+    return cookies
+
+
+def _arrivals(data, readers, bidders):
+    """``(kind, environ)`` for every client, bids spread evenly through the reads."""
+    cookies = _bidder_cookies(data.users)
+    every = max((readers + bidders) // max(bidders, 1), 1)
+    bids = 0
+    for n in range(readers + bidders):
+        if bids < bidders and n % every == 0:
+            body = f"amount={20_000 + bids}".encode()
+            path = f"/auctions/{data.hot_auction}/bid/"
+            yield "bid", _environ("POST", path, cookies[bids % len(cookies)], body)
+            bids += 1
+        else:
+            yield "read", _environ("GET", READ_PATH)
+
+
+def _serve(app, arrivals, workers, rate):
+    def client(kind, environ, queued):
+        status, headers = [], []
+
+        def start_response(s, response_headers):
+            status.append(int(s[:3]))
+            headers.extend(response_headers)
+
+        body = app(environ, start_response)
+        try:
+            for _ in body:
+                pass
+        finally:
+            body.close()
+        stale = ("X-Stale", "1") in headers
+        return kind, status[0], stale, time.perf_counter() - queued
+
+    started = time.perf_counter()
+    futures = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for n, (kind, environ) in enumerate(arrivals):
+            if rate:
+                time.sleep(max(started + n / rate - time.perf_counter(), 0))
+            futures.append(pool.submit(client, kind, environ, time.perf_counter()))
+        return [f.result() for f in futures]
+
+
+def run_admission(data, admission=True, readers=2000, bidders=200, workers=32, rate=400):
+    """
+    A read spike with bids mixed in, through the WSGI app on a fixed pool
+    of ``workers`` threads: ``readers`` anonymous listing-page GETs and
+    ``bidders`` logged-in bids on the hot lot, arriving ``rate`` per
+    second (0: all at once). ``admission=False`` runs the same load with
+    ADMISSION_CLASSES = {}. Latency runs from arrival, so time queued for
+    a worker counts. Returns the summary dict for the report.
+    """
+    arrivals = list(_arrivals(data, readers, bidders))
+    overrides = {} if admission else {"ADMISSION_CLASSES": {}}
+    started = time.perf_counter()
+    with override_settings(**overrides):
+        # a fresh app, so the middleware reads the settings above
+        results = _serve(get_wsgi_application(), arrivals, workers, rate)
+    wall = time.perf_counter() - started
+
+    by_kind = defaultdict(list)
+    for kind, status, stale, elapsed in results:
+        by_kind[kind].append((status, stale, elapsed))
+    classes = {}
+    for kind, rows in sorted(by_kind.items()):
+        latencies = sorted(elapsed * 1000 for _, _, elapsed in rows)
+        classes[kind] = {
+            "requests": len(rows),
+            "status": {str(status): n for status, n in sorted(Counter(s for s, _, _ in rows).items())},
+            "stale": sum(1 for _, stale, _ in rows if stale),
+            "latency_ms": {
+                "p50": _round(percentile(latencies, 50)),
+                "p99": _round(percentile(latencies, 99)),
+                "max": _round(latencies[-1] if latencies else None),
+            },
+        }
+    return {
+        "admission": admission,
+        "workers": workers,
+        "arrival_rate": rate or None,
+        "throughput_rps": round(len(results) / wall, 2) if wall else None,
+        "classes": classes,
+    }
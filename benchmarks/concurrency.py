@@ -0,0 +1,185 @@
+# benchmarks/concurrency.py
+
+import asyncio
+import io
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
+
+from .runner import _round, percentile
+from .scenarios import registry
+
+MODES = ("wsgi", "asgi")
+
+
+class ThreadPeak:
+    """Samples threading.active_count() in the background; ``peak`` is the max seen."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = threading.active_count()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._done.wait(self.interval):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._done.set()
+        self._thread.join()
+
+
+def _environ(path, query):
+    return {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+    }
+
+
+def _scope(path, query):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": [(b"host", b"localhost")],
+        "server": ("localhost", 80),
+        "client": ("127.0.0.1", 50000),
+    }
+
+
+def _requests(name, data, clients):
+    login, step, _ = registry[name]
+    if login:
+        raise ValueError(f"{name} needs a login; pick an anonymous GET scenario")
+    for n in range(clients):
+        method, path, params = step(data, n)
+        if method != "GET":
+            raise ValueError(f"{name} is not a GET scenario")
+        yield path, urlencode(params or {})
+
+
+def run_wsgi(name, data, clients, workers, drain, rate):
+    """
+    The WSGI app on a fixed pool of ``workers`` threads, as a threaded
+    server runs it. Every client reads its response slowly (``drain``
+    seconds), which keeps the worker thread busy until it is done.
+    """
+    app = get_wsgi_application()
+
+    def client(path, query, queued):
+        status = []
+        body = app(_environ(path, query), lambda s, headers: status.append(int(s[:3])))
+        try:
+            for _ in body:
+                pass
+            time.sleep(drain)
+        finally:
+            body.close()
+        return status[0], time.perf_counter() - queued
+
+    started = time.perf_counter()
+    futures = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for n, (path, query) in enumerate(_requests(name, data, clients)):
+            if rate:
+                time.sleep(max(started + n / rate - time.perf_counter(), 0))
+            futures.append(pool.submit(client, path, query, time.perf_counter()))
+        return [f.result() for f in futures]
+
+
+def run_asgi(name, data, clients, drain, rate):
+    """
+    The ASGI app for every client at once on one event loop. Each client
+    drains its response just as slowly, but the wait is an ``await``, so
+    no thread is held while the bytes go out.
+    """
+    app = get_asgi_application()
+
+    async def client(n, path, query):
+        if rate:
+            await asyncio.sleep(n / rate)
+        queued = time.perf_counter()
+        status = []
+        received = False
+
+        async def receive():
+            nonlocal received
+            if received:
+                # the app only asks again to watch for a disconnect
+                await asyncio.Event().wait()
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+            elif not message.get("more_body"):
+                await asyncio.sleep(drain)
+
+        await app(_scope(path, query), receive, send)
+        return status[0], time.perf_counter() - queued
+
+    async def main():
+        return await asyncio.gather(
+            *(client(n, path, query) for n, (path, query) in enumerate(_requests(name, data, clients)))
+        )
+
+    return asyncio.run(main())
+
+
+def run_concurrency(name, data, mode, clients=500, workers=16, drain_ms=200, rate=0):
+    """
+    ``clients`` slow clients against one scenario in one mode, arriving
+    ``rate`` per second (0: all at once). Latency runs from arrival to the
+    last byte read, so time spent queued for a worker counts. Returns the
+    summary dict for the report.
+    """
+    drain = drain_ms / 1000
+    started = time.perf_counter()
+    with ThreadPeak() as threads:
+        if mode == "wsgi":
+            results = run_wsgi(name, data, clients, workers, drain, rate)
+        else:
+            results = run_asgi(name, data, clients, drain, rate)
+    wall = time.perf_counter() - started
+
+    latencies = sorted(elapsed * 1000 for _, elapsed in results)
+    return {
+        "mode": mode,
+        "clients": clients,
+        "workers": workers if mode == "wsgi" else None,
+        "drain_ms": drain_ms,
+        "arrival_rate": rate or None,
+        "errors": sum(1 for status, _ in results if status >= 500),
+        "status": {str(status): n for status, n in sorted(Counter(s for s, _ in results).items())},
+        "throughput_rps": round(len(results) / wall, 2) if wall else None,
+        "latency_ms": {
+            "p50": _round(percentile(latencies, 50)),
+            "p99": _round(percentile(latencies, 99)),
+            "max": _round(latencies[-1] if latencies else None),
+        },
+        "peak_threads": threads.peak,
+    }
@@ -0,0 +1,115 @@
+# benchmarks/fixtures.py
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from auctions.models import Bid, Product as Listing
+from catalog.models import Category, Product
+
+PASSWORD = "bench"
+PREFIX = "bench-"
+
+
+class Dataset:
+    """Primary keys the scenarios pick from."""
+
+    def __init__(self, users, auctions, hot_auction, skus):
+        self.users = users
+        self.auctions = auctions
+        self.hot_auction = hot_auction
+        self.skus = skus
+
+
+def build(users=50, auctions=200, buy_now=100, skus=20, bids_per_auction=5):
+    """
+    Create the benchmark dataset, or reuse it if an earlier run left one.
+    - ``users`` bidders/buyers named bench-0..N, all with password "bench".
+    - ``auctions`` open auctions with a short bid ladder each, plus one hot
+      auction that the place_bid scenario hammers.
+    - ``buy_now`` listings and ``skus`` catalog products with effectively
+      unlimited stock for the cart and checkout scenarios.
+    """
+    if not User.objects.filter(username=f"{PREFIX}0").exists():
+        _create(users, auctions, buy_now, skus, bids_per_auction)
+    return load()
+
+
+def load():
+    user_ids = list(
+        User.objects.filter(username__startswith=PREFIX)
+        .order_by("pk").values_list("pk", flat=True)
+    )
+    auction_ids = list(
+        Listing.objects.filter(title__startswith="Bench lot", is_active=True)
+        .order_by("pk").values_list("pk", flat=True)
+    )
+    hot = Listing.objects.filter(title="Bench hot lot").values_list("pk", flat=True).first()
+    sku_ids = list(
+        Product.objects.filter(slug__startswith="bench-sku-")
+        .order_by("pk").values_list("pk", flat=True)
+    )
+    return Dataset(user_ids, auction_ids, hot, sku_ids)
+
+
+def _create(users, auctions, buy_now, skus, bids_per_auction):
+    password = make_password(PASSWORD)
+    people = User.objects.bulk_create([
+        User(username=f"{PREFIX}{n}", password=password) for n in range(users)
+    ])
+    seller = User.objects.create_user(f"{PREFIX}seller", password=PASSWORD)
+
+    end = timezone.now() + timedelta(days=30)
+    lots = Listing.objects.bulk_create(
+        [
+            Listing(
+                seller=seller,
+                title=f"Bench lot {n}",
+                price=1000,
+                listing_type="BID",
+                starting_bid=100,
+                min_increment=1,
+                auction_end=end,
+            )
+            for n in range(auctions)
+        ]
+        + [
+            Listing(
+                seller=seller,
+                title="Bench hot lot",
+                price=1000,
+                listing_type="BID",
+                starting_bid=100,
+                min_increment=1,
+                auction_end=end,
+            )
+        ]
+        + [
+            Listing(seller=seller, title=f"Bench item {n}", price=500, listing_type="BUY")
+            for n in range(buy_now)
+        ],
+        batch_size=500,
+    )
+    Bid.objects.bulk_create(
+        [
+            Bid(product=lot, bidder=people[(i + step) % len(people)], amount=Decimal(100 + step * 5))
+            for i, lot in enumerate(lots[:auctions])
+            for step in range(1, bids_per_auction + 1)
+        ],
+        batch_size=1000,
+    )
+
+    category, _ = Category.objects.get_or_create(name="Benchmark", slug="benchmark")
+    Product.objects.bulk_create([
+        Product(
+            category=category,
+            title=f"Bench SKU {n}",
+            slug=f"bench-sku-{n}",
+            price=250,
+            stock=10_000_000,
+        )
+        for n in range(skus)
+    ])
@@ -0,0 +1,221 @@
+# benchmarks/runner.py
+
+import itertools
+import math
+import platform
+import threading
+import time
+from collections import Counter
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, Request, build_opener
+
+import django
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+
+from .fixtures import PASSWORD
+from .scenarios import registry
+
+
+def _queries(headers):
+    value = headers.get("X-DB-Queries")
+    return int(value) if value else None
+
+
+class InProcessSession:
+    """Drives the app through django.test.Client: no server, no sockets."""
+
+    def __init__(self, user_id=None):
+        self.client = Client()
+        if user_id is not None:
+            self.client.force_login(User.objects.get(pk=user_id))
+
+    def request(self, method, path, params=None):
+        if method == "POST":
+            response = self.client.post(path, params or {})
+        else:
+            response = self.client.get(path, params or {})
+        return response.status_code, _queries(response)
+
+
+class _NoRedirect(HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpSession:
+    """
+    Drives a running server (runserver, gunicorn, uvicorn) over HTTP.
+    Keeps its own cookie jar and sends the CSRF token on POSTs.
+    """
+
+    def __init__(self, base_url, user_id=None):
+        self.base_url = base_url.rstrip("/")
+        self.jar = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.jar), _NoRedirect)
+        if user_id is not None:
+            self._login(User.objects.values_list("username", flat=True).get(pk=user_id))
+
+    def _login(self, username):
+        self.request("GET", "/accounts/login/")
+        status, _ = self.request(
+            "POST", "/accounts/login/", {"username": username, "password": PASSWORD}
+        )
+        if status != 302:
+            raise RuntimeError(f"Could not log in as {username} (HTTP {status})")
+
+    def _csrf_token(self):
+        return next((c.value for c in self.jar if c.name == "csrftoken"), "")
+
+    def request(self, method, path, params=None):
+        url = self.base_url + path
+        body = None
+        if method == "POST":
+            body = urlencode(params or {}).encode()
+        elif params:
+            url += "?" + urlencode(params)
+        req = Request(url, data=body, method=method)
+        if method == "POST":
+            req.add_header("X-CSRFToken", self._csrf_token())
+            req.add_header("Referer", url)
+        try:
+            with self.opener.open(req, timeout=30) as response:
+                response.read()
+                return response.status, _queries(response.headers)
+        except HTTPError as exc:
+            exc.read()
+            return exc.code, _queries(exc.headers)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def run_scenario(name, data, requests=200, concurrency=8, url=None):
+    """
+    Fire ``requests`` requests of one scenario from ``concurrency`` workers,
+    each with its own session. Returns the summary dict for the report.
+    """
+    login, step, prepare = registry[name]
+    counter = itertools.count()
+    latencies = []
+    statuses = Counter()
+    queries = []
+    lock = threading.Lock()
+
+    def worker(index):
+        user_id = data.users[index % len(data.users)] if login else None
+        session = HttpSession(url, user_id) if url else InProcessSession(user_id)
+        while True:
+            n = next(counter)
+            if n >= requests:
+                return
+            if prepare:
+                prepare(session, data, n)
+            method, path, params = step(data, n)
+            started = time.perf_counter()
+            try:
+                status, count = session.request(method, path, params)
+            except (URLError, OSError):
+                status, count = 0, None
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed * 1000)
+                statuses[status] += 1
+                if count is not None:
+                    queries.append(count)
+
+    def threaded_worker(index):
+        try:
+            worker(index)
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    if concurrency == 1:
+        # same thread as the caller, so it also works inside a TestCase
+        worker(0)
+    else:
+        threads = [
+            threading.Thread(target=threaded_worker, args=(i,)) for i in range(concurrency)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "errors": sum(n for status, n in statuses.items() if status == 0 or status >= 500),
+        "status": {str(status): n for status, n in sorted(statuses.items())},
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else None,
+        "latency_ms": {
+            "p50": _round(percentile(latencies, 50)),
+            "p95": _round(percentile(latencies, 95)),
+            "p99": _round(percentile(latencies, 99)),
+            "max": _round(latencies[-1] if latencies else None),
+        },
+        "queries_per_request": _round(sum(queries) / len(queries)) if queries else None,
+    }
+
+
+def _round(value):
+    return round(value, 2) if value is not None else None
+
+
+def run(data, scenarios, requests=200, concurrency=8, bidders=16, url=None):
+    report = {
+        "meta": {
+            "target": url or "in-process",
+            "started_at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+        },
+        "scenarios": {},
+    }
+    for name in scenarios:
+        report["scenarios"][name] = run_scenario(
+            name,
+            data,
+            requests=requests,
+            concurrency=bidders if name == "place_bid" else concurrency,
+            url=url,
+        )
+    return report
+
+
+def compare(baseline, current, tolerance=0.2):
+    """
+    Regressions of ``current`` against ``baseline`` (both run() reports):
+    p95 latency or throughput worse by more than ``tolerance``, more queries
+    per request, or more errors. Returns a list of human-readable lines.
+    """
+    regressions = []
+    for name, cur in current["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if not base:
+            continue
+        base_p95, cur_p95 = base["latency_ms"]["p95"], cur["latency_ms"]["p95"]
+        if base_p95 and cur_p95 and cur_p95 > base_p95 * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base_p95}ms -> {cur_p95}ms")
+        base_rps, cur_rps = base["throughput_rps"], cur["throughput_rps"]
+        if base_rps and cur_rps is not None and cur_rps < base_rps * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base_rps} -> {cur_rps} req/s")
+        base_q, cur_q = base["queries_per_request"], cur["queries_per_request"]
+        if base_q is not None and cur_q is not None and cur_q > base_q + 0.5:
+            regressions.append(f"{name}: queries/request {base_q} -> {cur_q}")
+        if cur["errors"] > base["errors"]:
+            regressions.append(f"{name}: errors {base['errors']} -> {cur['errors']}")
+    return regressions
@@ -0,0 +1,65 @@
+# benchmarks/scenarios.py
+
+# name -> (needs_login, step, prepare)
+registry = {}
+
+
+def scenario(name, login=False, prepare=None):
+    """
+    Register a benchmark scenario.
+    - ``step(data, n)`` returns the ``(method, path, params)`` of request ``n``;
+      only this request is timed.
+    - ``prepare(session, data, n)``, if given, runs first on the same session
+      (e.g. filling a cart before checkout) and is not timed.
+    - ``login`` gives every worker its own logged-in bench user.
+    """
+
+    def decorator(step):
+        registry[name] = (login, step, prepare)
+        return step
+
+    return decorator
+
+
+def _pick(ids, n):
+    return ids[n % len(ids)]
+
+
+@scenario("auction_list")
+def auction_list(data, n):
+    return "GET", "/auctions/", None
+
+
+@scenario("auction_detail")
+def auction_detail(data, n):
+    return "GET", f"/auctions/{_pick(data.auctions, n)}/", None
+
+
+@scenario("place_bid", login=True)
+def place_bid(data, n):
+    # every bidder goes after the same lot with a rising amount; a few lose the race
+    return "POST", f"/auctions/{data.hot_auction}/bid/", {"amount": str(10_000 + n)}
+
+
+@scenario("status_poll")
+def status_poll(data, n):
+    return "GET", f"/auctions/{_pick(data.auctions, n)}/status/", None
+
+
+@scenario("add_to_cart", login=True)
+def add_to_cart(data, n):
+    return "POST", f"/cart/add/{_pick(data.skus, n)}/", None
+
+
+def _fill_cart(session, data, n):
+    session.request(*add_to_cart(data, n))
+
+
+@scenario("checkout", login=True, prepare=_fill_cart)
+def checkout(data, n):
+    return "POST", "/orders/checkout/", None
+
+
+@scenario("ending_soon_feed")
+def ending_soon_feed(data, n):
+    return "GET", "/auctions/ending-soon/json/", None
@@ -0,0 +1,40 @@
+"""
+Settings for ``python -m benchmarks``: one local SQLite file, no replica,
+query counts in response headers. Start a server against the same file with
+
+    DJANGO_SETTINGS_MODULE=benchmarks.settings python manage.py runserver --noreload
+"""
+
+import os
+
+from config.settings import *  # noqa: F401,F403
+from config.settings import BASE_DIR
+
+(BASE_DIR / 'var').mkdir(exist_ok=True)
+
+DEBUG = False
+ALLOWED_HOSTS = ['localhost', '127.0.0.1', 'testserver']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('BENCH_DB', str(BASE_DIR / 'var' / 'bench.sqlite3')),
+        # concurrent bidders queue on SQLite's writer lock instead of failing
+        'OPTIONS': {'timeout': 30},
+    }
+}
+REPLICA_DATABASE = None
+
+QUERY_COUNT_HEADERS = True
+# every in-process client is 127.0.0.1 and a bench user bids flat out
+RATE_LIMITS = {}
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+EMAIL_BACKEND = 'django.core.mail.backends.dummy.EmailBackend'
+NOTIFICATIONS_SINK = 'none'
+
+# the report already has queries per request; keep budget warnings off the console
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'loggers': {'core.querybudget': {'level': 'ERROR'}},
+}
@@ -0,0 +1,67 @@
+import copy
+
+from django.test import TestCase, TransactionTestCase
+
+from auctions.models import Bid
+
+from . import fixtures
+from .admission import run_admission
+from .concurrency import MODES, run_concurrency
+from .runner import compare, percentile, run
+from .scenarios import registry
+
+
+class BenchmarkSuiteTests(TestCase):
+    def test_every_scenario_runs_in_process(self):
+        data = fixtures.build(users=3, auctions=5, buy_now=2, skus=2)
+        report = run(data, list(registry), requests=3, concurrency=1, bidders=1)
+        for name, result in report["scenarios"].items():
+            self.assertEqual(result["requests"], 3, name)
+            self.assertEqual(result["errors"], 0, name)
+            self.assertIsNotNone(result["latency_ms"]["p99"], name)
+        self.assertEqual(report["scenarios"]["checkout"]["status"], {"302": 3})
+
+    def test_compare_flags_regressions(self):
+        scenario = {
+            "errors": 0,
+            "throughput_rps": 100.0,
+            "latency_ms": {"p50": 5.0, "p95": 10.0, "p99": 12.0, "max": 20.0},
+            "queries_per_request": 3.0,
+        }
+        baseline = {"scenarios": {"auction_list": scenario}}
+        current = copy.deepcopy(baseline)
+        self.assertEqual(compare(baseline, current), [])
+
+        current["scenarios"]["auction_list"]["latency_ms"]["p95"] = 15.0
+        current["scenarios"]["auction_list"]["queries_per_request"] = 4.0
+        self.assertEqual(len(compare(baseline, current)), 2)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertIsNone(percentile([], 95))
+
+
+class ConcurrencyBenchmarkTests(TransactionTestCase):
+    # both modes answer from other threads' connections, so no wrapping transaction
+
+    def test_both_modes_serve_every_client(self):
+        data = fixtures.build(users=2, auctions=3, buy_now=1, skus=1)
+        for mode in MODES:
+            result = run_concurrency("status_poll", data, mode, clients=6, workers=2, drain_ms=1)
+            self.assertEqual(result["status"], {"200": 6}, mode)
+            self.assertIsNotNone(result["latency_ms"]["p99"], mode)
+            self.assertGreaterEqual(result["peak_threads"], 1, mode)
+
+
+class AdmissionBenchmarkTests(TransactionTestCase):
+    def test_reads_and_bids_are_reported_separately(self):
+        data = fixtures.build(users=2, auctions=3, buy_now=1, skus=1)
+        for admission in (False, True):
+            result = run_admission(data, admission, readers=6, bidders=2, workers=2, rate=0)
+            self.assertEqual(result["classes"]["bid"]["status"], {"302": 2}, admission)
+            self.assertEqual(result["classes"]["read"]["requests"], 6, admission)
+            self.assertIsNotNone(result["classes"]["bid"]["latency_ms"]["p99"], admission)
+        # the bidders were logged in and passed the CSRF check
+        self.assertTrue(Bid.objects.filter(product_id=data.hot_auction, amount__gte=20_000).exists())
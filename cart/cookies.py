@@ -0,0 +1,120 @@
+# cart/cookies.py
+
+from django.conf import settings
+from django.db import transaction
+
+from catalog.models import Product
+from .models import CartItem
+
+CART_COOKIE_NAME = getattr(settings, "CART_COOKIE_NAME", "cart")
+CART_COOKIE_AGE = getattr(settings, "CART_COOKIE_AGE", 60 * 60 * 24 * 14)
+CART_COOKIE_SALT = "cart.cookie"
+
+# keep the cookie well under the 4KB browser limit
+MAX_LINES = 50
+MAX_QUANTITY = 99
+
+
+class CookieCart:
+    """
+    Cart for anonymous visitors, kept entirely in a signed cookie.
+    - Stored compactly as "product_id:qty,product_id:qty".
+    - Reading and changing it never touches the database.
+    - Written back to the response by CookieCartMiddleware when modified.
+    """
+
+    def __init__(self, request):
+        self.lines = self._load(request)
+        self.modified = False
+
+    @staticmethod
+    def _load(request):
+        raw = request.get_signed_cookie(
+            CART_COOKIE_NAME, default="", salt=CART_COOKIE_SALT
+        )
+        lines = {}
+        for part in raw.split(","):
+            pid, _, qty = part.partition(":")
+            if pid.isdigit() and qty.isdigit() and int(qty) > 0:
+                lines[int(pid)] = min(int(qty), MAX_QUANTITY)
+        return lines
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __bool__(self):
+        return bool(self.lines)
+
+    def add(self, product_id, quantity=1):
+        if product_id not in self.lines and len(self.lines) >= MAX_LINES:
+            return False
+        self.lines[product_id] = min(
+            self.lines.get(product_id, 0) + quantity, MAX_QUANTITY
+        )
+        self.modified = True
+        return True
+
+    def remove(self, product_id):
+        if self.lines.pop(product_id, None) is not None:
+            self.modified = True
+
+    def clear(self):
+        if self.lines:
+            self.lines = {}
+            self.modified = True
+
+    def dumps(self):
+        return ",".join(f"{pid}:{qty}" for pid, qty in self.lines.items())
+
+    def save(self, response):
+        if not self.modified:
+            return
+        if self.lines:
+            response.set_signed_cookie(
+                CART_COOKIE_NAME,
+                self.dumps(),
+                salt=CART_COOKIE_SALT,
+                max_age=CART_COOKIE_AGE,
+                httponly=True,
+                samesite="Lax",
+            )
+        else:
+            response.delete_cookie(CART_COOKIE_NAME, samesite="Lax")
+        self.modified = False
+
+
+def merge_into_user_cart(user, lines):
+    """
+    Merge anonymous cart lines into the user's CartItem rows.
+    - One read for products that still exist, one for rows the user already has.
+    - Existing rows get their quantities bumped with a single bulk_update.
+    - New rows go in with a single bulk_create (ignoring concurrent duplicates).
+    """
+    if not lines:
+        return
+
+    valid_ids = set(
+        Product.objects
+        .filter(pk__in=lines.keys(), is_active=True)
+        .values_list("pk", flat=True)
+    )
+    if not valid_ids:
+        return
+
+    with transaction.atomic():
+        existing = list(
+            CartItem.objects.filter(user=user, product_id__in=valid_ids)
+        )
+        for item in existing:
+            item.quantity += lines[item.product_id]
+        if existing:
+            CartItem.objects.bulk_update(existing, ["quantity"])
+
+        seen = {item.product_id for item in existing}
+        new_items = [
+            CartItem(user=user, product_id=pid, quantity=lines[pid])
+            for pid in valid_ids
+            if pid not in seen
+        ]
+        if new_items:
+            CartItem.objects.bulk_create(new_items, ignore_conflicts=True)
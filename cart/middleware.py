@@ -0,0 +1,34 @@
+# cart/middleware.py
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .cookies import CookieCart
+
+
+class CookieCartMiddleware:
+    """
+    Attach the anonymous cookie cart to every request as ``request.cookie_cart``
+    and write it back to the response only when it changed.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.cookie_cart = CookieCart(request)
+        response = self.get_response(request)
+        request.cookie_cart.save(response)
+        return response
+
+    async def __acall__(self, request):
+        request.cookie_cart = CookieCart(request)
+        response = await self.get_response(request)
+        request.cookie_cart.save(response)
+        return response
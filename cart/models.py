@@ -11,4 +11,12 @@ class CartItem(models.Model):
     class Meta:
         unique_together = ('user', 'product')
 
+    @property
+    def price(self):
+        return self.product.price
+
+    @property
+    def subtotal(self):
+        return self.product.price * self.quantity
+
 # Create your models here.
@@ -0,0 +1,19 @@
+# cart/signals.py
+
+from django.contrib.auth.signals import user_logged_in
+from django.dispatch import receiver
+
+from .cookies import merge_into_user_cart
+
+
+@receiver(user_logged_in)
+def merge_cookie_cart_on_login(sender, request, user, **kwargs):
+    """
+    Move whatever the visitor collected while anonymous into their real cart.
+    """
+    cookie_cart = getattr(request, "cookie_cart", None)
+    if not cookie_cart:
+        return
+
+    merge_into_user_cart(user, cookie_cart.lines)
+    cookie_cart.clear()
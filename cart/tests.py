@@ -1,3 +1,45 @@
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from catalog.models import Category, Product
+from .cookies import CART_COOKIE_NAME
+from .models import CartItem
+
+
+class CookieCartTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cat = Category.objects.create(name="Electronics", slug="electronics")
+        cls.p1 = Product.objects.create(category=cat, title="Mouse", slug="mouse", price=1000, stock=5)
+        cls.p2 = Product.objects.create(category=cat, title="Pad", slug="pad", price=300, stock=5)
+        cls.user = User.objects.create_user("buyer", password="pw12345!")
+
+    def test_anonymous_add_does_not_write(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("cart:add_to_cart", args=[self.p1.pk]))
+            self.client.get(reverse("cart:add_to_cart", args=[self.p1.pk]))
+        writes = [q["sql"] for q in ctx.captured_queries if not q["sql"].startswith("SELECT")]
+        self.assertEqual(writes, [])
+        self.assertIn(CART_COOKIE_NAME, self.client.cookies)
+
+        response = self.client.get(reverse("cart:cart_detail"))
+        self.assertEqual(response.context["cart_total"], 2000)
+
+    def test_tampered_cookie_is_ignored(self):
+        self.client.cookies[CART_COOKIE_NAME] = "1:5"
+        response = self.client.get(reverse("cart:cart_detail"))
+        self.assertEqual(response.context["cart_items"], [])
+
+    def test_login_merges_cookie_cart(self):
+        CartItem.objects.create(user=self.user, product=self.p1, quantity=2)
+        self.client.get(reverse("cart:add_to_cart", args=[self.p1.pk]))
+        self.client.get(reverse("cart:add_to_cart", args=[self.p2.pk]))
+
+        self.client.post(reverse("accounts:login"), {"username": "buyer", "password": "pw12345!"})
+
+        quantities = dict(CartItem.objects.filter(user=self.user).values_list("product_id", "quantity"))
+        self.assertEqual(quantities, {self.p1.pk: 3, self.p2.pk: 1})
+        self.assertEqual(self.client.cookies[CART_COOKIE_NAME].value, "")
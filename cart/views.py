@@ -1,27 +1,56 @@
 from django.shortcuts import render
-from django.contrib.auth.decorators import login_required
+from django.contrib import messages
 from django.shortcuts import get_object_or_404, redirect, render
+from catalog import inventory
 from catalog.models import Product
 from .models import CartItem
 
-@login_required
+
+class CookieCartLine:
+    """Template-friendly stand-in for CartItem when the cart lives in a cookie."""
+
+    def __init__(self, product, quantity):
+        self.id = product.pk
+        self.product = product
+        self.quantity = quantity
+        self.price = product.price
+        self.subtotal = product.price * quantity
+
+
 def add_to_cart(request, product_id):
     product = get_object_or_404(Product, id=product_id)
+    if not request.user.is_authenticated:
+        # anonymous carts live in a signed cookie: no DB writes
+        request.cookie_cart.add(product.pk)
+        return redirect('cart:cart_detail')
+    # hold one unit for this cart before adding the line
+    if not inventory.reserve(request.user, product.pk):
+        messages.error(request, f'Sorry, "{product.title}" is out of stock.')
+        return redirect('cart:cart_detail')
     item, created = CartItem.objects.get_or_create(user=request.user, product=product)
     if not created:
         item.quantity += 1
     item.save()
     return redirect('cart:cart_detail')
 
-@login_required
 def cart_detail(request):
-    items = CartItem.objects.filter(user=request.user).select_related('product')
-    total = sum(i.product.price * i.quantity for i in items)
-    return render(request, 'cart/cart_detail.html', {'items': items, 'total': total})
+    if request.user.is_authenticated:
+        items = list(CartItem.objects.filter(user=request.user).select_related('product'))
+    else:
+        lines = request.cookie_cart.lines
+        products = Product.objects.in_bulk(list(lines))
+        items = [CookieCartLine(products[pid], qty) for pid, qty in lines.items() if pid in products]
+    total = sum(i.subtotal for i in items)
+    return render(request, 'cart/cart_detail.html', {'cart_items': items, 'cart_total': total})
 
-@login_required
 def remove_item(request, item_id):
-    get_object_or_404(CartItem, id=item_id, user=request.user).delete()
+    if not request.user.is_authenticated:
+        # cookie cart lines are keyed by product id
+        request.cookie_cart.remove(item_id)
+        return redirect('cart:cart_detail')
+    item = get_object_or_404(CartItem, id=item_id, user=request.user)
+    item.delete()
+    inventory.release(request.user, item.product_id)
     return redirect('cart:cart_detail')
 
 # Create your views here.
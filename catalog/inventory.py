@@ -0,0 +1,110 @@
+# catalog/inventory.py
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .models import Product, Reservation
+
+RESERVATION_TTL = getattr(settings, "CART_RESERVATION_TTL", timedelta(minutes=15))
+
+
+def reserve(user, product_id, quantity=1, ttl=None):
+    """
+    Hold ``quantity`` units of a product for ``user``.
+    - The counter on Product is bumped with one conditional UPDATE
+      (``stock - reserved >= quantity``), so holds can never exceed stock.
+    - An existing hold for the same product is extended rather than duplicated.
+    Returns False when there is not enough unreserved stock.
+    """
+    expires_at = timezone.now() + (ttl or RESERVATION_TTL)
+
+    with transaction.atomic():
+        taken = (
+            Product.objects
+            .filter(pk=product_id, is_active=True, stock__gte=F("reserved") + quantity)
+            .update(reserved=F("reserved") + quantity)
+        )
+        if not taken:
+            return False
+
+        extended = (
+            Reservation.objects
+            .filter(user=user, product_id=product_id)
+            .update(quantity=F("quantity") + quantity, expires_at=expires_at)
+        )
+        if not extended:
+            Reservation.objects.create(
+                user=user,
+                product_id=product_id,
+                quantity=quantity,
+                expires_at=expires_at,
+            )
+    return True
+
+
+def _release_counters(totals):
+    """Give back reserved units, one UPDATE for all products in ``totals``."""
+    if not totals:
+        return
+    Product.objects.filter(pk__in=totals).update(
+        reserved=F("reserved") - Case(
+            *[When(pk=pk, then=Value(qty)) for pk, qty in totals.items()],
+            default=Value(0),
+        )
+    )
+
+
+def release(user, product_id):
+    """Drop the user's hold on a product (e.g. when the cart line is removed)."""
+    with transaction.atomic():
+        holds = list(
+            Reservation.objects
+            .select_for_update()
+            .filter(user=user, product_id=product_id)
+        )
+        if not holds:
+            return
+        Reservation.objects.filter(pk__in=[h.pk for h in holds]).delete()
+        _release_counters({product_id: sum(h.quantity for h in holds)})
+
+
+def release_expired(batch_size=500, now=None):
+    """
+    Sweep expired holds in batches and return how many were released.
+    - Each batch is locked (SKIP LOCKED where the backend supports it, so a
+      checkout converting a hold is never blocked), deleted in one statement,
+      and the product counters are fixed up with one more.
+    """
+    now = now or timezone.now()
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    released = 0
+
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Reservation.objects
+                .select_for_update(skip_locked=skip_locked)
+                .filter(expires_at__lte=now)
+                .order_by("expires_at")
+                .values_list("pk", "product_id", "quantity")[:batch_size]
+            )
+            if not batch:
+                break
+
+            totals = defaultdict(int)
+            for _, product_id, quantity in batch:
+                totals[product_id] += quantity
+
+            Reservation.objects.filter(pk__in=[pk for pk, _, _ in batch]).delete()
+            _release_counters(totals)
+
+        released += len(batch)
+        if len(batch) < batch_size:
+            break
+
+    return released
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from catalog.inventory import release_expired
+
+
+class Command(BaseCommand):
+    help = 'Release cart reservations whose hold time has passed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **opts):
+        count = release_expired(batch_size=opts['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Released {count} expired reservations.'))
@@ -1,5 +1,6 @@
 from django.db import models
 from django.db import models
+from django.contrib.auth.models import User
 from django.urls import reverse
 
 class Category(models.Model):
@@ -14,6 +15,8 @@ class Product(models.Model):
     description = models.TextField(blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.PositiveIntegerField(default=0)
+    # units held by live cart reservations (maintained by catalog.inventory)
+    reserved = models.PositiveIntegerField(default=0)
     image = models.ImageField(upload_to='products/', blank=True, null=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -21,4 +24,21 @@ class Product(models.Model):
     def __str__(self): return self.title
     def get_absolute_url(self): return reverse('catalog:product_detail', args=[self.slug])
 
+    @property
+    def available(self):
+        return max(self.stock - self.reserved, 0)
+
+class Reservation(models.Model):
+    """A time-limited hold on stock created when a logged-in user adds to their cart."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reservations')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reservations')
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user', 'product')
+
+    def __str__(self): return f'{self.quantity} × {self.product_id} for {self.user_id}'
+
 # Create your models here.
@@ -0,0 +1,9 @@
+from datetime import timedelta
+
+from jobs.queue import task
+from .inventory import release_expired
+
+
+@task(every=timedelta(minutes=1))
+def release_expired_reservations(batch_size=500):
+    return release_expired(batch_size=batch_size)
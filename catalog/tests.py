@@ -1,3 +1,43 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-# Create your tests here.
+from . import inventory
+from .models import Category, Product, Reservation
+
+
+class ReservationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cat = Category.objects.create(name="Toys", slug="toys")
+        cls.product = Product.objects.create(category=cat, title="Kite", slug="kite", price=50, stock=2)
+        cls.alice = User.objects.create_user("alice")
+        cls.bob = User.objects.create_user("bob")
+
+    def test_reserve_never_exceeds_stock(self):
+        self.assertTrue(inventory.reserve(self.alice, self.product.pk))
+        self.assertTrue(inventory.reserve(self.alice, self.product.pk))
+        self.assertFalse(inventory.reserve(self.bob, self.product.pk))
+
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.reserved, self.product.available), (2, 0))
+        self.assertEqual(Reservation.objects.get(user=self.alice).quantity, 2)
+
+    def test_release_expired_restores_counter(self):
+        inventory.reserve(self.alice, self.product.pk, ttl=timedelta(seconds=-1))
+        inventory.reserve(self.bob, self.product.pk)
+
+        self.assertEqual(inventory.release_expired(batch_size=1), 1)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reserved, 1)
+        self.assertQuerySetEqual(Reservation.objects.values_list("user__username", flat=True), ["bob"])
+
+    def test_release_drops_hold(self):
+        inventory.reserve(self.alice, self.product.pk)
+        inventory.release(self.alice, self.product.pk)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reserved, 0)
+        self.assertFalse(Reservation.objects.exists())
@@ -1,9 +1,10 @@
 from django.urls import path
+from core.routing import replica_reads
 from .views import ProductListView, ProductDetailView
 
 app_name = 'catalog'
 
 urlpatterns = [
-    path('', ProductListView.as_view(), name='product_list'),
-    path('<slug:slug>/', ProductDetailView.as_view(), name='product_detail'),
+    path('', replica_reads(ProductListView.as_view()), name='product_list'),
+    path('<slug:slug>/', replica_reads(ProductDetailView.as_view()), name='product_detail'),
 ]
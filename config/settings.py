@@ -1,4 +1,5 @@
 import os
+from datetime import timedelta
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -32,6 +33,11 @@ INSTALLED_APPS = [
     'auctions',
     'cart',
     'orders',
+    'jobs',
+    'notifications',
+    'metrics',
+    'api',
+    'analytics',
 ]
 
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
@@ -40,10 +46,18 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 # Middleware
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'metrics.middleware.MetricsMiddleware',
+    'core.admission.AdmissionMiddleware',
+    'core.querybudget.QueryBudgetMiddleware',
+    'core.routing.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.ratelimit.RateLimitMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.profiling.ProfilingMiddleware',
+    'core.slowqueries.SlowQueryMiddleware',
+    'cart.middleware.CookieCartMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -82,6 +96,36 @@ DATABASES = {
     }
 }
 
+# Read replica (see core.routing). Views marked @replica_reads read from it;
+# writes, and reads by a client that wrote in the last REPLICA_LAG_TOLERANCE
+# seconds, stay on the primary.
+DATABASE_ROUTERS = ['core.routing.PrimaryReplicaRouter']
+REPLICA_DATABASE = None
+REPLICA_LAG_TOLERANCE = float(os.getenv('REPLICA_LAG_TOLERANCE', '2'))
+if os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'USER': os.getenv('DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.getenv('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASE = 'replica'
+
+# Cache (watched-ids sets, short-lived page data). Per-process by default;
+# set CACHE_BACKEND/CACHE_LOCATION to Redis or Memcached when running several workers.
+# Lookups are counted for /metrics by metrics.cache.MetricsCache.
+CACHES = {
+    'default': {
+        'BACKEND': 'metrics.cache.MetricsCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', 'auction-shop'),
+        'OPTIONS': {
+            'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        },
+    }
+}
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'Asia/Colombo'
@@ -105,3 +149,33 @@ LOGIN_URL = '/accounts/login/'
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+
+# Cart stock holds (see catalog.inventory)
+CART_RESERVATION_TTL = timedelta(minutes=int(os.getenv('CART_RESERVATION_MINUTES', '15')))
+
+# How long a replayable response is kept per Idempotency-Key (see core.idempotency)
+IDEMPOTENCY_KEY_TTL = timedelta(hours=int(os.getenv('IDEMPOTENCY_KEY_HOURS', '24')))
+
+# Outgoing mail (receipts, notifications); printed to the console unless configured
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'AuctionShop <no-reply@localhost>')
+
+# Notification fan-out (see notifications.outbox): "file", "email" or "none"
+NOTIFICATIONS_SINK = os.getenv('NOTIFICATIONS_SINK', 'file')
+NOTIFICATIONS_DIR = BASE_DIR / 'var' / 'notifications'
+NOTIFICATIONS_COALESCE_WINDOW = timedelta(seconds=30)
+NOTIFICATIONS_ENDING_SOON_WINDOW = timedelta(minutes=15)
+
+# On-demand request profiles (see core.profiling), browsable at /admin/profiles/
+PROFILES_DIR = BASE_DIR / 'var' / 'profiles'
+PROFILES_KEEP = 50
+
+# Slow-query capture (see core.slowqueries): statements slower than this get
+# an EXPLAIN and a SlowQuery row; stats are flushed every SLOW_QUERY_FLUSH_SECONDS
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '100'))
+SLOW_QUERY_FLUSH_SECONDS = 30
+
+# Prometheus metrics at /metrics/ (see metrics.registry). Multi-process servers
+# (gunicorn, uvicorn workers) must share a METRICS_DIR, emptied before start.
+METRICS_DIR = os.getenv('METRICS_DIR') or None
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
@@ -0,0 +1,32 @@
+"""
+Test settings: two SQLite files stand in for the MySQL primary and its replica.
+
+    python manage.py test --settings=config.settings_test
+
+The replica is a separate database rather than a mirror, so tests can tell
+which one a query went to. Routing is off by default; core.tests switches it
+on with override_settings(REPLICA_DATABASE='replica').
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+(BASE_DIR / 'var').mkdir(exist_ok=True)
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'var' / 'primary.sqlite3',
+        'TEST': {'NAME': BASE_DIR / 'var' / 'test_primary.sqlite3'},
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'var' / 'replica.sqlite3',
+        'TEST': {'NAME': BASE_DIR / 'var' / 'test_replica.sqlite3'},
+    },
+}
+REPLICA_DATABASE = None
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+NOTIFICATIONS_SINK = 'none'
@@ -4,7 +4,11 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core.views import profile_download, profile_list
+
 urlpatterns = [
+    path('admin/profiles/', profile_list, name='profile_list'),
+    path('admin/profiles/<str:name>', profile_download, name='profile_download'),
     path('admin/', admin.site.urls),
 
     # Built-in auth views: login, logout, password reset, etc.
@@ -18,4 +22,9 @@ urlpatterns = [
     path('catalog/', include('catalog.urls')),
     path('auctions/', include('auctions.urls')),
     path('cart/', include('cart.urls')),
+    path('orders/', include('orders.urls')),
+    path('notifications/', include('notifications.urls')),
+    path('metrics/', include('metrics.urls')),
+    path('api/v1/', include('api.urls')),
+    path('analytics/', include('analytics.urls')),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,3 +1,58 @@
+# core/admin.py
+
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.contrib.auth.models import User
+from django.utils.html import format_html
+
+from .largetables import LargeTableAdmin
+from .models import SlowQuery
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class UserAdmin(LargeTableAdmin, BaseUserAdmin):
+    # also what the bidder/buyer/seller autocompletes search
+    search_fields = ("^username", "^email")
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ("short_sql", "calls", "slow_calls", "mean", "max", "total", "view", "last_seen")
+    list_filter = ("view",)
+    search_fields = ("fingerprint", "view")
+    ordering = ("-total_ms",)
+    fields = (
+        "fingerprint", "sample_sql", "calls", "slow_calls", "total_ms", "max_ms",
+        "view", "plan", "call_stack", "first_seen", "last_seen",
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.display(description="SQL")
+    def short_sql(self, obj):
+        return obj.fingerprint[:120]
+
+    @admin.display(description="Mean ms", ordering="total_ms")
+    def mean(self, obj):
+        return f"{obj.mean_ms:.1f}"
+
+    @admin.display(description="Max ms", ordering="max_ms")
+    def max(self, obj):
+        return f"{obj.max_ms:.1f}"
+
+    @admin.display(description="Total ms", ordering="total_ms")
+    def total(self, obj):
+        return f"{obj.total_ms:.0f}"
+
+    @admin.display(description="EXPLAIN")
+    def plan(self, obj):
+        return format_html("<pre>{}</pre>", obj.explain or "-")
 
-# Register your models here.
+    @admin.display(description="Stack (last slow call)")
+    def call_stack(self, obj):
+        return format_html("<pre>{}</pre>", obj.stack or "-")
@@ -0,0 +1,250 @@
+# core/admission.py
+
+import asyncio
+import hashlib
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_vary_headers
+
+from metrics.registry import counter, gauge, histogram
+
+# class name -> limits; "views" lists the URL names in the class, and a
+# class with ``anonymous_only`` only takes requests without a session
+# cookie. Views not listed anywhere are "normal".
+DEFAULT_ADMISSION_CLASSES = {
+    "critical": {
+        "views": ["auctions:place_bid", "auctions:buy_now", "orders:checkout"],
+        "limit": 8, "queue": 64, "wait": 5.0,
+    },
+    "normal": {"limit": 8, "queue": 16, "wait": 0.5},
+    "low": {
+        "views": [
+            "core:home", "auctions:listing_list", "auctions:ending_soon",
+            "catalog:product_list", "catalog:product_detail",
+        ],
+        "anonymous_only": True,
+        "limit": 4, "queue": 4, "wait": 0.05,
+    },
+}
+# requests this process lets hold a DB connection at once; at this many in
+# flight only critical requests are still admitted
+DEFAULT_DB_SLOTS = 16
+RETRY_AFTER = 2
+STALE_TTL = 300
+# how often (seconds) a low-priority page's stale copy is refreshed
+STALE_REFRESH = 10
+MAX_STALE_PATHS = 10_000
+ASYNC_POLL = 0.005
+
+SHED = counter(
+    "admission_shed", "Requests turned away by admission control.", ["priority", "served"]
+)
+ACTIVE = gauge("admission_active", "Admitted requests in flight by priority.", ["priority"])
+QUEUE_WAIT = histogram(
+    "admission_queue_wait_seconds", "Time admitted requests waited for a slot.", ["priority"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 2, 5),
+)
+
+
+class Gate:
+    """
+    At most ``limit`` requests inside, at most ``queue`` more waiting up to
+    ``wait`` seconds each; anything past that is refused straight away.
+    """
+
+    def __init__(self, name, limit, queue, wait, views=(), anonymous_only=False):
+        self.name = name
+        self.limit = limit
+        self.queue = queue
+        self.wait = wait
+        self.views = frozenset(views)
+        self.anonymous_only = anonymous_only
+        self.active = 0
+        self.waiting = 0
+        self.cond = threading.Condition()
+
+    def _take(self):
+        if self.active < self.limit:
+            self.active += 1
+            return True
+        return False
+
+    def enter(self):
+        with self.cond:
+            if self._take():
+                return True
+            if self.waiting >= self.queue:
+                return False
+            self.waiting += 1
+            try:
+                return self.cond.wait_for(self._take, self.wait)
+            finally:
+                self.waiting -= 1
+
+    async def aenter(self):
+        # polls rather than blocking, so a waiting request never holds the loop
+        with self.cond:
+            if self._take():
+                return True
+            if self.waiting >= self.queue:
+                return False
+            self.waiting += 1
+        try:
+            deadline = time.monotonic() + self.wait
+            while time.monotonic() < deadline:
+                await asyncio.sleep(ASYNC_POLL)
+                with self.cond:
+                    if self._take():
+                        return True
+            return False
+        finally:
+            with self.cond:
+                self.waiting -= 1
+
+    def leave(self):
+        with self.cond:
+            self.active -= 1
+            self.cond.notify()
+
+
+def _url_name(request):
+    try:
+        return resolve(request.path_info).view_name
+    except Resolver404:
+        return None
+
+
+class AdmissionMiddleware:
+    """
+    Per-priority concurrency limits with bounded wait queues, so a spike of
+    reads can't take every DB connection from the bid path:
+    - ``critical`` (bids, buy-now, checkout) get their own slots and a long queue
+    - ``low`` (anonymous browsing) get few slots and almost no queue
+    - once ADMISSION_DB_SLOTS requests are in flight, only critical ones
+      are admitted
+    A refused low-priority request gets the page's last good copy (no older
+    than STALE_TTL, and only pages safe to share; see _shareable) if there
+    is one; anything else refused gets a 503 with Retry-After.
+    ADMISSION_CLASSES = {} turns it off.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        classes = getattr(settings, "ADMISSION_CLASSES", DEFAULT_ADMISSION_CLASSES)
+        self.gates = {name: Gate(name, **spec) for name, spec in classes.items()}
+        self.by_view = {view: gate for gate in self.gates.values() for view in gate.views}
+        self.db_slots = getattr(settings, "ADMISSION_DB_SLOTS", DEFAULT_DB_SLOTS)
+        # stale key -> when its copy was last stored; racy by design, the
+        # worst case is one extra cache write
+        self.stored_at = {}
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def gate_for(self, request):
+        gate = self.by_view.get(_url_name(request))
+        if gate is not None and gate.anonymous_only and settings.SESSION_COOKIE_NAME in request.COOKIES:
+            gate = None
+        return gate or self.gates.get("normal")
+
+    def saturated(self, gate):
+        if gate.name == "critical":
+            return False
+        return sum(g.active for g in self.gates.values()) >= self.db_slots
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        gate = self.gate_for(request) if self.gates else None
+        if gate is None:
+            return self.get_response(request)
+        started = time.perf_counter()
+        if self.saturated(gate) or not gate.enter():
+            return self._shed(request, gate)
+        return self._admitted(request, gate, started)
+
+    async def __acall__(self, request):
+        gate = self.gate_for(request) if self.gates else None
+        if gate is None:
+            return await self.get_response(request)
+        started = time.perf_counter()
+        if self.saturated(gate) or not await gate.aenter():
+            return await sync_to_async(self._shed)(request, gate)
+        QUEUE_WAIT.observe(time.perf_counter() - started, priority=gate.name)
+        ACTIVE.inc(priority=gate.name)
+        try:
+            response = await self.get_response(request)
+        finally:
+            ACTIVE.dec(priority=gate.name)
+            gate.leave()
+        if gate.name == "low":
+            await sync_to_async(self._keep_stale)(request, response)
+        return response
+
+    def _admitted(self, request, gate, started):
+        QUEUE_WAIT.observe(time.perf_counter() - started, priority=gate.name)
+        ACTIVE.inc(priority=gate.name)
+        try:
+            response = self.get_response(request)
+        finally:
+            ACTIVE.dec(priority=gate.name)
+            gate.leave()
+        if gate.name == "low":
+            self._keep_stale(request, response)
+        return response
+
+    @staticmethod
+    def _stale_key(request):
+        # like the cache middleware honouring "Vary: Cookie": visitors with
+        # different cookies never share a copy, cookieless ones all do
+        cookies = hashlib.md5(request.META.get("HTTP_COOKIE", "").encode(), usedforsecurity=False)
+        return f"admission:stale:{request.get_full_path()}:{cookies.hexdigest()}"
+
+    @staticmethod
+    def _shareable(request, response):
+        """
+        Whether a copy may be served again, by Django's cache middleware
+        rules: nothing that sets a cookie, embeds a CSRF token or varies on
+        a header other than Cookie (which is part of the key) is kept.
+        """
+        if request.method != "GET" or response.status_code != 200 or response.streaming:
+            return False
+        if response.cookies or request.META.get("CSRF_COOKIE_NEEDS_UPDATE"):
+            return False
+        vary = {h.strip().lower() for h in response.get("Vary", "").split(",") if h.strip()}
+        return vary <= {"cookie"}
+
+    def _keep_stale(self, request, response):
+        if not self._shareable(request, response):
+            return
+        key = self._stale_key(request)
+        now = time.monotonic()
+        if now - self.stored_at.get(key, -STALE_REFRESH) < STALE_REFRESH:
+            return
+        if len(self.stored_at) >= MAX_STALE_PATHS:
+            self.stored_at = {}
+        self.stored_at[key] = now
+        cache.set(key, (response.content, response["Content-Type"]), STALE_TTL)
+
+    def _shed(self, request, gate):
+        if gate.name == "low" and request.method == "GET":
+            stale = cache.get(self._stale_key(request))
+            if stale is not None:
+                SHED.inc(priority=gate.name, served="stale")
+                content, content_type = stale
+                response = HttpResponse(content, content_type=content_type)
+                response["X-Stale"] = "1"
+                patch_vary_headers(response, ("Cookie",))
+                return response
+        SHED.inc(priority=gate.name, served="503")
+        response = HttpResponse("Busy; please retry shortly.", status=503)
+        response["Retry-After"] = str(RETRY_AFTER)
+        return response
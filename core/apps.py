@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # time every statement on every connection (see core.slowqueries)
+        from django.db.backends.signals import connection_created
+        from .slowqueries import install
+        connection_created.connect(install)
+
+        # register each app's export datasets (see core.exports)
+        from django.utils.module_loading import autodiscover_modules
+        autodiscover_modules("exports")
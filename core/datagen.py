@@ -0,0 +1,338 @@
+# core/datagen.py
+
+import random
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from auctions.models import Bid, Category, Order, Product, Watchlist
+from auctions.watching import recount_watch_counts
+from cart.models import CartItem
+from catalog import models as catalog
+from orders import models as orders
+
+PASSWORD = "password"
+# per-user rows (watchlist, cart, orders) never pick from more than this many products
+MAX_SAMPLE = 50
+
+
+@dataclass
+class Plan:
+    """
+    Everything a worker needs to generate its chunk: row counts, the first
+    primary key of each generated table and the random seed. Rows get explicit
+    primary keys, so chunks can be built in any order, by any process, and the
+    same seed and chunk size always give the same data.
+    """
+
+    users: int = 200
+    categories: int = 12
+    products: int = 1000
+    skus: int = 200
+    auction_share: float = 0.6
+    bids_per_auction: int = 8
+    watches_per_user: int = 5
+    cart_items_per_user: int = 2
+    orders_per_user: int = 2
+    seed: int = 1
+    chunk_size: int = 5000
+    batch_size: int = 1000
+    now: object = None
+    base: dict = field(default_factory=dict)
+
+    def rng(self, stage, start):
+        return random.Random(f"{self.seed}:{stage}:{start}")
+
+    def chunks(self, total):
+        return [(lo, min(lo + self.chunk_size, total)) for lo in range(0, total, self.chunk_size)]
+
+    def user_pk(self, i):
+        return self.base["user"] + i
+
+    def listing_pk(self, i):
+        return self.base["listing"] + i
+
+    def is_auction(self, i):
+        # deterministic per listing, so other stages can tell BUY from BID without a query
+        return random.Random(f"{self.seed}:kind:{i}").random() < self.auction_share
+
+    def as_dict(self):
+        return asdict(self)
+
+
+def allocate(plan):
+    """Start every generated table's keys after the rows already there."""
+    def after(model):
+        return (model.objects.aggregate(m=Max("pk"))["m"] or 0) + 1
+
+    plan.now = plan.now or timezone.now()
+    plan.base = {
+        "user": after(User),
+        "category": after(Category),
+        "catalog_category": after(catalog.Category),
+        "listing": after(Product),
+        "sku": after(catalog.Product),
+        "order": after(orders.Order),
+    }
+    return plan
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let bulk_create keep the created_at values we generate (auto_now_add would overwrite them)."""
+    fields = [
+        f for model in models for f in model._meta.concrete_fields
+        if getattr(f, "auto_now_add", False)
+    ]
+    for f in fields:
+        f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f in fields:
+            f.auto_now_add = True
+
+
+# ---------- stages ----------
+# Each stage is a list of (name, total) pairs; chunks of one stage only depend
+# on earlier stages, so they can run in parallel.
+
+def stages(plan):
+    return [
+        [("users", plan.users), ("categories", 1)],
+        [("listings", plan.products), ("skus", plan.skus)],
+        [("watchlists", plan.users), ("carts", plan.users), ("orders", plan.users)],
+    ]
+
+
+def build_chunk(plan, name, lo, hi):
+    """Generate and insert rows ``lo``..``hi`` of one stage; returns rows written."""
+    with transaction.atomic(), explicit_timestamps(Product, Bid, Watchlist, Order, orders.Order):
+        return GENERATORS[name](plan, plan.rng(name, lo), lo, hi)
+
+
+def _users(plan, rng, lo, hi):
+    password = make_password(PASSWORD, salt=f"seed{plan.seed}")
+    joined = plan.now - timedelta(days=365)
+    rows = [
+        User(
+            pk=plan.user_pk(i),
+            username=f"user{plan.user_pk(i)}",
+            email=f"user{plan.user_pk(i)}@example.com",
+            password=password,
+            date_joined=joined + timedelta(seconds=rng.randrange(365 * 86400)),
+        )
+        for i in range(lo, hi)
+    ]
+    User.objects.bulk_create(rows, batch_size=plan.batch_size)
+    return len(rows)
+
+
+def _categories(plan, rng, lo, hi):
+    Category.objects.bulk_create([
+        Category(pk=plan.base["category"] + i, name=f"Category {plan.base['category'] + i}",
+                 slug=f"category-{plan.base['category'] + i}")
+        for i in range(plan.categories)
+    ])
+    catalog.Category.objects.bulk_create([
+        catalog.Category(pk=plan.base["catalog_category"] + i,
+                         name=f"Department {plan.base['catalog_category'] + i}",
+                         slug=f"department-{plan.base['catalog_category'] + i}")
+        for i in range(plan.categories)
+    ])
+    return plan.categories * 2
+
+
+def _listings(plan, rng, lo, hi):
+    """Buy-now and auction listings; auctions get a rising bid ladder, past ones a winner."""
+    listings, bids = [], []
+    for i in range(lo, hi):
+        created = plan.now - timedelta(seconds=rng.randrange(60 * 86400))
+        product = Product(
+            pk=plan.listing_pk(i),
+            seller_id=plan.user_pk(rng.randrange(plan.users)),
+            category_id=plan.base["category"] + rng.randrange(plan.categories),
+            title=f"Listing {plan.listing_pk(i)}",
+            description="Generated listing.",
+            price=Decimal(rng.randrange(500, 500_000)) / 100,
+            created_at=created,
+        )
+        if plan.is_auction(i):
+            product.listing_type = "BID"
+            product.starting_bid = Decimal(rng.randrange(100, 5000))
+            product.min_increment = Decimal(rng.choice((1, 5, 10, 50)))
+            # a third of auctions are already over
+            if rng.random() < 0.33:
+                product.auction_end = created + timedelta(seconds=rng.randrange(3600, 7 * 86400))
+                product.auction_end = min(product.auction_end, plan.now - timedelta(minutes=1))
+            else:
+                product.auction_end = plan.now + timedelta(seconds=rng.randrange(60, 7 * 86400))
+            ladder = _ladder(plan, rng, product, created)
+            bids.extend(ladder)
+            if product.auction_end <= plan.now:
+                product.is_active = False
+                product.closed_at = product.auction_end
+                product.winner_id = ladder[-1].bidder_id if ladder else None
+        else:
+            product.listing_type = "BUY"
+        listings.append(product)
+
+    Product.objects.bulk_create(listings, batch_size=plan.batch_size)
+    Bid.objects.bulk_create(bids, batch_size=plan.batch_size)
+    return len(listings) + len(bids)
+
+
+def _ladder(plan, rng, product, created):
+    """A skewed number of bids (most auctions few, some many) at rising amounts and times."""
+    count = min(int(rng.expovariate(1 / plan.bids_per_auction)), plan.bids_per_auction * 20)
+    if not count:
+        return []
+    end = min(product.auction_end, plan.now)
+    span = max(int((end - created).total_seconds()), count)
+    offsets = sorted(rng.randrange(span) for _ in range(count))
+    amount = product.starting_bid
+    bidder = None
+    ladder = []
+    for offset in offsets:
+        amount += product.min_increment * rng.randint(1, 5)
+        # nobody outbids themselves
+        choice = plan.user_pk(rng.randrange(plan.users))
+        if choice == bidder and plan.users > 1:
+            choice = plan.user_pk((choice - plan.base["user"] + 1) % plan.users)
+        bidder = choice
+        ladder.append(Bid(
+            product_id=product.pk,
+            bidder_id=bidder,
+            amount=amount,
+            created_at=created + timedelta(seconds=offset),
+        ))
+    return ladder
+
+
+def _skus(plan, rng, lo, hi):
+    rows = [
+        catalog.Product(
+            pk=plan.base["sku"] + i,
+            category_id=plan.base["catalog_category"] + rng.randrange(plan.categories),
+            title=f"SKU {plan.base['sku'] + i}",
+            slug=f"sku-{plan.base['sku'] + i}",
+            price=Decimal(rng.randrange(100, 100_000)) / 100,
+            stock=rng.randrange(0, 500),
+        )
+        for i in range(lo, hi)
+    ]
+    catalog.Product.objects.bulk_create(rows, batch_size=plan.batch_size)
+    return len(rows)
+
+
+def _sample(rng, total, k):
+    """Up to ``k`` distinct indexes below ``total`` (from a window, so huge totals stay cheap)."""
+    k = min(k, total)
+    if not k:
+        return []
+    window = min(total, MAX_SAMPLE * 4)
+    start = rng.randrange(total - window + 1)
+    return [start + j for j in rng.sample(range(window), k)]
+
+
+def _watchlists(plan, rng, lo, hi):
+    rows = []
+    for i in range(lo, hi):
+        count = rng.randint(0, plan.watches_per_user * 2)
+        for j in _sample(rng, plan.products, min(count, MAX_SAMPLE)):
+            rows.append(Watchlist(
+                user_id=plan.user_pk(i),
+                product_id=plan.listing_pk(j),
+                created_at=plan.now - timedelta(seconds=rng.randrange(30 * 86400)),
+            ))
+    Watchlist.objects.bulk_create(rows, batch_size=plan.batch_size)
+    return len(rows)
+
+
+def _carts(plan, rng, lo, hi):
+    rows = []
+    for i in range(lo, hi):
+        count = rng.randint(0, plan.cart_items_per_user * 2)
+        for j in _sample(rng, plan.skus, min(count, MAX_SAMPLE)):
+            rows.append(CartItem(
+                user_id=plan.user_pk(i),
+                product_id=plan.base["sku"] + j,
+                quantity=rng.randint(1, 3),
+            ))
+    CartItem.objects.bulk_create(rows, batch_size=plan.batch_size)
+    return len(rows)
+
+
+def _orders(plan, rng, lo, hi):
+    """Half buy-now purchases of listings, half catalog checkouts with 1-3 lines."""
+    listing_orders, shop_orders, items = [], [], []
+    for i in range(lo, hi):
+        for k in range(plan.orders_per_user):
+            created = plan.now - timedelta(seconds=rng.randrange(90 * 86400))
+            if plan.products and rng.random() < 0.5:
+                j = rng.randrange(plan.products)
+                listing_orders.append(Order(
+                    buyer_id=plan.user_pk(i),
+                    product_id=plan.listing_pk(j),
+                    price=Decimal(rng.randrange(500, 500_000)) / 100,
+                    status=rng.choice(("PENDING", "COMPLETED", "COMPLETED", "CANCELLED")),
+                    created_at=created,
+                ))
+            elif plan.skus:
+                order_pk = plan.base["order"] + i * plan.orders_per_user + k
+                lines = [
+                    orders.OrderItem(
+                        order_id=order_pk,
+                        product_id=plan.base["sku"] + j,
+                        quantity=rng.randint(1, 3),
+                        price=Decimal(rng.randrange(100, 100_000)) / 100,
+                    )
+                    for j in _sample(rng, plan.skus, rng.randint(1, 3))
+                ]
+                items.extend(lines)
+                shop_orders.append(orders.Order(
+                    pk=order_pk,
+                    user_id=plan.user_pk(i),
+                    total=sum(line.price * line.quantity for line in lines),
+                    created_at=created,
+                ))
+    Order.objects.bulk_create(listing_orders, batch_size=plan.batch_size)
+    orders.Order.objects.bulk_create(shop_orders, batch_size=plan.batch_size)
+    orders.OrderItem.objects.bulk_create(items, batch_size=plan.batch_size)
+    return len(listing_orders) + len(shop_orders) + len(items)
+
+
+GENERATORS = {
+    "users": _users,
+    "categories": _categories,
+    "listings": _listings,
+    "skus": _skus,
+    "watchlists": _watchlists,
+    "carts": _carts,
+    "orders": _orders,
+}
+
+
+def finish(plan):
+    """
+    Fix up what chunks can't know on their own: the denormalized watch counts
+    of the generated listings, and sequences on backends that keep them apart
+    from the table (PostgreSQL).
+    """
+    first, last = plan.listing_pk(0), plan.listing_pk(plan.products)
+    recount_watch_counts(Product.objects.filter(pk__gte=first, pk__lt=last))
+    sql = connection.ops.sequence_reset_sql(
+        no_style(), [User, Category, catalog.Category, Product, catalog.Product, orders.Order]
+    )
+    if sql:
+        with connection.cursor() as cursor:
+            for statement in sql:
+                cursor.execute(statement)
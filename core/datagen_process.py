@@ -0,0 +1,22 @@
+# core/datagen_process.py
+#
+# Kept free of model imports: spawned children unpickle this module's
+# functions before Django is set up.
+
+
+def init_worker():
+    import django
+
+    django.setup()
+
+
+def build_chunk(plan, name, lo, hi):
+    """Entry point for ``seed --processes`` children; ``plan`` is Plan.as_dict()."""
+    from django.db import connection
+
+    from .datagen import Plan, build_chunk
+
+    try:
+        return build_chunk(Plan(**plan), name, lo, hi)
+    finally:
+        connection.close()
@@ -0,0 +1,160 @@
+# core/exports.py
+
+import csv
+import io
+import json
+import zlib
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+# rows per keyset query; each is a short indexed range scan, so a multi-GB
+# export never holds a long-running cursor or more than one chunk in memory
+CHUNK_SIZE = 2000
+FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+# dataset name -> Dataset; filled from each app's exports.py (see CoreConfig.ready)
+datasets = {}
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """
+    One exportable table:
+    - ``columns`` maps output column -> ``values_list`` lookup (joins allowed)
+    - ``owner`` is the lookup to the user a non-staff requester may export
+      rows for (a seller's listings, a buyer's orders); None = staff only
+    - ``date_field`` is what ``?since=``/``?until=`` filter on
+    """
+
+    name: str
+    model: type
+    columns: dict = field(default_factory=dict)
+    owner: str = None
+    date_field: str = "created_at"
+
+    def queryset_for(self, user):
+        opts = self.model._meta
+        qs = self.model._default_manager.all()
+        if user.has_perm(f"{opts.app_label}.view_{opts.model_name}"):
+            return qs
+        if self.owner and user.is_authenticated:
+            return qs.filter(**{self.owner: user})
+        raise PermissionDenied
+
+
+def register(dataset):
+    datasets[dataset.name] = dataset
+    return dataset
+
+
+def dataset_for(model):
+    for dataset in datasets.values():
+        if dataset.model is model:
+            return dataset
+    raise LookupError(f"No export dataset for {model.__name__}")
+
+
+def keyset_rows(queryset, lookups, chunk_size=None):
+    """
+    Yield ``values_list`` tuples for ``queryset`` in pk order, one
+    ``pk > last`` query per chunk (OFFSET would rescan everything before it).
+    """
+    chunk_size = chunk_size or CHUNK_SIZE
+    queryset = queryset.order_by("pk").values_list("pk", *lookups)
+    last = None
+    while True:
+        chunk = queryset if last is None else queryset.filter(pk__gt=last)
+        count = 0
+        for row in chunk[:chunk_size].iterator(chunk_size=chunk_size):
+            last = row[0]
+            count += 1
+            yield row[1:]
+        if count < chunk_size:
+            return
+
+
+def _plain(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat() if timezone.is_aware(value) else value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _csv(columns, rows, flush_every):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    for n, row in enumerate(rows, 1):
+        writer.writerow([_plain(v) for v in row])
+        if n % flush_every == 0:
+            yield buf.getvalue().encode()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue().encode()
+
+
+def _jsonl(columns, rows, flush_every):
+    lines = []
+    for n, row in enumerate(rows, 1):
+        lines.append(json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder))
+        if n % flush_every == 0:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def _gzip(chunks):
+    # wbits=31: a gzip container, so the download is a plain .gz file
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream(dataset, queryset, fmt="csv", compress=False, chunk_size=None):
+    """The encoded (and optionally gzipped) export as an iterator of bytes."""
+    columns = list(dataset.columns)
+    rows = keyset_rows(queryset, list(dataset.columns.values()), chunk_size)
+    encode = _csv if fmt == "csv" else _jsonl
+    chunks = encode(columns, rows, chunk_size or CHUNK_SIZE)
+    return _gzip(chunks) if compress else chunks
+
+
+def export_response(dataset, queryset, fmt="csv", compress=False):
+    filename = f"{dataset.name}-{timezone.localdate():%Y%m%d}.{fmt}"
+    content_type = FORMATS[fmt]
+    if compress:
+        filename += ".gz"
+        content_type = "application/gzip"
+    response = StreamingHttpResponse(stream(dataset, queryset, fmt, compress), content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _export_action(fmt):
+    @admin.action(description=f"Export selected as {fmt.upper()}", permissions=["view"])
+    def action(modeladmin, request, queryset):
+        return export_response(dataset_for(queryset.model), queryset, fmt)
+
+    action.__name__ = f"export_{fmt}"
+    return action
+
+
+# admin actions: ``actions = [export_csv, export_jsonl]``
+export_csv = _export_action("csv")
+export_jsonl = _export_action("jsonl")
@@ -0,0 +1,149 @@
+# core/idempotency.py
+
+import hashlib
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_KEY_TTL = getattr(settings, "IDEMPOTENCY_KEY_TTL", timedelta(hours=24))
+HEADER = "Idempotency-Key"
+FORM_FIELD = "idempotency_key"
+
+# JSON bodies above this are not worth replaying byte-for-byte
+MAX_BODY = 4096
+
+
+def _request_key(request):
+    key = request.headers.get(HEADER) or request.POST.get(FORM_FIELD)
+    return key.strip()[:64] if key else None
+
+
+def _fingerprint(request):
+    """The request a key stands for: path plus form data, minus per-request tokens."""
+    fields = sorted(
+        (name, value)
+        for name, values in request.POST.lists()
+        if name not in (FORM_FIELD, "csrfmiddlewaretoken")
+        for value in values
+    )
+    raw = repr((request.path, fields)).encode()
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _replay(stored, fingerprint):
+    # keys stored before fingerprints were kept have none
+    if stored.fingerprint and stored.fingerprint != fingerprint:
+        return HttpResponse(
+            "This idempotency key was already used for a different request.",
+            status=422,
+        )
+    if stored.status_code == IdempotencyKey.IN_PROGRESS:
+        response = HttpResponse(
+            "A request with this idempotency key is still being processed.",
+            status=409,
+        )
+        response["Retry-After"] = "1"
+        return response
+
+    response = HttpResponse(
+        stored.body,
+        status=stored.status_code,
+        content_type=stored.content_type or None,
+    )
+    if stored.location:
+        response["Location"] = stored.location
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _replayable(response):
+    """Redirects and small JSON bodies can be stored whole; anything else can't."""
+    if response.status_code >= 500 or response.streaming:
+        return False
+    if 300 <= response.status_code < 400:
+        return "Location" in response
+    return "json" in response.get("Content-Type", "") and len(response.content) <= MAX_BODY
+
+
+def idempotent(scope):
+    """
+    Make a POST view safe to retry.
+    - Clients send ``Idempotency-Key`` (header) or ``idempotency_key`` (form field).
+    - The first request claims the key with a placeholder row, runs the view
+      and stores a compact copy of the response if it is a redirect or small
+      JSON; other responses (e.g. a re-rendered form) release the key.
+    - Retries with the same key get the stored response back (or 409 while the
+      first one is still running) without the view or domain tables being touched.
+    - Reusing a key for a different path or form data gets a 422; nothing runs.
+    - Requests without a key behave exactly as before.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key = _request_key(request) if request.method == "POST" else None
+            if not key or not request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+
+            now = timezone.now()
+            lookup = {"user": request.user, "scope": scope, "key": key}
+            fingerprint = _fingerprint(request)
+
+            stored = IdempotencyKey.objects.filter(expires_at__gt=now, **lookup).first()
+            if stored:
+                return _replay(stored, fingerprint)
+
+            # an expired row for this key may linger until the next purge
+            IdempotencyKey.objects.filter(expires_at__lte=now, **lookup).delete()
+            try:
+                with transaction.atomic():
+                    claim = IdempotencyKey.objects.create(
+                        expires_at=now + IDEMPOTENCY_KEY_TTL, fingerprint=fingerprint, **lookup
+                    )
+            except IntegrityError:
+                # lost the race against a concurrent retry
+                return _replay(IdempotencyKey.objects.get(**lookup), fingerprint)
+
+            try:
+                response = view(request, *args, **kwargs)
+            except Exception:
+                claim.delete()
+                raise
+
+            if not _replayable(response):
+                # let the client try again for real
+                claim.delete()
+                return response
+
+            claim.status_code = response.status_code
+            claim.location = response.get("Location", "")[:500]
+            if not claim.location:
+                claim.content_type = response["Content-Type"]
+                claim.body = response.content.decode(response.charset)
+            claim.save(update_fields=["status_code", "location", "content_type", "body"])
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def purge_expired(batch_size=1000, now=None):
+    """Delete expired keys in primary-key batches; returns the number removed."""
+    now = now or timezone.now()
+    removed = 0
+    while True:
+        pks = list(
+            IdempotencyKey.objects
+            .filter(expires_at__lte=now)
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not pks:
+            return removed
+        removed += IdempotencyKey.objects.filter(pk__in=pks).delete()[0]
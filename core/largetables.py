@@ -0,0 +1,75 @@
+# core/largetables.py
+
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models.query import QuerySet
+from django.utils.functional import cached_property
+
+# below this many rows an exact COUNT(*) is cheap enough to keep
+ESTIMATE_THRESHOLD = 10000
+
+
+def estimated_count(model, using="default"):
+    """
+    Approximate row count of ``model``'s table from the database's own
+    statistics, without scanning it; None if the backend can't tell us.
+    - MySQL: information_schema TABLE_ROWS (InnoDB's sampled estimate)
+    - PostgreSQL: pg_class.reltuples (-1 until the table is analyzed)
+    - SQLite: MAX(rowid), a pk index lookup (over-counts after deletes)
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == "mysql":
+        sql = ("SELECT TABLE_ROWS FROM information_schema.TABLES "
+               "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s")
+        params = [table]
+    elif connection.vendor == "postgresql":
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass"
+        params = [connection.ops.quote_name(table)]
+    elif connection.vendor == "sqlite":
+        sql = f"SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}"
+        params = []
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Uses estimated_count() for an unfiltered queryset over a big table, so
+    the changelist doesn't COUNT(*) millions of rows on every page view.
+    Filtered querysets (search, list_filter, date drill-down) count exactly.
+    """
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if isinstance(qs, QuerySet) and not qs.query.where:
+            estimate = estimated_count(qs.model, qs.db)
+            if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Base ModelAdmin for tables too big to count or scan per page view:
+    - estimated counts, and no second "N total" count when filtering
+    - a date_hierarchy built from MIN/MAX instead of DISTINCT date scans
+      (see core/templatetags/largetables.py)
+    Subclasses still set list_select_related, autocomplete_fields and
+    prefix (``^field``) search_fields on indexed columns.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    change_list_template = "admin/large_change_list.html"
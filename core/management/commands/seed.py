@@ -1,28 +1,81 @@
+import multiprocessing
+import time
+
 from django.core.management.base import BaseCommand
-from django.contrib.auth.models import User
-from catalog.models import Category, Product
-from auctions.models import Listing
-from django.utils import timezone
-from datetime import timedelta
-from django.utils.text import slugify
+from django.db import connections
+
+from core import datagen, datagen_process
+
 
 class Command(BaseCommand):
-    help = 'Seed demo data'
-
-    def handle(self, *args, **kwargs):
-        if not User.objects.filter(username='seller').exists():
-            User.objects.create_user('seller', password='seller123')
-        seller = User.objects.get(username='seller')
-
-        cat, _ = Category.objects.get_or_create(name='Electronics', slug='electronics')
-        for title, price in [('Headphones', 6500), ('Keyboard', 7200), ('GPU Stand', 3500)]:
-            p, _ = Product.objects.get_or_create(
-                category=cat, title=title, slug=slugify(title),
-                defaults={'price': price, 'stock': 10}
-            )
-            Listing.objects.get_or_create(
-                product=p, seller=seller, starting_price=price*0.8,
-                buy_now_price=price*1.2,
-                starts_at=timezone.now(), ends_at=timezone.now()+timedelta(days=3)
-            )
-        self.stdout.write(self.style.SUCCESS('Seeded!'))
+    help = 'Generate a synthetic dataset (users, listings with bid ladders, watchlists, carts, orders).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help='Multiply every row count (e.g. 1000 for ~200k users and 1M listings).')
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--categories', type=int, default=12)
+        parser.add_argument('--products', type=int, default=1000, help='Auction and buy-now listings.')
+        parser.add_argument('--skus', type=int, default=200, help='Catalog products for carts and orders.')
+        parser.add_argument('--auction-share', type=float, default=0.6)
+        parser.add_argument('--bids-per-auction', type=int, default=8, help='Mean bid ladder length.')
+        parser.add_argument('--watches-per-user', type=int, default=5)
+        parser.add_argument('--cart-items-per-user', type=int, default=2)
+        parser.add_argument('--orders-per-user', type=int, default=2)
+        parser.add_argument('--seed', type=int, default=1, help='Same seed and chunk size, same data.')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows generated per unit of work.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT.')
+        parser.add_argument('--processes', type=int, default=1)
+
+    def handle(self, *args, **opts):
+        scale = opts['scale']
+        plan = datagen.Plan(
+            users=max(int(opts['users'] * scale), 1),
+            categories=opts['categories'],
+            products=int(opts['products'] * scale),
+            skus=int(opts['skus'] * scale),
+            auction_share=opts['auction_share'],
+            bids_per_auction=opts['bids_per_auction'],
+            watches_per_user=opts['watches_per_user'],
+            cart_items_per_user=opts['cart_items_per_user'],
+            orders_per_user=opts['orders_per_user'],
+            seed=opts['seed'],
+            chunk_size=opts['chunk_size'],
+            batch_size=opts['batch_size'],
+        )
+        datagen.allocate(plan)
+
+        started = time.perf_counter()
+        pool = None
+        if opts['processes'] > 1:
+            # children open their own connections
+            connections.close_all()
+            ctx = multiprocessing.get_context('spawn')
+            pool = ctx.Pool(opts['processes'], initializer=datagen_process.init_worker)
+
+        try:
+            for stage in datagen.stages(plan):
+                work = [(name, lo, hi) for name, total in stage for lo, hi in plan.chunks(total)]
+                stage_started = time.perf_counter()
+                if pool:
+                    counts = pool.starmap(
+                        datagen_process.build_chunk,
+                        [(plan.as_dict(), name, lo, hi) for name, lo, hi in work],
+                    )
+                else:
+                    counts = [datagen.build_chunk(plan, name, lo, hi) for name, lo, hi in work]
+                names = ', '.join(name for name, _ in stage)
+                self.stdout.write(
+                    f'{names}: {sum(counts)} rows in {time.perf_counter() - stage_started:.1f}s'
+                )
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+
+        datagen.finish(plan)
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded in {time.perf_counter() - started:.1f}s. '
+            f'Users log in as user{plan.user_pk(0)}..user{plan.user_pk(plan.users - 1)} '
+            f'with password "{datagen.PASSWORD}".'
+        ))
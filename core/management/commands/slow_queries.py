@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from core.models import SlowQuery
+from core.slowqueries import recorder
+
+ORDERINGS = {
+    'total': F('total_ms').desc(),
+    'max': F('max_ms').desc(),
+    'mean': (F('total_ms') / F('calls')).desc(),
+    'slow': F('slow_calls').desc(),
+}
+
+
+class Command(BaseCommand):
+    help = 'List the SQL shapes that have been slowest, with their view, stack and EXPLAIN.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument('--order', choices=sorted(ORDERINGS), default='total',
+                            help='Rank by total time (default), max, mean or slow-call count.')
+        parser.add_argument('--explain', action='store_true', help='Print the captured EXPLAIN.')
+        parser.add_argument('--stack', action='store_true', help='Print the last slow call stack.')
+        parser.add_argument('--reset', action='store_true', help='Delete all collected stats.')
+
+    def handle(self, *args, **opts):
+        if opts['reset']:
+            count = SlowQuery.objects.all().delete()[0]
+            self.stdout.write(self.style.SUCCESS(f'Deleted {count} slow query record(s).'))
+            return
+
+        # include whatever this process has seen (e.g. when run from a shell script)
+        recorder.flush()
+        rows = SlowQuery.objects.filter(calls__gt=0).order_by(ORDERINGS[opts['order']])[:opts['limit']]
+        if not rows:
+            self.stdout.write('No slow queries recorded.')
+            return
+
+        for rank, q in enumerate(rows, 1):
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'#{rank}  total {q.total_ms:.0f}ms  mean {q.mean_ms:.1f}ms  max {q.max_ms:.1f}ms  '
+                f'calls {q.calls}  slow {q.slow_calls}  view {q.view or "-"}'
+            ))
+            self.stdout.write(f'  {q.fingerprint[:500]}')
+            if opts['explain'] and q.explain:
+                self.stdout.write('  EXPLAIN:')
+                for line in q.explain.splitlines():
+                    self.stdout.write(f'    {line}')
+            if opts['stack'] and q.stack:
+                self.stdout.write('  Stack:')
+                for line in q.stack.rstrip().splitlines():
+                    self.stdout.write(f'  {line}')
@@ -1,3 +1,63 @@
+from django.contrib.auth.models import User
 from django.db import models
 
-# Create your models here.
+
+class IdempotencyKey(models.Model):
+    """
+    First response seen for a client-supplied Idempotency-Key.
+    - ``status_code`` 0 means the original request is still running.
+    - Only what's needed to replay is kept: status, redirect target and
+      (small) bodies for JSON endpoints.
+    """
+    IN_PROGRESS = 0
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    scope = models.CharField(max_length=50)
+    key = models.CharField(max_length=64)
+    # sha256 of the path and form data the key was first used with
+    fingerprint = models.CharField(max_length=64, blank=True)
+    status_code = models.PositiveSmallIntegerField(default=IN_PROGRESS)
+    location = models.CharField(max_length=500, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    body = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ("user", "scope", "key")
+
+    def __str__(self):
+        return f"{self.scope}:{self.key} ({self.status_code})"
+
+
+class SlowQuery(models.Model):
+    """
+    Latency stats for one SQL shape (see core.slowqueries) that has run slower
+    than SLOW_QUERY_MS at least once.
+    - ``calls``/``total_ms``/``max_ms`` cover every execution since then.
+    - ``explain`` is captured once, from the first slow execution.
+    - ``view`` and ``stack`` are from the most recent slow execution.
+    """
+
+    fingerprint_hash = models.CharField(max_length=40, unique=True)
+    fingerprint = models.TextField()
+    sample_sql = models.TextField()
+    calls = models.PositiveBigIntegerField(default=0)
+    slow_calls = models.PositiveBigIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    view = models.CharField(max_length=200, blank=True)
+    stack = models.TextField(blank=True)
+    explain = models.TextField(blank=True)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "slow queries"
+
+    def __str__(self):
+        return self.fingerprint[:80]
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.calls if self.calls else 0.0
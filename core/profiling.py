@@ -0,0 +1,232 @@
+# core/profiling.py
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+
+from .querybudget import wrap_connections
+
+HEADER = "HTTP_X_PROFILE"
+QUERY_PARAM = "_profile"
+# trigger values that mean "don't", as in ?_profile=0
+OFF_VALUES = {"", "0", "false", "no", "off"}
+SAMPLE_INTERVAL = 0.001
+FILE_SUFFIX = ".speedscope.json"
+NAME_RE = re.compile(r"^[\w.-]+\.speedscope\.json$")
+
+
+def profiles_dir():
+    return Path(getattr(settings, "PROFILES_DIR", settings.BASE_DIR / "var" / "profiles"))
+
+
+class Sampler:
+    """
+    Samples one thread's Python stack from a background thread until stopped.
+    Costs nothing until started; resolution is bounded by the GIL switch
+    interval (a few ms), which is plenty for requests that are slow.
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = []
+        self.started = self.stopped = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.stopped = time.perf_counter()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            stack.reverse()
+            self.samples.append((time.perf_counter(), stack))
+
+
+class SqlTimeline:
+    """``execute_wrapper`` that records when each statement started and ended."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((start, time.perf_counter(), sql))
+
+
+def speedscope(title, sampler, timeline):
+    """
+    One speedscope file with two profiles: the sampled Python stacks and,
+    on the same clock, an evented "SQL" lane with one span per statement.
+    """
+    frames, index = [], {}
+
+    def frame_id(key, **info):
+        if key not in index:
+            index[key] = len(frames)
+            frames.append(info)
+        return index[key]
+
+    origin, end = sampler.started, sampler.stopped
+    ms = lambda t: round((t - origin) * 1000, 3)  # noqa: E731
+
+    samples, weights = [], []
+    previous = origin
+    for at, stack in sampler.samples:
+        samples.append([
+            frame_id(key, name=key[0], file=key[1], line=key[2]) for key in stack
+        ])
+        weights.append(round((at - previous) * 1000, 3))
+        previous = at
+
+    events = []
+    for start, stop, sql in timeline.queries:
+        fid = frame_id(("sql", sql), name=sql[:300])
+        events.append({"type": "O", "frame": fid, "at": ms(start)})
+        events.append({"type": "C", "frame": fid, "at": ms(stop)})
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": title,
+        "exporter": "auction_shop",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": f"{title} (python)",
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": ms(end),
+                "samples": samples,
+                "weights": weights,
+            },
+            {
+                "type": "evented",
+                "name": f"{title} (SQL, {len(timeline.queries)} queries)",
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": ms(end),
+                "events": events,
+            },
+        ],
+    }
+
+
+def save(request, data, user):
+    directory = profiles_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    match = request.resolver_match
+    view = re.sub(r"[^\w.-]", "_", match.view_name if match else "unresolved")
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    path = directory / f"{stamp}-{view}-u{user.pk}{FILE_SUFFIX}"
+    path.write_text(json.dumps(data, separators=(",", ":")))
+    _prune(directory)
+    return path
+
+
+def _prune(directory):
+    keep = getattr(settings, "PROFILES_KEEP", 50)
+    for old in list_profiles(directory)[keep:]:
+        old.unlink(missing_ok=True)
+
+
+def list_profiles(directory=None):
+    """Saved profiles, newest first."""
+    directory = directory or profiles_dir()
+    if not directory.is_dir():
+        return []
+    files = [p for p in directory.iterdir() if NAME_RE.match(p.name)]
+    return sorted(files, key=lambda p: p.name, reverse=True)
+
+
+class ProfilingMiddleware:
+    """
+    Profile one request on demand: staff users send ``X-Profile: 1`` or add
+    ``?_profile=1``. The response carries ``X-Profile-File`` naming the
+    speedscope file, which can be downloaded from /admin/profiles/.
+    Other requests only pay for a header and query-string lookup.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        user = request.user
+        if not (_requested(request) and _is_staff(user)):
+            return self.get_response(request)
+
+        timeline = SqlTimeline()
+        sampler = Sampler(threading.get_ident())
+        with wrap_connections(timeline):
+            sampler.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                sampler.stop()
+        return self._save(request, user, response, sampler, timeline)
+
+    async def __acall__(self, request):
+        if not _requested(request):
+            return await self.get_response(request)
+        user = await request.auser()
+        if not _is_staff(user):
+            return await self.get_response(request)
+
+        # samples the event loop thread; the SQL lane comes from the
+        # request's thread-sensitive thread, where the async ORM runs queries
+        timeline = SqlTimeline()
+        sampler = Sampler(threading.get_ident())
+        stack = await sync_to_async(wrap_connections)(timeline)
+        sampler.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            sampler.stop()
+            await sync_to_async(stack.close)()
+        return self._save(request, user, response, sampler, timeline)
+
+    @staticmethod
+    def _save(request, user, response, sampler, timeline):
+        title = f"{request.method} {request.path}"
+        path = save(request, speedscope(title, sampler, timeline), user)
+        response["X-Profile-File"] = os.path.basename(path)
+        return response
+
+
+def _requested(request):
+    value = request.META.get(HEADER) or request.GET.get(QUERY_PARAM) or ""
+    return value.strip().lower() not in OFF_VALUES
+
+
+def _is_staff(user):
+    return user.is_authenticated and user.is_staff
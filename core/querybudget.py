@@ -0,0 +1,144 @@
+# core/querybudget.py
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+log = logging.getLogger(__name__)
+
+# a statement run this many times in one request is reported as a likely N+1
+DUPLICATE_THRESHOLD = getattr(settings, "QUERY_DUPLICATE_THRESHOLD", 5)
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"IN \((?:(?:%s|\?), )*(?:%s|\?)\)")
+
+
+def query_budget(queries=None, db_ms=None):
+    """
+    Declare how many queries (and optionally how much DB time, in ms) a view
+    may use per request. QueryBudgetMiddleware logs a warning when it goes
+    over; core.testing.QueryBudgetTestMixin fails the test.
+    """
+
+    def decorator(view):
+        view.query_budget = (queries, db_ms)
+        return view
+
+    return decorator
+
+
+def fingerprint(sql):
+    """SQL with parameters and IN-lists folded, so repeats of one statement compare equal."""
+    return _IN_LIST.sub("IN (...)", _LITERAL.sub("?", sql))
+
+
+class QueryStats:
+    """``connection.execute_wrapper`` that counts and times every statement."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    @property
+    def db_ms(self):
+        return self.seconds * 1000
+
+    def duplicates(self, threshold=DUPLICATE_THRESHOLD):
+        return [(sql, n) for sql, n in self.fingerprints.most_common() if n >= threshold]
+
+
+def wrap_connections(wrapper):
+    """
+    Install ``wrapper`` on every connection of the calling thread; returns
+    the ExitStack that removes them again (usable as a context manager).
+    """
+    stack = ExitStack()
+    for conn in connections.all():
+        stack.enter_context(conn.execute_wrapper(wrapper))
+    return stack
+
+
+class QueryBudgetMiddleware:
+    """
+    Per-request query count, DB time and repeated-statement fingerprints.
+    - Every request is logged at DEBUG under ``core.querybudget``.
+    - Views over their @query_budget, or repeating a statement
+      DUPLICATE_THRESHOLD+ times, are logged as warnings.
+    - With QUERY_COUNT_HEADERS (DEBUG by default) the numbers are also sent
+      back as X-DB-Queries / X-DB-Time response headers.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.headers = getattr(settings, "QUERY_COUNT_HEADERS", settings.DEBUG)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = QueryStats()
+        request._query_view = None
+        with wrap_connections(stats):
+            response = self.get_response(request)
+        return self._finish(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = QueryStats()
+        request._query_view = None
+        # async views run their queries on the request's thread-sensitive
+        # thread, so the wrappers go on (and come off) that thread's connections
+        stack = await sync_to_async(wrap_connections)(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self._finish(request, response, stats)
+
+    def _finish(self, request, response, stats):
+        # read by metrics.middleware.MetricsMiddleware
+        request.query_stats = stats
+        self._report(request, stats)
+        if self.headers:
+            response["X-DB-Queries"] = str(stats.count)
+            response["X-DB-Time"] = f"{stats.db_ms:.1f}ms"
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_view = view_func
+        return None
+
+    def _report(self, request, stats):
+        view = request._query_view
+        name = getattr(request.resolver_match, "view_name", None) or request.path
+        log.debug("%s %s: %d queries, %.1fms", request.method, name, stats.count, stats.db_ms)
+
+        problems = []
+        queries, db_ms = getattr(view, "query_budget", (None, None))
+        if queries is not None and stats.count > queries:
+            problems.append(f"{stats.count} queries (budget {queries})")
+        if db_ms is not None and stats.db_ms > db_ms:
+            problems.append(f"{stats.db_ms:.1f}ms in the database (budget {db_ms}ms)")
+        for sql, n in stats.duplicates():
+            problems.append(f"{n}x {sql[:200]}")
+        if problems:
+            log.warning("%s %s over query budget: %s", request.method, name, "; ".join(problems))
@@ -0,0 +1,168 @@
+# core/ratelimit.py
+
+import logging
+import math
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from metrics.registry import counter
+
+log = logging.getLogger(__name__)
+
+# URL name -> {scope: (requests, seconds)}; scopes are "user" and "ip"
+DEFAULT_RATE_LIMITS = {
+    "auctions:place_bid": {"user": (10, 10), "ip": (30, 10)},
+    "auctions:toggle_watchlist": {"user": (20, 10), "ip": (60, 10)},
+    "auctions:buy_now": {"user": (10, 10), "ip": (30, 10)},
+}
+# distinct keys a process tracks while the cache is down before starting over
+MAX_LOCAL_KEYS = 10_000
+
+THROTTLED = counter(
+    "requests_throttled", "Requests rejected by the rate limiter.", ["view", "scope"]
+)
+FALLBACKS = counter(
+    "ratelimit_local_fallbacks", "Rate-limit checks answered in-process because the cache failed."
+)
+
+
+def rate_limits():
+    return getattr(settings, "RATE_LIMITS", DEFAULT_RATE_LIMITS)
+
+
+class SharedBuckets:
+    """
+    Token buckets kept in the cache, which only offers atomic increments:
+    each is approximated by a sliding window of ``seconds``, counted in
+    two fixed windows (``incr`` on this one, weighted read of the last).
+    That admits the same ``requests`` per ``seconds`` on average, with
+    bursts up to ``requests``, on every process sharing the cache.
+    """
+
+    def take(self, key, requests, seconds, now):
+        """``(allowed, retry_after_seconds)``; raises if the cache does."""
+        window = int(now // seconds)
+        current = f"ratelimit:{key}:{window}"
+        cache.add(current, 0, timeout=seconds * 2)
+        count = cache.incr(current)
+        previous = cache.get(f"ratelimit:{key}:{window - 1}", 0)
+        elapsed = now - window * seconds
+        estimate = previous * (1 - elapsed / seconds) + count
+        if estimate <= requests:
+            return True, 0
+        return False, seconds - elapsed
+
+
+class LocalBuckets:
+    """
+    Exact token buckets in a plain dict, for when the cache is unreachable.
+    Lock-free: two threads racing on one bucket may both get the last
+    token, which costs a request or two of slack, never a stall. Limits
+    are per process while this is in use.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+
+    def take(self, key, requests, seconds, now):
+        rate = requests / seconds
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if len(self.buckets) >= MAX_LOCAL_KEYS:
+                self.buckets = {}
+            bucket = self.buckets.setdefault(key, [requests, now])
+        tokens = min(requests, bucket[0] + (now - bucket[1]) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        bucket[0], bucket[1] = tokens, now
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+
+shared = SharedBuckets()
+local = LocalBuckets()
+
+
+def take(key, requests, seconds, now=None):
+    now = time.time() if now is None else now
+    try:
+        return shared.take(key, requests, seconds, now)
+    except Exception:
+        # cache down or misbehaving: keep limiting, per process
+        log.warning("Rate-limit cache failed; using local buckets", exc_info=True)
+        FALLBACKS.inc()
+        return local.take(key, requests, seconds, now)
+
+
+def client_ip(request):
+    """
+    REMOTE_ADDR, or behind a proxy the RATE_LIMIT_IP_HEADER it sets (a
+    META key such as "HTTP_X_FORWARDED_FOR"); of a list, the last entry
+    is the one the proxy added, the rest are the client's say-so.
+    """
+    header = getattr(settings, "RATE_LIMIT_IP_HEADER", None)
+    forwarded = request.META.get(header, "") if header else ""
+    if forwarded:
+        return forwarded.split(",")[-1].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def identities(request):
+    """
+    ``(scope, id)`` pairs to charge, cheapest first. The IP needs nothing.
+    The user id is read from the session without loading the user, which
+    is a django_session query with the database session engine; being a
+    generator, that read only happens if the IP bucket let the request by.
+    """
+    yield "ip", client_ip(request)
+    user_id = request.session.get(SESSION_KEY) if hasattr(request, "session") else None
+    if user_id is not None:
+        yield "user", user_id
+
+
+class RateLimitMiddleware:
+    """
+    Token buckets per user and per IP for the URL names in RATE_LIMITS
+    (DEFAULT_RATE_LIMITS if unset). Runs before the view, so a throttled
+    request gets a 429 with Retry-After after a few cache calls and at
+    most the session read (none if its IP is over the limit), without
+    touching a model. Must come after SessionMiddleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_name = request.resolver_match.view_name
+        limits = rate_limits().get(view_name)
+        if not limits:
+            return None
+        for scope, ident in identities(request):
+            if scope not in limits:
+                continue
+            requests, seconds = limits[scope]
+            allowed, retry_after = take(f"{view_name}:{scope}:{ident}", requests, seconds)
+            if not allowed:
+                THROTTLED.inc(view=view_name, scope=scope)
+                response = HttpResponse("Too many requests; slow down.", status=429)
+                response["Retry-After"] = str(max(math.ceil(retry_after), 1))
+                return response
+        return None
@@ -0,0 +1,129 @@
+# core/routing.py
+
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+PIN_COOKIE = "primary_pin"
+
+# Per-request routing state. A mutable holder rather than plain flags, so a
+# write seen inside a thread-sensitive sync_to_async call is still visible here.
+_state = ContextVar("db_routing_state", default=None)
+
+
+class _RoutingState:
+    __slots__ = ("replica_reads", "wrote")
+
+    def __init__(self):
+        self.replica_reads = False
+        self.wrote = False
+
+
+def replica_reads(view):
+    """
+    Mark a read-only view as safe to serve from the read replica.
+    Non-GET requests, requests pinned by a recent write and any reads that
+    follow a write in the same request still go to the primary.
+    """
+    view.replica_reads = True
+    return view
+
+
+def replica_alias():
+    return getattr(settings, "REPLICA_DATABASE", None)
+
+
+class PrimaryReplicaRouter:
+    """
+    Reads go to the replica only inside views marked with @replica_reads;
+    everything else (and every write) uses ``default``.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        alias = replica_alias()
+        if alias and state and state.replica_reads and not state.wrote:
+            return alias
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state:
+            # read-your-writes for the rest of this request
+            state.wrote = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # both aliases hold the same data
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Sets up routing state for each request and, after any write, pins the
+    client to the primary for REPLICA_LAG_TOLERANCE seconds with a cookie so
+    they don't read stale data from a lagging replica.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = _RoutingState()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self._pin(state, response)
+
+    async def __acall__(self, request):
+        # the async ORM runs queries in a copy of this context, which shares
+        # the same _RoutingState holder
+        state = _RoutingState()
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self._pin(state, response)
+
+    @staticmethod
+    def _pin(state, response):
+        if state.wrote and replica_alias():
+            tolerance = getattr(settings, "REPLICA_LAG_TOLERANCE", 2)
+            response.set_cookie(
+                PIN_COOKIE,
+                f"{time.time() + tolerance:.3f}",
+                max_age=max(int(tolerance), 1),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            getattr(view_func, "replica_reads", False)
+            and request.method in ("GET", "HEAD")
+            and not self._pinned(request)
+        ):
+            state = _state.get()
+            if state:
+                state.replica_reads = True
+        return None
+
+    @staticmethod
+    def _pinned(request):
+        try:
+            return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
@@ -0,0 +1,229 @@
+# core/slowqueries.py
+
+import hashlib
+import logging
+import threading
+import time
+import traceback
+from contextvars import ContextVar
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from .querybudget import fingerprint
+
+log = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = getattr(settings, "SLOW_QUERY_FLUSH_SECONDS", 30)
+STACK_DEPTH = 10
+# fast shapes beyond this many are no longer tracked (slow ones always are)
+MAX_FINGERPRINTS = 5000
+
+_current_view = ContextVar("slow_query_view", default="")
+# set while we run our own EXPLAIN/flush queries, so they aren't recorded
+_busy = threading.local()
+
+_PROJECT_DIR = str(Path(settings.BASE_DIR).resolve())
+_EXPLAIN_PREFIX = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN ", "mysql": "EXPLAIN "}
+
+
+class _Stat:
+    __slots__ = ("fingerprint", "sample", "calls", "total_ms", "max_ms", "slow_calls",
+                 "view", "stack", "explain", "slow")
+
+    def __init__(self, fp, sql):
+        self.fingerprint = fp
+        self.sample = sql
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.slow_calls = 0
+        self.view = ""
+        self.stack = ""
+        self.explain = ""
+        # once slow, a fingerprint keeps being flushed to SlowQuery
+        self.slow = False
+
+
+class Recorder:
+    """
+    ``execute_wrapper`` installed on every connection (see CoreConfig.ready).
+    - Every statement updates in-memory stats for its fingerprint.
+    - A statement over SLOW_QUERY_MS also records the calling view and
+      stack, and runs EXPLAIN the first time its fingerprint is slow.
+    - flush() writes the accumulated stats of slow fingerprints to SlowQuery.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self.explained = set()
+        self.last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_busy, "active", False):
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        # failed statements raise straight through and aren't recorded
+        self.record(sql, params, many, context, (time.perf_counter() - start) * 1000)
+        return result
+
+    def record(self, sql, params, many, context, ms):
+        fp = fingerprint(sql)
+        slow = ms >= settings.SLOW_QUERY_MS
+        with self._lock:
+            stat = self.stats.get(fp)
+            if stat is None:
+                if not slow and len(self.stats) >= MAX_FINGERPRINTS:
+                    return
+                stat = self.stats[fp] = _Stat(fp, sql)
+            stat.calls += 1
+            stat.total_ms += ms
+            stat.max_ms = max(stat.max_ms, ms)
+            if not slow:
+                return
+            stat.slow = True
+            stat.slow_calls += 1
+            stat.view = _current_view.get()
+            stat.stack = _stack()
+            explain = fp not in self.explained
+            self.explained.add(fp)
+        if explain and not many:
+            stat.explain = _explain(context["connection"], sql, params)
+
+    def flush(self):
+        """Add pending stats to SlowQuery rows; returns the number of fingerprints written."""
+        from .models import SlowQuery
+
+        with self._lock:
+            pending = [s for s in self.stats.values() if s.slow and s.calls]
+            snapshot = [
+                (s.fingerprint, s.sample, s.calls, s.total_ms, s.max_ms,
+                 s.slow_calls, s.view, s.stack, s.explain)
+                for s in pending
+            ]
+            for s in pending:
+                s.calls = s.slow_calls = 0
+                s.total_ms = s.max_ms = 0.0
+                s.explain = ""
+            self.last_flush = time.monotonic()
+        if not snapshot:
+            return 0
+
+        _busy.active = True
+        try:
+            for fp, sample, calls, total_ms, max_ms, slow_calls, view, stack, explain in snapshot:
+                key = hashlib.sha1(fp.encode()).hexdigest()
+                SlowQuery.objects.get_or_create(
+                    fingerprint_hash=key,
+                    defaults={"fingerprint": fp, "sample_sql": sample[:10000]},
+                )
+                changes = {
+                    "calls": F("calls") + calls,
+                    "total_ms": F("total_ms") + total_ms,
+                    "max_ms": Greatest(F("max_ms"), max_ms),
+                    "slow_calls": F("slow_calls") + slow_calls,
+                }
+                if slow_calls:
+                    changes.update(view=view[:200], stack=stack)
+                rows = SlowQuery.objects.filter(fingerprint_hash=key)
+                rows.update(**changes)
+                if explain:
+                    rows.filter(explain="").update(explain=explain)
+        except DatabaseError:
+            log.exception("Could not save slow query stats")
+        finally:
+            _busy.active = False
+        return len(snapshot)
+
+    def due(self):
+        return time.monotonic() - self.last_flush >= FLUSH_INTERVAL
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+            self.explained.clear()
+
+
+recorder = Recorder()
+
+
+def install(connection, **kwargs):
+    """connection_created receiver: wrap every new connection."""
+    if recorder not in connection.execute_wrappers:
+        connection.execute_wrappers.append(recorder)
+
+
+def _stack():
+    frames = [
+        f for f in traceback.extract_stack()[:-3]
+        if f.filename.startswith(_PROJECT_DIR) and "site-packages" not in f.filename
+    ]
+    return "".join(traceback.format_list(frames[-STACK_DEPTH:]))
+
+
+def _explain(connection, sql, params):
+    prefix = _EXPLAIN_PREFIX.get(connection.vendor)
+    if not prefix or not sql.lstrip().upper().startswith("SELECT"):
+        return ""
+    _busy.active = True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            return "\n".join(" | ".join(str(col) for col in row) for row in cursor.fetchall())
+    except DatabaseError as exc:
+        return f"EXPLAIN failed: {exc}"
+    finally:
+        _busy.active = False
+
+
+class SlowQueryMiddleware:
+    """
+    Tags slow queries with the view that ran them and flushes stats now and
+    then, after a response has been sent.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _current_view.set(request.path)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_view.reset(token)
+        return self._flush_after(response)
+
+    async def __acall__(self, request):
+        token = _current_view.set(request.path)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_view.reset(token)
+        return self._flush_after(response)
+
+    @staticmethod
+    def _flush_after(response):
+        # the server closes the response once the body is sent: the flush
+        # adds nothing to this request's latency and runs after the
+        # replica routing state is gone, so its writes can't pin the client
+        if recorder.due():
+            response._resource_closers.append(recorder.flush)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        _current_view.set(match.view_name if match else request.path)
+        return None
@@ -0,0 +1,16 @@
+from datetime import timedelta
+
+from jobs.queue import task
+from .idempotency import purge_expired
+from .slowqueries import recorder
+
+
+@task(every=timedelta(hours=1))
+def purge_idempotency_keys(batch_size=1000):
+    return purge_expired(batch_size=batch_size)
+
+
+@task(every=timedelta(minutes=1))
+def flush_slow_queries():
+    """Save this worker process's slow-query stats (web processes flush from the middleware)."""
+    return recorder.flush()
@@ -0,0 +1,16 @@
+import uuid
+
+from django import template
+from django.utils.html import format_html
+
+from core.idempotency import FORM_FIELD
+
+register = template.Library()
+
+
+@register.simple_tag
+def idempotency_key_input():
+    """Hidden input carrying a fresh idempotency key, so double submits are ignored."""
+    return format_html(
+        '<input type="hidden" name="{}" value="{}">', FORM_FIELD, uuid.uuid4().hex
+    )
@@ -0,0 +1,76 @@
+# core/testing.py
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+from .querybudget import DUPLICATE_THRESHOLD, fingerprint
+
+
+def grow_table(model, rows):
+    """
+    Double ``model``'s table with INSERT ... SELECT until it has at least
+    ``rows`` rows: seed a few hundred through the ORM, get 100k+ in a handful
+    of statements. Copies share foreign keys, so unique constraints beyond
+    the pk must not apply to the copied columns.
+    """
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    columns = ", ".join(qn(f.column) for f in model._meta.concrete_fields if not f.primary_key)
+    count = model.objects.count()
+    if not count:
+        raise ValueError(f"seed {model.__name__} before growing it")
+    with connection.cursor() as cursor:
+        while count < rows:
+            cursor.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {table}")
+            count *= 2
+    return count
+
+
+class QueryBudgetTestMixin:
+    """
+    TestCase mixin for catching N+1 regressions before production does.
+
+        self.assertQueryBudget(reverse("auctions:listing_list"), self.add_products)
+
+    ``populate(n)`` must add ``n`` more rows of whatever the view lists. The
+    view is requested at each size in ``sizes`` and must stay within its
+    @query_budget, never need more queries at the largest size than at the
+    smallest (warm caches may save some) and never repeat a statement
+    DUPLICATE_THRESHOLD times.
+    """
+
+    def assertQueryBudget(self, url, populate, sizes=(10, 1000), client=None):
+        client = client or self.client
+        queries, _ = getattr(resolve(url).func, "query_budget", (None, None))
+        created = 0
+        counts = {}
+        for size in sizes:
+            populate(size - created)
+            created = size
+            with CaptureQueriesContext(connection) as ctx:
+                response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+            count = len(ctx.captured_queries)
+            counts[size] = count
+            if queries is not None:
+                self.assertLessEqual(
+                    count, queries,
+                    f"{url} ran {count} queries with {size} rows (budget {queries})",
+                )
+            repeats = {}
+            for query in ctx.captured_queries:
+                sql = fingerprint(query["sql"])
+                repeats[sql] = repeats.get(sql, 0) + 1
+            worst = max(repeats.items(), key=lambda kv: kv[1], default=("", 0))
+            self.assertLess(
+                worst[1], DUPLICATE_THRESHOLD,
+                f"{url} repeated a query {worst[1]}x with {size} rows: {worst[0][:200]}",
+            )
+
+        self.assertLessEqual(
+            counts[sizes[-1]], counts[sizes[0]],
+            f"{url} query count grows with the data: {counts}",
+        )
+        return counts
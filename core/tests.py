@@ -1,3 +1,657 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import json
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.middleware.csrf import get_token
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+
+from auctions.models import Bid, Order, Product
+from auctions.views import auction_list
+from cart.models import CartItem
+from catalog.models import Category, Product as CatalogProduct
+from metrics.registry import render as render_metrics
+from metrics.store import get_store
+from orders.models import Order as ShopOrder, OrderItem
+from .admission import AdmissionMiddleware, Gate
+from .idempotency import idempotent, purge_expired
+from .models import IdempotencyKey, SlowQuery
+from .querybudget import fingerprint
+from .ratelimit import LocalBuckets
+from .routing import PIN_COOKIE
+from .slowqueries import recorder
+
+
+class IdempotencyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user("seller")
+        cls.bidder = User.objects.create_user("bidder")
+        cls.auction = Product.objects.create(
+            seller=cls.seller,
+            title="Lamp",
+            price=500,
+            listing_type="BID",
+            starting_bid=10,
+            min_increment=1,
+            auction_end=timezone.now() + timedelta(hours=1),
+        )
+
+    def setUp(self):
+        self.client.force_login(self.bidder)
+
+    def test_retried_bid_is_replayed(self):
+        url = reverse("auctions:place_bid", args=[self.auction.pk])
+        first = self.client.post(url, {"amount": "20"}, headers={"Idempotency-Key": "abc"})
+
+        with self.assertNumQueries(3):  # session, user, key lookup
+            retry = self.client.post(url, {"amount": "20"}, headers={"Idempotency-Key": "abc"})
+
+        self.assertEqual(Bid.objects.count(), 1)
+        self.assertEqual(retry.status_code, first.status_code)
+        self.assertEqual(retry["Location"], first["Location"])
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+
+    def test_key_reused_for_another_request_is_refused(self):
+        other = Product.objects.create(
+            seller=self.seller, title="Vase", price=500, listing_type="BID", starting_bid=10,
+            auction_end=timezone.now() + timedelta(hours=1),
+        )
+        url = reverse("auctions:place_bid", args=[self.auction.pk])
+        self.client.post(url, {"amount": "20"}, headers={"Idempotency-Key": "same"})
+
+        response = self.client.post(
+            reverse("auctions:place_bid", args=[other.pk]), {"amount": "20"},
+            headers={"Idempotency-Key": "same"},
+        )
+        self.assertEqual(response.status_code, 422)
+        response = self.client.post(url, {"amount": "25"}, headers={"Idempotency-Key": "same"})
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(list(Bid.objects.values_list("product_id", "amount")), [(self.auction.pk, 20)])
+
+        # a form retry carries a fresh CSRF token but is still the same request
+        retry = self.client.post(
+            url, {"amount": "20", "csrfmiddlewaretoken": "x", "idempotency_key": "same"}
+        )
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+
+    def test_keys_are_scoped_per_view(self):
+        self.client.post(
+            reverse("auctions:place_bid", args=[self.auction.pk]),
+            {"amount": "20", "idempotency_key": "k1"},
+        )
+        self.client.post(
+            reverse("auctions:buy_now", args=[self.auction.pk]),
+            {"idempotency_key": "k1"},
+        )
+        self.assertEqual(Bid.objects.count(), 1)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_in_flight_key_returns_conflict(self):
+        IdempotencyKey.objects.create(
+            user=self.bidder, scope="buy_now", key="busy",
+            expires_at=timezone.now() + timedelta(minutes=1),
+        )
+        response = self.client.post(
+            reverse("auctions:buy_now", args=[self.auction.pk]),
+            headers={"Idempotency-Key": "busy"},
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Order.objects.exists())
+
+    def test_rendered_pages_release_the_key(self):
+        calls = []
+
+        @idempotent("form")
+        def view(request):
+            calls.append(request)
+            return HttpResponse("<p>Out of stock</p>", status=409 if len(calls) == 1 else 200)
+
+        request = RequestFactory().post("/", headers={"Idempotency-Key": "page"})
+        request.user = self.bidder
+        self.assertEqual(view(request).status_code, 409)
+        self.assertFalse(IdempotencyKey.objects.filter(scope="form").exists())
+        # the retry runs the view for real instead of replaying a blank page
+        response = view(request)
+        self.assertEqual((response.status_code, response.content, len(calls)), (200, b"<p>Out of stock</p>", 2))
+        self.assertFalse(IdempotencyKey.objects.filter(scope="form").exists())
+
+    def test_purge_expired(self):
+        past = timezone.now() - timedelta(seconds=1)
+        IdempotencyKey.objects.bulk_create([
+            IdempotencyKey(user=self.bidder, scope="checkout", key=str(n), status_code=302, expires_at=past)
+            for n in range(5)
+        ])
+        self.assertEqual(purge_expired(batch_size=2), 5)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+@skipUnless("replica" in settings.DATABASES, "needs config.settings_test or DB_REPLICA_HOST")
+@override_settings(REPLICA_DATABASE="replica", REPLICA_LAG_TOLERANCE=5)
+class ReplicaRoutingTests(TestCase):
+    """
+    The two databases are independent here, so a row that only exists on the
+    replica shows which database a view read from.
+    """
+
+    databases = {"default", "replica"}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("watcher")
+        cls.product = Product.objects.create(seller=cls.user, title="Primary row", price=10)
+        replica_seller = User.objects.using("replica").create(username="replica-seller")
+        Product.objects.using("replica").create(
+            seller=replica_seller, title="Replica row", price=10
+        )
+
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_slow_query_flush_does_not_pin_the_response(self):
+        recorder.reset()
+        self.addCleanup(recorder.reset)
+        recorder.last_flush = 0  # due
+        flushed = []
+        flush = recorder.flush
+        with patch.object(recorder, "flush", lambda: flushed.append(flush())):
+            response = self.client.get(reverse("auctions:listing_list"))
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+        # ran when the client closed the response
+        self.assertEqual(len(flushed), 1)
+        self.assertTrue(SlowQuery.objects.exists())
+
+    def test_marked_views_read_from_replica(self):
+        response = self.client.get(reverse("auctions:listing_list"))
+        self.assertContains(response, "Replica row")
+        self.assertNotContains(response, "Primary row")
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_unmarked_views_read_from_primary(self):
+        response = self.client.get(reverse("auctions:listing_detail", args=[self.product.pk]))
+        self.assertContains(response, "Primary row")
+
+    def test_write_pins_client_to_primary(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse("auctions:toggle_watchlist", args=[self.product.pk]))
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        response = self.client.get(reverse("auctions:listing_list"))
+        self.assertContains(response, "Primary row")
+        self.assertNotContains(response, "Replica row")
+
+    def test_pin_expires_after_lag_tolerance(self):
+        self.client.cookies[PIN_COOKIE] = str(time.time() - 1)
+        response = self.client.get(reverse("auctions:listing_list"))
+        self.assertContains(response, "Replica row")
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_routing_off_without_replica(self):
+        response = self.client.get(reverse("auctions:listing_list"))
+        self.assertContains(response, "Primary row")
+
+
+class QueryBudgetMiddlewareTests(TestCase):
+    def test_fingerprint_folds_parameters(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'x''y'"),
+            fingerprint("SELECT * FROM t WHERE id IN (4) AND name = 'z'"),
+        )
+
+    @override_settings(QUERY_COUNT_HEADERS=True)
+    def test_headers_and_budget_warning(self):
+        seller = User.objects.create_user("seller")
+        for n in range(3):
+            Product.objects.create(seller=seller, title=f"Item {n}", price=10)
+        with self.assertLogs("core.querybudget", "WARNING") as logs, \
+                patch.object(auction_list, "query_budget", (0, None)):
+            response = self.client.get(reverse("auctions:listing_list"))
+        self.assertEqual(response["X-DB-Queries"], "1")
+        self.assertIn("1 queries (budget 0)", logs.output[0])
+
+
+class SeedCommandTests(TestCase):
+    def seed(self, **options):
+        call_command("seed", stdout=StringIO(), users=20, products=60, skus=10, chunk_size=25, **options)
+
+    def snapshot(self):
+        # timestamps are relative to "now", so compare everything else
+        return (
+            list(Product.objects.order_by("pk").values_list("listing_type", "price", "watch_count")),
+            list(Bid.objects.order_by("pk").values_list("amount", flat=True)),
+            list(CartItem.objects.order_by("pk").values_list("quantity", flat=True)),
+            list(OrderItem.objects.order_by("pk").values_list("quantity", "price")),
+        )
+
+    def test_generates_consistent_data(self):
+        self.seed()
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Product.objects.count(), 60)
+        self.assertTrue(Bid.objects.exists())
+        for product in Product.objects.annotate(watchers=Count("watchlisted_by")):
+            self.assertEqual(product.watch_count, product.watchers)
+        for product in Product.objects.filter(listing_type="BID", is_active=False, winner__isnull=False):
+            self.assertEqual(product.winner_id, product.highest_bid_obj.bidder_id)
+        self.assertFalse(
+            OrderItem.objects.values("order").annotate(n=Count("pk")).filter(n=0).exists()
+        )
+
+    def test_same_seed_same_data(self):
+        self.seed(seed=7)
+        first = self.snapshot()
+        Order.objects.all().delete()
+        ShopOrder.objects.all().delete()
+        User.objects.all().delete()
+        self.seed(seed=7)
+        self.assertEqual(self.snapshot(), first)
+
+
+class ProfilingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user("staff", is_staff=True)
+        cls.user = User.objects.create_user("shopper")
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(PROFILES_DIR=Path(tmp.name))
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_staff_request_writes_speedscope_file(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("auctions:dashboard"), headers={"X-Profile": "1"})
+        name = response["X-Profile-File"]
+        self.assertIn("auctions_dashboard", name)
+
+        download = self.client.get(reverse("profile_download", args=[name]))
+        data = json.loads(b"".join(download.streaming_content))
+        python, sql = data["profiles"]
+        self.assertEqual(python["type"], "sampled")
+        self.assertEqual(sql["type"], "evented")
+        self.assertTrue(sql["events"])
+
+        listing = self.client.get(reverse("profile_list"))
+        self.assertContains(listing, name)
+
+    def test_non_staff_and_untriggered_requests_are_not_profiled(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("auctions:dashboard") + "?_profile=1")
+        self.assertNotIn("X-Profile-File", response)
+        self.assertEqual(self.client.get(reverse("profile_list")).status_code, 302)
+
+        self.client.force_login(self.staff)
+        self.assertNotIn("X-Profile-File", self.client.get(reverse("auctions:dashboard")))
+        for query in ("_profile=0", "_profile=", "x_profile=1", "_profile=off"):
+            response = self.client.get(reverse("auctions:dashboard") + "?" + query)
+            self.assertNotIn("X-Profile-File", response, query)
+        response = self.client.get(reverse("auctions:dashboard") + "?_profile=1")
+        self.assertIn("X-Profile-File", response)
+
+    def test_download_rejects_other_paths(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("profile_download", args=["..settings.py"]))
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(SLOW_QUERY_MS=0)
+class SlowQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seller = User.objects.create_user("seller")
+        cls.product = Product.objects.create(
+            seller=seller, title="Lamp", price=10, listing_type="BID", starting_bid=1,
+            auction_end=timezone.now() + timedelta(hours=1),
+        )
+
+    def setUp(self):
+        recorder.reset()
+        self.addCleanup(recorder.reset)
+
+    def test_slow_queries_are_aggregated_with_view_and_explain(self):
+        url = reverse("auctions:status_json", args=[self.product.pk])
+        self.client.get(url)
+        self.client.get(url)
+        recorder.flush()
+
+        status_query = SlowQuery.objects.get(
+            fingerprint__contains='FROM "auctions_product"', view="auctions:status_json"
+        )
+        self.assertEqual(status_query.calls, 2)
+        self.assertEqual(status_query.slow_calls, 2)
+        self.assertIn("?", status_query.fingerprint)
+        self.assertTrue(status_query.explain)
+        self.assertTrue(status_query.stack)
+
+        # later flushes add to the same row
+        self.client.get(url)
+        recorder.flush()
+        status_query.refresh_from_db()
+        self.assertEqual(status_query.calls, 3)
+
+    def test_command_lists_top_offenders(self):
+        self.client.get(reverse("auctions:status_json", args=[self.product.pk]))
+        out = StringIO()
+        call_command("slow_queries", "--explain", "--limit", "3", stdout=out)
+        self.assertIn("#1", out.getvalue())
+        self.assertIn("EXPLAIN", out.getvalue())
+
+    @override_settings(SLOW_QUERY_MS=10_000)
+    def test_fast_queries_are_not_saved(self):
+        self.client.get(reverse("auctions:status_json", args=[self.product.pk]))
+        self.assertEqual(recorder.flush(), 0)
+        self.assertFalse(SlowQuery.objects.exists())
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_superuser("finance", "finance@example.com", "pw")
+        cls.seller = User.objects.create_user("seller")
+        cls.other = User.objects.create_user("other")
+        cls.bidder = User.objects.create_user("bidder")
+        cls.mine = Product.objects.bulk_create([
+            Product(seller=cls.seller, title=f"Mine {i}", price=10) for i in range(5)
+        ])
+        cls.theirs = Product.objects.create(seller=cls.other, title="Theirs", price=10)
+        Bid.objects.bulk_create(
+            [Bid(product=p, bidder=cls.bidder, amount=20) for p in cls.mine]
+            + [Bid(product=cls.theirs, bidder=cls.bidder, amount=30)]
+        )
+
+    def read(self, response):
+        self.assertEqual(response.status_code, 200)
+        data = b"".join(response.streaming_content)
+        if response["Content-Type"] == "application/gzip":
+            data = gzip.decompress(data)
+        return data.decode()
+
+    def url(self, name, fmt="csv"):
+        return reverse("core:export", args=[name, fmt])
+
+    def test_staff_export_streams_every_row_in_keyset_chunks(self):
+        self.client.force_login(self.staff)
+        with patch("core.exports.CHUNK_SIZE", 2), CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url("bids"))
+            rows = list(csv.DictReader(StringIO(self.read(response))))
+
+        self.assertIn('filename="bids-', response["Content-Disposition"])
+        self.assertEqual(len(rows), 6)
+        self.assertEqual([r["id"] for r in rows], sorted((r["id"] for r in rows), key=int))
+        self.assertEqual(rows[0]["bidder"], "bidder")
+        # 6 rows in chunks of 2: three full chunks and an empty one, no OFFSET
+        chunks = [q["sql"] for q in ctx.captured_queries if 'FROM "auctions_bid"' in q["sql"]]
+        self.assertEqual(len(chunks), 4)
+        self.assertTrue(all("OFFSET" not in sql for sql in chunks))
+
+    def test_seller_only_gets_their_own_rows(self):
+        self.client.force_login(self.seller)
+        rows = list(csv.DictReader(StringIO(self.read(self.client.get(self.url("products"))))))
+        self.assertEqual({r["title"] for r in rows}, {p.title for p in self.mine})
+
+        bids = self.read(self.client.get(self.url("bids", "jsonl"))).splitlines()
+        self.assertEqual(len(bids), 5)
+        self.assertEqual(json.loads(bids[0])["amount"], "20.00")
+
+    def test_gzip_and_date_filters(self):
+        self.client.force_login(self.staff)
+        today = timezone.localdate()
+        response = self.client.get(self.url("products"), {"gzip": "1", "since": today.isoformat()})
+        self.assertTrue(response["Content-Disposition"].endswith('.csv.gz"'))
+        self.assertEqual(len(self.read(response).splitlines()), 7)
+
+        yesterday = (today - timedelta(days=1)).isoformat()
+        response = self.client.get(self.url("products"), {"until": yesterday})
+        self.assertEqual(len(self.read(response).splitlines()), 1)  # header only
+        self.assertEqual(self.client.get(self.url("products"), {"since": "nope"}).status_code, 400)
+
+    def test_staff_only_datasets_and_unknown_names(self):
+        self.client.force_login(self.seller)
+        self.assertEqual(self.client.get(self.url("nope")).status_code, 404)
+        self.assertEqual(self.client.get(self.url("products", "xml")).status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url("products")).status_code, 302)
+
+    def test_admin_action_exports_selection(self):
+        self.client.force_login(self.staff)
+        response = self.client.post(reverse("admin:auctions_product_changelist"), {
+            "action": "export_jsonl",
+            "_selected_action": [p.pk for p in self.mine[:2]],
+        })
+        lines = self.read(response).splitlines()
+        self.assertEqual([json.loads(line)["title"] for line in lines], ["Mine 0", "Mine 1"])
+
+    def test_shop_order_items(self):
+        shop_user = User.objects.create_user("shopper")
+        category = Category.objects.create(name="Lamps", slug="lamps")
+        item = CatalogProduct.objects.create(
+            category=category, title="Desk lamp", slug="desk-lamp", price=25, stock=3
+        )
+        order = ShopOrder.objects.create(user=shop_user, total=50)
+        OrderItem.objects.create(order=order, product=item, quantity=2, price=25)
+
+        self.client.force_login(shop_user)
+        rows = list(csv.DictReader(StringIO(self.read(self.client.get(self.url("order-items"))))))
+        self.assertEqual(rows[0]["product_slug"], "desk-lamp")
+        self.assertEqual(rows[0]["quantity"], "2")
+        self.client.force_login(self.seller)
+        self.assertEqual(len(self.read(self.client.get(self.url("orders"))).splitlines()), 1)
+
+
+@override_settings(RATE_LIMITS={
+    "auctions:place_bid": {"user": (2, 60), "ip": (100, 60)},
+    "auctions:toggle_watchlist": {"ip": (1, 60)},
+})
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user("seller")
+        cls.bidder = User.objects.create_user("bidder")
+        cls.auction = Product.objects.create(
+            seller=cls.seller, title="Lamp", price=500, listing_type="BID", starting_bid=10,
+            auction_end=timezone.now() + timedelta(hours=1),
+        )
+
+    def setUp(self):
+        cache.clear()
+        get_store().clear()
+
+    def test_user_is_throttled_before_the_view_runs(self):
+        self.client.force_login(self.bidder)
+        url = reverse("auctions:place_bid", args=[self.auction.pk])
+        for amount in ("20", "30"):
+            self.assertEqual(self.client.post(url, {"amount": amount}).status_code, 302)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(url, {"amount": "40"})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+        # only the session read; no product, bid or user query
+        self.assertEqual([q["sql"] for q in ctx.captured_queries if "django_session" not in q["sql"]], [])
+        self.assertEqual(Bid.objects.count(), 2)
+        self.assertIn(
+            'requests_throttled_total{scope="user",view="auctions:place_bid"} 1.0', render_metrics()
+        )
+
+        # a different user has their own bucket
+        self.client.force_login(self.seller)
+        self.assertNotEqual(self.client.post(url, {"amount": "50"}).status_code, 429)
+
+    def test_anonymous_requests_are_limited_per_ip(self):
+        url = reverse("auctions:toggle_watchlist", args=[self.auction.pk])
+        self.assertEqual(self.client.post(url).status_code, 302)
+        self.assertEqual(self.client.post(url).status_code, 429)
+        other_ip = self.client.post(url, REMOTE_ADDR="10.0.0.9")
+        self.assertEqual(other_ip.status_code, 302)
+
+    def test_ip_throttled_requests_skip_the_session(self):
+        self.client.force_login(self.bidder)
+        url = reverse("auctions:toggle_watchlist", args=[self.auction.pk])
+        self.client.post(url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.post(url).status_code, 429)
+
+    @override_settings(RATE_LIMIT_IP_HEADER="HTTP_X_FORWARDED_FOR")
+    def test_forwarded_ip_header_separates_clients_behind_a_proxy(self):
+        url = reverse("auctions:toggle_watchlist", args=[self.auction.pk])
+        first = {"HTTP_X_FORWARDED_FOR": "203.0.113.7"}
+        self.assertEqual(self.client.post(url, **first).status_code, 302)
+        self.assertEqual(self.client.post(url, **first).status_code, 429)
+        # a spoofed left-hand entry doesn't buy a new bucket
+        spoofed = {"HTTP_X_FORWARDED_FOR": "198.51.100.1, 203.0.113.7"}
+        self.assertEqual(self.client.post(url, **spoofed).status_code, 429)
+        self.assertEqual(self.client.post(url, HTTP_X_FORWARDED_FOR="203.0.113.8").status_code, 302)
+
+    def test_local_buckets_take_over_when_the_cache_fails(self):
+        url = reverse("auctions:toggle_watchlist", args=[self.auction.pk])
+        with patch("core.ratelimit.cache.incr", side_effect=ConnectionError), \
+                self.assertLogs("core.ratelimit", "WARNING"):
+            self.assertEqual(self.client.post(url).status_code, 302)
+            self.assertEqual(self.client.post(url).status_code, 429)
+        self.assertIn("ratelimit_local_fallbacks_total 2.0", render_metrics())
+
+    def test_local_bucket_refills(self):
+        buckets = LocalBuckets()
+        self.assertEqual(buckets.take("k", 2, 10, now=0), (True, 0))
+        self.assertEqual(buckets.take("k", 2, 10, now=0), (True, 0))
+        allowed, wait = buckets.take("k", 2, 10, now=1)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 4)
+        self.assertTrue(buckets.take("k", 2, 10, now=6)[0])
+
+
+@override_settings(
+    ADMISSION_CLASSES={
+        "critical": {"views": ["auctions:place_bid"], "limit": 2, "queue": 0, "wait": 0},
+        "normal": {"limit": 2, "queue": 0, "wait": 0},
+        "low": {"views": ["auctions:listing_list"], "anonymous_only": True,
+                "limit": 1, "queue": 0, "wait": 0},
+    },
+    ADMISSION_DB_SLOTS=3,
+)
+class AdmissionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_store().clear()
+        self.factory = RequestFactory()
+        self.middleware = AdmissionMiddleware(lambda request: HttpResponse("fresh"))
+
+    def test_full_gate_sheds_with_retry_after(self):
+        self.middleware.gates["normal"].active = 2
+        response = self.middleware(self.factory.get("/auctions/watchlist/"))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "2")
+        self.assertIn('admission_shed_total{priority="normal",served="503"} 1.0', render_metrics())
+
+        self.middleware.gates["normal"].active = 1
+        self.assertEqual(self.middleware(self.factory.get("/auctions/watchlist/")).content, b"fresh")
+
+    def test_shed_anonymous_read_gets_the_stale_copy(self):
+        self.assertEqual(self.middleware(self.factory.get("/auctions/")).content, b"fresh")
+        self.middleware.gates["low"].active = 1
+
+        response = self.middleware(self.factory.get("/auctions/"))
+        self.assertEqual((response.status_code, response.content), (200, b"fresh"))
+        self.assertEqual(response["X-Stale"], "1")
+        # no copy of this page yet
+        self.assertEqual(self.middleware(self.factory.get("/auctions/?page=2")).status_code, 503)
+
+        # a logged-in reader is not low priority
+        request = self.factory.get("/auctions/")
+        request.COOKIES[settings.SESSION_COOKIE_NAME] = "x"
+        self.assertFalse(self.middleware(request).has_header("X-Stale"))
+
+    def test_pages_with_cookies_or_csrf_tokens_are_not_kept(self):
+        def with_token(request):
+            return HttpResponse(f"<input value='{get_token(request)}'>")
+
+        def with_cookie(request):
+            response = HttpResponse("fresh")
+            response.set_cookie("seen", "1")
+            return response
+
+        for view in (with_token, with_cookie):
+            middleware = AdmissionMiddleware(view)
+            middleware(self.factory.get("/auctions/"))
+            middleware.gates["low"].active = 1
+            self.assertEqual(middleware(self.factory.get("/auctions/")).status_code, 503, view.__name__)
+
+    def test_stale_copies_are_kept_per_cookie_header(self):
+        def varies(request):
+            response = HttpResponse(request.COOKIES.get("theme", "plain"))
+            patch_vary_headers(response, ("Cookie",))
+            return response
+
+        middleware = AdmissionMiddleware(varies)
+        middleware(self.factory.get("/auctions/"))
+        middleware.gates["low"].active = 1
+        response = middleware(self.factory.get("/auctions/"))
+        self.assertEqual((response.content, response["Vary"]), (b"plain", "Cookie"))
+        dark = self.factory.get("/auctions/", headers={"Cookie": "theme=dark"})
+        self.assertEqual(middleware(dark).status_code, 503)
+
+    def test_bids_are_admitted_when_the_process_is_saturated(self):
+        self.middleware.gates["normal"].active = 2
+        self.middleware.gates["low"].active = 1
+        self.assertEqual(self.middleware(self.factory.get("/auctions/watchlist/")).status_code, 503)
+        response = self.middleware(self.factory.post("/auctions/1/bid/"))
+        self.assertEqual(response.content, b"fresh")
+        self.assertEqual(self.middleware.gates["critical"].active, 0)
+
+    def test_disabled_with_no_classes(self):
+        with override_settings(ADMISSION_CLASSES={}):
+            middleware = AdmissionMiddleware(lambda request: HttpResponse("fresh"))
+        self.assertEqual(middleware(self.factory.get("/auctions/")).content, b"fresh")
+
+    async def test_async_requests_wait_for_a_slot(self):
+        async def view(request):
+            return HttpResponse("fresh")
+
+        middleware = AdmissionMiddleware(view)
+        factory = AsyncRequestFactory()
+        gate = middleware.gates["normal"]
+        gate.active, gate.queue, gate.wait = 2, 1, 0.05
+        response = await middleware(factory.get("/auctions/watchlist/"))
+        self.assertEqual(response.status_code, 503)
+
+        gate.wait = 5
+        waiting = asyncio.ensure_future(middleware(factory.get("/auctions/watchlist/")))
+        while not gate.waiting:
+            await asyncio.sleep(0.001)
+        gate.leave()
+        self.assertEqual((await waiting).content, b"fresh")
+        self.assertEqual((gate.active, gate.waiting), (1, 0))
+
+
+class GateTests(TestCase):
+    def test_a_queued_request_gets_the_next_free_slot(self):
+        gate = Gate("normal", limit=1, queue=1, wait=5)
+        self.assertTrue(gate.enter())
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(gate.enter()))
+        waiter.start()
+        while not gate.waiting:
+            time.sleep(0.001)
+        # the queue holds one; the next is refused at once
+        self.assertFalse(gate.enter())
+        gate.leave()
+        waiter.join()
+        self.assertEqual((results, gate.active), ([True], 1))
@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import HomeView    # make sure this import exists
+from .views import HomeView, export    # make sure this import exists
 
 app_name = "core"
 
 urlpatterns = [
     path('', HomeView.as_view(), name='home'),
+    path('exports/<slug:name>.<slug:fmt>', export, name='export'),
 ]
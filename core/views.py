@@ -1,7 +1,78 @@
+from datetime import datetime, time, timedelta
+
+from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, HttpResponseBadRequest
+from django.shortcuts import render
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.views.generic import TemplateView
 
+from auctions.ending import ending_within
+from .exports import FORMATS, datasets, export_response
+from .profiling import NAME_RE, list_profiles, profiles_dir
+
 class HomeView(TemplateView):
     template_name = 'core/home.html'
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # (pk, title, auction_end) rows from the shared per-minute buckets
+        context['ending_soon'] = ending_within(timedelta(hours=1))[:6]
+        return context
+
+
+@staff_member_required
+def profile_list(request):
+    """Recent on-demand request profiles (see core.profiling)."""
+    profiles = [
+        {
+            "name": p.name,
+            "size": p.stat().st_size,
+            "created": datetime.fromtimestamp(p.stat().st_mtime),
+        }
+        for p in list_profiles()
+    ]
+    context = {
+        **admin.site.each_context(request),
+        "title": "Request profiles",
+        "profiles": profiles,
+    }
+    return render(request, "core/profiles.html", context)
+
+
+@staff_member_required
+def profile_download(request, name):
+    path = profiles_dir() / name
+    if not NAME_RE.match(name) or not path.is_file():
+        raise Http404("No such profile.")
+    return FileResponse(path.open("rb"), as_attachment=True, filename=name)
+
+
+@login_required
+def export(request, name, fmt):
+    """
+    Stream a dataset (see core.exports) as CSV or JSON lines.
+    - Staff with view permission get every row; sellers/buyers only their own
+    - ``?since=``/``?until=`` (YYYY-MM-DD, inclusive) bound the date range
+    - ``?gzip=1`` compresses on the fly
+    """
+    dataset = datasets.get(name)
+    if dataset is None or fmt not in FORMATS:
+        raise Http404("No such export.")
+    queryset = dataset.queryset_for(request.user)
+    # whole local days as a datetime range, which the created_at index serves
+    for param, lookup, shift in (("since", "gte", 0), ("until", "lt", 1)):
+        value = request.GET.get(param)
+        if not value:
+            continue
+        day = parse_date(value)
+        if day is None:
+            return HttpResponseBadRequest(f"{param} must be YYYY-MM-DD.")
+        bound = timezone.make_aware(datetime.combine(day + timedelta(days=shift), time.min))
+        queryset = queryset.filter(**{f"{dataset.date_field}__{lookup}": bound})
+    return export_response(dataset, queryset, fmt, compress=request.GET.get("gzip") == "1")
+
 
 # Create your views here.
@@ -0,0 +1,26 @@
+# jobs/admin.py
+
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "task", "status", "priority", "attempts", "run_at", "finished_at")
+    list_filter = ("status", "task")
+    search_fields = ("task",)
+    ordering = ("-id",)
+    readonly_fields = ("created_at", "started_at", "finished_at", "locked_by", "locked_at")
+    actions = ["requeue"]
+
+    @admin.action(description="Requeue selected jobs")
+    def requeue(self, request, queryset):
+        count = queryset.exclude(status=Job.RUNNING).update(
+            status=Job.QUEUED,
+            attempts=0,
+            run_at=timezone.now(),
+            last_error="",
+        )
+        self.message_user(request, f"Requeued {count} job(s).")
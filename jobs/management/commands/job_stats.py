@@ -0,0 +1,27 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from jobs.stats import queue_stats
+
+
+class Command(BaseCommand):
+    help = 'Show background job counts, lag and throughput.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help='Print raw JSON.')
+
+    def handle(self, *args, **opts):
+        stats = queue_stats()
+        if opts['json']:
+            self.stdout.write(json.dumps(stats, indent=2))
+            return
+
+        self.stdout.write('Status: ' + ', '.join(f'{k}={v}' for k, v in sorted(stats['by_status'].items())))
+        self.stdout.write(f"Lag: {stats['lag_seconds']}s")
+        self.stdout.write(
+            'Throughput/min: ' + ', '.join(f'{k}={v}' for k, v in stats['throughput_per_min'].items())
+        )
+        self.stdout.write(f"Avg runtime: {stats['avg_runtime_seconds']}s")
+        for task_name, counts in sorted(stats['by_task'].items()):
+            self.stdout.write(f'  {task_name}: ' + ', '.join(f'{k}={v}' for k, v in sorted(counts.items())))
@@ -0,0 +1,69 @@
+import multiprocessing
+import os
+import socket
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.process import run_worker_process
+from jobs.worker import Worker, requeue_stale, schedule_periodic
+
+
+class Command(BaseCommand):
+    help = 'Run background job workers (threads by default, or processes).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help='Number of workers.')
+        parser.add_argument('--processes', action='store_true', help='Run workers as processes instead of threads.')
+        parser.add_argument('--batch-size', type=int, default=10, help='Jobs claimed per round trip.')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Exit once no ready jobs are left.')
+
+    def handle(self, *args, **opts):
+        requeued = requeue_stale()
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} stale job(s).')
+        if not opts['once']:
+            schedule_periodic()
+
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+        names = [f'{prefix}:{n}' for n in range(opts['concurrency'])]
+        worker_args = (opts['batch_size'], opts['poll_interval'], opts['once'])
+        self.stdout.write(
+            f"Starting {len(names)} {'process' if opts['processes'] else 'thread'} worker(s)."
+        )
+
+        if opts['processes']:
+            # children open their own connections
+            connections.close_all()
+            ctx = multiprocessing.get_context('spawn')
+            procs = [ctx.Process(target=run_worker_process, args=(name, *worker_args)) for name in names]
+            for p in procs:
+                p.start()
+            try:
+                for p in procs:
+                    p.join()
+            except KeyboardInterrupt:
+                for p in procs:
+                    p.terminate()
+            return
+
+        stop = threading.Event()
+        workers = [Worker(name, opts['batch_size'], opts['poll_interval'], stop) for name in names]
+        threads = [threading.Thread(target=w.run, kwargs={'once': opts['once']}, daemon=True) for w in workers]
+        for t in threads:
+            t.start()
+        try:
+            while any(t.is_alive() for t in threads):
+                for t in threads:
+                    t.join(timeout=0.5)
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping workers...')
+            stop.set()
+            for t in threads:
+                t.join()
+
+        processed = sum(w.processed for w in workers)
+        failed = sum(w.failed for w in workers)
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} job(s), {failed} failed.'))
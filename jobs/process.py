@@ -0,0 +1,15 @@
+# jobs/process.py
+#
+# Kept free of model imports: spawned children unpickle this module's
+# function before Django is set up.
+
+
+def run_worker_process(name, batch_size, poll_interval, once):
+    """Entry point for ``run_jobs --processes`` children."""
+    import django
+
+    django.setup()
+
+    from .worker import Worker
+
+    Worker(name, batch_size, poll_interval).run(once=once)
@@ -0,0 +1,66 @@
+# jobs/queue.py
+
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Job
+
+# task name -> (function, max_attempts)
+registry = {}
+# task name -> interval, for tasks that re-queue themselves after each run
+periodic = {}
+
+
+def task(name=None, max_attempts=5, every=None):
+    """
+    Register a function as a background task.
+    - The function receives the job payload as keyword arguments.
+    - Names default to "<app>.<function>".
+    - ``every`` (a timedelta) makes it periodic: workers keep exactly one
+      run queued for it.
+    """
+
+    def decorator(func):
+        task_name = name or f"{func.__module__.split('.')[0]}.{func.__name__}"
+        registry[task_name] = (func, max_attempts)
+        if every is not None:
+            periodic[task_name] = every
+        func.task_name = task_name
+        return func
+
+    return decorator
+
+
+def enqueue(task_name, payload=None, *, priority=0, delay=None, run_at=None, unique_key=None):
+    """
+    Queue a task and return the Job (or None if ``unique_key`` is already queued).
+    - Runs inside the caller's transaction, so a rolled-back request never
+      leaves a job behind.
+    - ``unique_key`` keeps at most one queued (not yet claimed) job per key,
+      which is how periodic and coalescing jobs avoid piling up.
+    """
+    if task_name not in registry:
+        raise KeyError(f"Unknown task {task_name!r}")
+
+    if run_at is None:
+        run_at = timezone.now() + (delay or timedelta(0))
+    job = Job(
+        task=task_name,
+        payload=payload or {},
+        priority=priority,
+        run_at=run_at,
+        max_attempts=registry[task_name][1],
+        unique_key=unique_key,
+    )
+    if unique_key is None:
+        job.save()
+        return job
+
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        return None
+    return job
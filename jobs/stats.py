@@ -0,0 +1,60 @@
+# jobs/stats.py
+
+from datetime import timedelta
+
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Min
+from django.utils import timezone
+
+from .models import Job
+
+
+def queue_stats(now=None):
+    """
+    Snapshot of queue health.
+    - counts per status and per task
+    - lag: how long the oldest ready job has been waiting
+    - throughput: jobs finished per minute over the last 1/5/15 minutes
+    - avg_runtime: seconds per job over the last 15 minutes
+    """
+    now = now or timezone.now()
+
+    by_status = dict(
+        Job.objects.values_list("status").annotate(n=Count("pk")).order_by()
+    )
+    by_task = {}
+    for task_name, status, n in (
+        Job.objects.values_list("task", "status").annotate(n=Count("pk")).order_by()
+    ):
+        by_task.setdefault(task_name, {})[status] = n
+
+    oldest_ready = (
+        Job.objects
+        .filter(status=Job.QUEUED, run_at__lte=now)
+        .aggregate(oldest=Min("run_at"))["oldest"]
+    )
+    lag = (now - oldest_ready).total_seconds() if oldest_ready else 0.0
+
+    throughput = {}
+    for minutes in (1, 5, 15):
+        done = Job.objects.filter(
+            status=Job.DONE, finished_at__gte=now - timedelta(minutes=minutes)
+        ).count()
+        throughput[f"{minutes}m"] = round(done / minutes, 2)
+
+    avg_runtime = (
+        Job.objects
+        .filter(status=Job.DONE, finished_at__gte=now - timedelta(minutes=15))
+        .aggregate(
+            avg=Avg(ExpressionWrapper(
+                F("finished_at") - F("started_at"), output_field=DurationField()
+            ))
+        )["avg"]
+    )
+
+    return {
+        "by_status": by_status,
+        "by_task": by_task,
+        "lag_seconds": round(lag, 3),
+        "throughput_per_min": throughput,
+        "avg_runtime_seconds": round(avg_runtime.total_seconds(), 4) if avg_runtime else None,
+    }
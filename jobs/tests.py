@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .models import Job
+from .queue import enqueue, periodic, task
+from .stats import queue_stats
+from .worker import claim, run_job
+
+calls = []
+
+
+@task(name="tests.record", max_attempts=2)
+def record(value):
+    calls.append(value)
+
+
+@task(name="tests.explode", max_attempts=2)
+def explode():
+    raise RuntimeError("boom")
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_claim_respects_priority_and_run_at(self):
+        low = enqueue("tests.record", {"value": "low"})
+        high = enqueue("tests.record", {"value": "high"}, priority=10)
+        enqueue("tests.record", {"value": "later"}, delay=timedelta(hours=1))
+
+        jobs = claim("w1", batch_size=10)
+
+        self.assertEqual([j.pk for j in jobs], [high.pk, low.pk])
+        self.assertTrue(all(j.status == Job.RUNNING and j.attempts == 1 for j in jobs))
+        self.assertEqual(claim("w2", batch_size=10), [])
+
+    def test_fallback_claim_updates_a_plain_pk_list(self):
+        jobs = [enqueue("tests.record", {"value": n}) for n in range(3)]
+        Job.objects.filter(pk=jobs[0].pk).update(status=Job.RUNNING, locked_by="w0")
+
+        with CaptureQueriesContext(connection) as ctx:
+            claimed = claim("w1", batch_size=10)
+
+        self.assertEqual([j.pk for j in claimed], [j.pk for j in jobs[1:]])
+        if not connection.features.has_select_for_update_skip_locked:
+            update = next(q["sql"] for q in ctx.captured_queries if q["sql"].startswith("UPDATE"))
+            # older MySQL rejects a LIMIT subquery on the table being updated
+            self.assertNotIn("SELECT", update)
+
+    def test_success_marks_done(self):
+        enqueue("tests.record", {"value": 1})
+        job = claim("w1")[0]
+
+        self.assertTrue(run_job(job))
+
+        self.assertEqual(calls, [1])
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.DONE)
+
+    def test_failure_backs_off_then_dies(self):
+        job = enqueue("tests.explode")
+
+        run_job(claim("w1")[0])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn("boom", job.last_error)
+
+        run_job(claim("w1", now=job.run_at)[0])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DEAD)
+        self.assertEqual(job.attempts, 2)
+
+    def test_unique_key_keeps_one_queued_job(self):
+        self.assertIsNotNone(enqueue("tests.record", {"value": 1}, unique_key="k"))
+        self.assertIsNone(enqueue("tests.record", {"value": 2}, unique_key="k"))
+
+        # claimed jobs release the key so a follow-up run can queue
+        claim("w1")
+        self.assertIsNotNone(enqueue("tests.record", {"value": 3}, unique_key="k"))
+
+    def test_periodic_task_reschedules_itself(self):
+        periodic["tests.record"] = timedelta(minutes=5)
+        self.addCleanup(periodic.pop, "tests.record")
+        enqueue("tests.record", {"value": 1}, unique_key="tests.record")
+
+        run_job(claim("w1")[0])
+
+        nxt = Job.objects.get(status=Job.QUEUED)
+        self.assertEqual(nxt.unique_key, "tests.record")
+        self.assertGreater(nxt.run_at, timezone.now() + timedelta(minutes=4))
+
+    def test_stats(self):
+        enqueue("tests.record", {"value": 1})
+        run_job(claim("w1")[0])
+        enqueue("tests.record", {"value": 2})
+
+        stats = queue_stats()
+
+        self.assertEqual(stats["by_status"], {Job.DONE: 1, Job.QUEUED: 1})
+        self.assertEqual(stats["throughput_per_min"]["1m"], 1)
+        self.assertIsNotNone(stats["avg_runtime_seconds"])
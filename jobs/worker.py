@@ -0,0 +1,178 @@
+# jobs/worker.py
+
+import logging
+import random
+import threading
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+from .queue import enqueue, periodic, registry
+
+log = logging.getLogger(__name__)
+
+BACKOFF_BASE = timedelta(seconds=5)
+BACKOFF_CAP = timedelta(hours=1)
+# a RUNNING job whose worker hasn't finished it by then is assumed dead
+STALE_AFTER = timedelta(minutes=10)
+
+
+def claim(worker_id, batch_size=10, now=None):
+    """
+    Atomically move up to ``batch_size`` ready jobs to RUNNING for this worker.
+    - Backends with SKIP LOCKED (MySQL 8, PostgreSQL) lock the candidate rows
+      so concurrent workers never wait on or double-claim each other's jobs.
+    - Elsewhere (SQLite, older MySQL) the candidate pks are read and then
+      claimed with ``UPDATE ... WHERE pk IN (...) AND status = QUEUED``; a
+      job another worker took in between simply isn't updated, and only
+      rows carrying this worker's token are returned.
+    """
+    now = now or timezone.now()
+    token = f"{worker_id}:{uuid.uuid4().hex[:8]}"[:64]
+    ready = (
+        Job.objects
+        .filter(status=Job.QUEUED, run_at__lte=now)
+        .order_by("-priority", "run_at", "pk")
+    )
+    running = {
+        "status": Job.RUNNING,
+        # free the key so new work can be queued while this run is in flight
+        "unique_key": None,
+        "locked_by": token,
+        "locked_at": now,
+        "started_at": now,
+        "attempts": F("attempts") + 1,
+    }
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            pks = list(
+                ready.select_for_update(skip_locked=True)
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not pks:
+                return []
+            Job.objects.filter(pk__in=pks).update(**running)
+    else:
+        # read the pks first: MySQL before 8.0.1 rejects both LIMIT in an IN
+        # subquery and updating the table the subquery reads
+        pks = list(ready.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            return []
+        claimed = Job.objects.filter(status=Job.QUEUED, pk__in=pks).update(**running)
+        if not claimed:
+            return []
+
+    return list(
+        Job.objects
+        .filter(locked_by=token, status=Job.RUNNING)
+        .order_by("-priority", "run_at", "pk")
+    )
+
+
+def backoff(attempts):
+    """Exponential backoff with jitter: ~5s, 10s, 20s, ... capped at an hour."""
+    delay = min(BACKOFF_BASE * 2 ** max(attempts - 1, 0), BACKOFF_CAP)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def run_job(job):
+    """
+    Execute one claimed job and record the outcome.
+    - Success -> DONE.
+    - Failure -> QUEUED again after a backoff, or DEAD once max_attempts is used up.
+    - Periodic tasks schedule their next run either way.
+    Returns True on success.
+    """
+    func = registry.get(job.task, (None, None))[0]
+    try:
+        if func is None:
+            raise LookupError(f"No task registered as {job.task!r}")
+        func(**job.payload)
+    except Exception:
+        error = traceback.format_exc()[-4000:]
+        now = timezone.now()
+        if job.attempts >= job.max_attempts:
+            log.error("Job %s (%s) is dead after %s attempts", job.pk, job.task, job.attempts)
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.DEAD,
+                finished_at=now,
+                last_error=error,
+            )
+            _reschedule(job)
+        else:
+            log.warning("Job %s (%s) failed, retrying", job.pk, job.task)
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.QUEUED,
+                run_at=now + backoff(job.attempts),
+                locked_by="",
+                last_error=error,
+            )
+        return False
+
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.DONE,
+        finished_at=timezone.now(),
+        locked_by="",
+    )
+    _reschedule(job)
+    return True
+
+
+def _reschedule(job):
+    every = periodic.get(job.task)
+    if every:
+        enqueue(job.task, delay=every, unique_key=job.task)
+
+
+def schedule_periodic():
+    """Make sure every periodic task has its next run queued."""
+    for task_name in periodic:
+        enqueue(task_name, unique_key=task_name)
+
+
+def requeue_stale(now=None):
+    """Hand jobs held by crashed workers back to the queue."""
+    now = now or timezone.now()
+    return (
+        Job.objects
+        .filter(status=Job.RUNNING, locked_at__lt=now - STALE_AFTER)
+        .update(status=Job.QUEUED, locked_by="")
+    )
+
+
+class Worker:
+    """
+    Claim-and-run loop used by the ``run_jobs`` command, one per thread or process.
+    """
+
+    def __init__(self, name, batch_size=10, poll_interval=1.0, stop=None):
+        self.name = name
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.stop = stop or threading.Event()
+        self.processed = 0
+        self.failed = 0
+
+    def run(self, once=False):
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                jobs = claim(self.name, self.batch_size)
+                for job in jobs:
+                    if run_job(job):
+                        self.processed += 1
+                    else:
+                        self.failed += 1
+                if not jobs:
+                    if once:
+                        return
+                    self.stop.wait(self.poll_interval)
+        finally:
+            connection.close()
+
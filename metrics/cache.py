@@ -0,0 +1,72 @@
+# metrics/cache.py
+
+from django.utils.module_loading import import_string
+
+from .registry import counter
+
+CACHE_REQUESTS = counter(
+    "cache_requests", "Cache lookups by result (hit/miss).", ["cache", "result"]
+)
+
+_MISSING = object()
+
+
+class MetricsCache:
+    """
+    Cache backend that counts hits and misses and hands everything else to
+    the real backend named in ``OPTIONS["BACKEND"]`` (``OPTIONS["NAME"]``
+    labels the samples, "default" if not given):
+
+        CACHES = {"default": {
+            "BACKEND": "metrics.cache.MetricsCache",
+            "LOCATION": "...",
+            "OPTIONS": {"BACKEND": "django.core.cache.backends.redis.RedisCache"},
+        }}
+    """
+
+    def __init__(self, location, params):
+        params = dict(params)
+        options = dict(params.get("OPTIONS", {}))
+        backend = options.pop("BACKEND")
+        # label for the metrics; Django doesn't tell a backend its alias
+        self._alias = options.pop("NAME", "default")
+        params["OPTIONS"] = options
+        self._cache = import_string(backend)(location, params)
+
+    def __getattr__(self, name):
+        return getattr(self._cache, name)
+
+    def _count(self, hits, misses):
+        if hits:
+            CACHE_REQUESTS.inc(hits, cache=self._alias, result="hit")
+        if misses:
+            CACHE_REQUESTS.inc(misses, cache=self._alias, result="miss")
+
+    def get(self, key, default=None, version=None):
+        value = self._cache.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            self._count(0, 1)
+            return default
+        self._count(1, 0)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = self._cache.get_many(keys, version=version)
+        self._count(len(found), len(keys) - len(found))
+        return found
+
+    # __getattr__ would hand these straight to the wrapped backend, uncounted
+    async def aget(self, key, default=None, version=None):
+        value = await self._cache.aget(key, _MISSING, version=version)
+        if value is _MISSING:
+            self._count(0, 1)
+            return default
+        self._count(1, 0)
+        return value
+
+    async def aget_many(self, keys, version=None):
+        keys = list(keys)
+        found = await self._cache.aget_many(keys, version=version)
+        self._count(len(found), len(keys) - len(found))
+        return found
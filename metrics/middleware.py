@@ -0,0 +1,68 @@
+# metrics/middleware.py
+
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .registry import counter, gauge, histogram
+
+REQUEST_LATENCY = histogram(
+    "http_request_duration_seconds", "Request latency by URL name.", ["view", "method"]
+)
+REQUESTS = counter(
+    "http_requests", "Requests by URL name and status code.", ["view", "method", "status"]
+)
+IN_FLIGHT = gauge("http_requests_in_flight", "Requests being handled right now.")
+DB_TIME = histogram(
+    "http_request_db_seconds", "Time spent in the database per request.", ["view"]
+)
+DB_QUERIES = counter("db_queries", "Database queries by URL name.", ["view"])
+
+
+class MetricsMiddleware:
+    """
+    Request latency, status and in-flight counts, labelled with the URL name
+    (never the raw path, so label cardinality stays bounded). DB time and
+    query counts come from QueryBudgetMiddleware, which must sit inside this one.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            IN_FLIGHT.dec()
+        self._observe(request, response, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            IN_FLIGHT.dec()
+        self._observe(request, response, time.perf_counter() - started)
+        return response
+
+    def _observe(self, request, response, elapsed):
+        match = request.resolver_match
+        view = match.view_name if match else "unresolved"
+        REQUEST_LATENCY.observe(elapsed, view=view, method=request.method)
+        REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+
+        stats = getattr(request, "query_stats", None)
+        if stats is not None:
+            DB_TIME.observe(stats.seconds, view=view)
+            DB_QUERIES.inc(stats.count, view=view)
@@ -0,0 +1,169 @@
+# metrics/registry.py
+
+import math
+from collections import defaultdict
+
+from .store import decode_key, encode_key, get_store
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# metric name -> metric, in registration order
+registry = {}
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _labels(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return {k: str(v) for k, v in labels.items()}
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        get_store().inc(encode_key(self.name, "_total", self._labels(labels)), amount)
+
+
+class Gauge(Metric):
+    """Summed across live processes; e.g. requests in flight."""
+
+    kind = "gauge"
+
+    def inc(self, amount=1, **labels):
+        get_store().inc(encode_key(self.name, "", self._labels(labels)), amount)
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        labels = self._labels(labels)
+        store = get_store()
+        # buckets are stored non-cumulative (one write per observation) and summed at render time
+        le = next(b for b in self.buckets if value <= b)
+        store.inc(encode_key(self.name, "_bucket", {**labels, "le": _fmt(le)}))
+        store.inc(encode_key(self.name, "_sum", labels), value)
+        store.inc(encode_key(self.name, "_count", labels))
+
+
+def _register(metric):
+    existing = registry.get(metric.name)
+    if existing is not None:
+        return existing
+    registry[metric.name] = metric
+    return metric
+
+
+def counter(name, documentation, labelnames=()):
+    """Declare (or fetch) a counter; the exported sample is ``<name>_total``."""
+    return _register(Counter(name, documentation, labelnames))
+
+
+def gauge(name, documentation, labelnames=()):
+    return _register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return _register(Histogram(name, documentation, labelnames, buckets))
+
+
+def _fmt(value):
+    if value == math.inf:
+        return "+Inf"
+    if value == int(value):
+        return f"{value:.1f}"
+    return repr(float(value))
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def collect():
+    """Sum every process's samples: ``{metric: {(suffix, labels): value}}``."""
+    samples = defaultdict(lambda: defaultdict(float))
+    for key, value, live in get_store().collect():
+        name, suffix, labels = decode_key(key)
+        metric = registry.get(name)
+        if metric is None or (metric.kind == "gauge" and not live):
+            continue
+        samples[name][(suffix, labels)] += value
+    return samples
+
+
+def render():
+    """Everything in the Prometheus text exposition format (0.0.4)."""
+    samples = collect()
+    lines = []
+    for name, metric in registry.items():
+        lines.append(f"# HELP {name} {metric.documentation}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        values = samples.get(name, {})
+        if metric.kind == "histogram":
+            lines.extend(_render_histogram(metric, values))
+            continue
+        for (suffix, labels), value in sorted(values.items()):
+            lines.append(f"{name}{suffix}{_label_text(labels)} {_fmt_value(value)}")
+    lines.extend(_derived(samples))
+    return "\n".join(lines) + "\n"
+
+
+def _render_histogram(metric, values):
+    series = defaultdict(dict)
+    for (suffix, labels), value in values.items():
+        if suffix == "_bucket":
+            le = dict(labels)["le"]
+            base = tuple(pair for pair in labels if pair[0] != "le")
+            series[base][le] = value
+        else:
+            series[labels][suffix] = value
+    for labels, data in sorted(series.items()):
+        cumulative = 0.0
+        for bound in metric.buckets:
+            le = _fmt(bound)
+            cumulative += data.get(le, 0.0)
+            yield f"{metric.name}_bucket{_label_text(labels + (('le', le),))} {_fmt_value(cumulative)}"
+        yield f"{metric.name}_sum{_label_text(labels)} {_fmt_value(data.get('_sum', 0.0))}"
+        yield f"{metric.name}_count{_label_text(labels)} {_fmt_value(data.get('_count', 0.0))}"
+
+
+def _derived(samples):
+    """Ratios that are handy on a dashboard without writing PromQL."""
+    requests = samples.get("cache_requests", {})
+    by_cache = defaultdict(lambda: {"hit": 0.0, "miss": 0.0})
+    for (_, labels), value in requests.items():
+        labels = dict(labels)
+        by_cache[labels["cache"]][labels["result"]] += value
+    if not by_cache:
+        return
+    yield "# HELP cache_hit_ratio Cache hits / lookups since the metrics were reset."
+    yield "# TYPE cache_hit_ratio gauge"
+    for cache, counts in sorted(by_cache.items()):
+        total = counts["hit"] + counts["miss"]
+        ratio = counts["hit"] / total if total else 0.0
+        yield f'cache_hit_ratio{{cache="{_escape(cache)}"}} {_fmt_value(ratio)}'
+
+
+def _fmt_value(value):
+    return repr(float(value)) if value != int(value) else f"{value:.1f}"
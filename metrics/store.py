@@ -0,0 +1,197 @@
+# metrics/store.py
+
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+
+from django.conf import settings
+
+_HEADER = struct.Struct("<I4x")
+_KEY_LEN = struct.Struct("<I")
+_VALUE = struct.Struct("<d")
+_INITIAL_SIZE = 64 * 1024
+
+
+def encode_key(metric, suffix, labels):
+    return json.dumps([metric, suffix, sorted(labels.items())], separators=(",", ":"))
+
+
+def decode_key(key):
+    metric, suffix, labels = json.loads(key)
+    return metric, suffix, tuple(tuple(pair) for pair in labels)
+
+
+class MemoryStore:
+    """Single-process store: a dict behind one uncontended lock."""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, key, amount=1.0):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, key, value):
+        with self._lock:
+            self._values[key] = value
+
+    def collect(self):
+        """Yield (key, value, live) for every sample."""
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield key, value, True
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class MmapedDict:
+    """
+    An append-only ``key -> float`` map in a memory-mapped file. Only its
+    own process writes it; any process can read it with read_file().
+    Layout: an 8-byte header (bytes used), then entries of
+    ``key length | key (padded to 8 bytes) | double``.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        size = os.fstat(self._fd).st_size
+        if size < _INITIAL_SIZE:
+            os.ftruncate(self._fd, _INITIAL_SIZE)
+            size = _INITIAL_SIZE
+        self._size = size
+        self._mm = mmap.mmap(self._fd, size)
+        self._positions = {}
+        used = _HEADER.unpack_from(self._mm, 0)[0] or _HEADER.size
+        for key, _, pos in self._entries(self._mm, used):
+            self._positions[key] = pos
+        self._used = used
+
+    @staticmethod
+    def _entries(buf, used):
+        pos = _HEADER.size
+        while pos < used:
+            (length,) = _KEY_LEN.unpack_from(buf, pos)
+            key_start = pos + _KEY_LEN.size
+            key = bytes(buf[key_start:key_start + length]).decode()
+            value_pos = key_start + length + (-(_KEY_LEN.size + length) % 8)
+            (value,) = _VALUE.unpack_from(buf, value_pos)
+            yield key, value, value_pos
+            pos = value_pos + _VALUE.size
+
+    @classmethod
+    def read_file(cls, path):
+        with open(path, "rb") as fh:
+            data = fh.read()
+        if len(data) < _HEADER.size:
+            return []
+        used = _HEADER.unpack_from(data, 0)[0]
+        return [(key, value) for key, value, _ in cls._entries(data, used)]
+
+    def _append(self, key):
+        encoded = key.encode()
+        padding = -(_KEY_LEN.size + len(encoded)) % 8
+        needed = _KEY_LEN.size + len(encoded) + padding + _VALUE.size
+        while self._used + needed > self._size:
+            self._size *= 2
+            os.ftruncate(self._fd, self._size)
+            self._mm.close()
+            self._mm = mmap.mmap(self._fd, self._size)
+        pos = self._used
+        _KEY_LEN.pack_into(self._mm, pos, len(encoded))
+        self._mm[pos + _KEY_LEN.size:pos + _KEY_LEN.size + len(encoded)] = encoded
+        value_pos = pos + _KEY_LEN.size + len(encoded) + padding
+        _VALUE.pack_into(self._mm, value_pos, 0.0)
+        self._used += needed
+        # publish the entry only once it is complete
+        _HEADER.pack_into(self._mm, 0, self._used)
+        self._positions[key] = value_pos
+        return value_pos
+
+    def read(self, key):
+        pos = self._positions.get(key)
+        return _VALUE.unpack_from(self._mm, pos)[0] if pos is not None else 0.0
+
+    def write(self, key, value):
+        pos = self._positions.get(key)
+        if pos is None:
+            pos = self._append(key)
+        _VALUE.pack_into(self._mm, pos, value)
+
+    def close(self):
+        self._mm.close()
+        os.close(self._fd)
+
+
+class MmapStore:
+    """
+    Multi-process store: each process writes ``<pid>.db`` in METRICS_DIR and
+    the /metrics view sums every file. No locks are shared between processes.
+    Gauges from processes that are no longer running are ignored.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._file = None
+
+    def _own_file(self):
+        # re-open after a fork so parent and child never share a file
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._file = MmapedDict(os.path.join(self.directory, f"{self._pid}.db"))
+        return self._file
+
+    def inc(self, key, amount=1.0):
+        with self._lock:
+            f = self._own_file()
+            f.write(key, f.read(key) + amount)
+
+    def set(self, key, value):
+        with self._lock:
+            self._own_file().write(key, value)
+
+    def collect(self):
+        for path in glob.glob(os.path.join(self.directory, "*.db")):
+            pid = os.path.basename(path)[:-3]
+            live = _alive(pid)
+            for key, value in MmapedDict.read_file(path):
+                yield key, value, live
+
+    def clear(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+            self._pid = self._file = None
+            for path in glob.glob(os.path.join(self.directory, "*.db")):
+                os.remove(path)
+
+
+def _alive(pid):
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        directory = getattr(settings, "METRICS_DIR", None)
+        _store = MmapStore(str(directory)) if directory else MemoryStore()
+    return _store
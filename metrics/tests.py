@@ -0,0 +1,154 @@
+import os
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from auctions.models import Product
+from .registry import collect, counter, gauge, render
+from .store import MmapedDict, MmapStore, encode_key, get_store
+
+
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user("seller")
+        cls.bidder = User.objects.create_user("bidder")
+        cls.auction = Product.objects.create(
+            seller=cls.seller,
+            title="Lamp",
+            price=500,
+            listing_type="BID",
+            starting_bid=10,
+            min_increment=1,
+            auction_end=timezone.now() + timedelta(hours=1),
+        )
+
+    def setUp(self):
+        get_store().clear()
+        cache.clear()
+
+    def test_request_metrics_in_exposition_format(self):
+        self.client.get(reverse("auctions:listing_list"))
+        body = self.client.get(reverse("metrics:metrics")).content.decode()
+
+        self.assertIn("# TYPE http_request_duration_seconds histogram", body)
+        self.assertIn(
+            'http_request_duration_seconds_count{method="GET",view="auctions:listing_list"} 1.0',
+            body,
+        )
+        self.assertIn(
+            'http_request_duration_seconds_bucket{method="GET",view="auctions:listing_list",le="+Inf"} 1.0',
+            body,
+        )
+        self.assertIn(
+            'http_requests_total{method="GET",status="200",view="auctions:listing_list"} 1.0',
+            body,
+        )
+        self.assertIn('db_queries_total{view="auctions:listing_list"}', body)
+        # the scrape itself is in flight while rendering
+        self.assertIn("http_requests_in_flight 1.0", body)
+
+    def test_bid_outcomes_are_counted(self):
+        self.client.force_login(self.bidder)
+        url = reverse("auctions:place_bid", args=[self.auction.pk])
+        self.client.post(url, {"amount": "5"})
+        self.client.post(url, {"amount": "20"})
+
+        body = render()
+        self.assertIn('auction_bids_total{outcome="rejected",reason="too_low"} 1.0', body)
+        self.assertIn('auction_bids_total{outcome="accepted",reason=""} 1.0', body)
+
+    def test_auction_close_records_lag(self):
+        Product.objects.filter(pk=self.auction.pk).update(
+            auction_end=timezone.now() - timedelta(seconds=30)
+        )
+        self.client.get(reverse("auctions:listing_detail", args=[self.auction.pk]))
+
+        body = render()
+        self.assertIn('auctions_closed_total{via="page_view"} 1.0', body)
+        self.assertIn('auction_close_lag_seconds_bucket{le="30.0"} 0.0', body)
+        self.assertIn('auction_close_lag_seconds_bucket{le="60.0"} 1.0', body)
+
+    def test_racing_closes_are_counted_once(self):
+        Product.objects.filter(pk=self.auction.pk).update(
+            auction_end=timezone.now() - timedelta(seconds=1)
+        )
+        # two polls that both loaded the auction while it was still active
+        first, second = Product.objects.get(pk=self.auction.pk), Product.objects.get(pk=self.auction.pk)
+        first.close_if_finished()
+        second.close_if_finished()
+
+        self.assertFalse(second.is_active)
+        self.assertIn('auctions_closed_total{via="page_view"} 1.0', render())
+
+    def test_cache_hit_ratio(self):
+        cache.set("k", 1)
+        cache.get("k")
+        cache.get("missing")
+        cache.get_many(["k", "other"])
+
+        body = render()
+        self.assertIn('cache_requests_total{cache="default",result="hit"} 2.0', body)
+        self.assertIn('cache_hit_ratio{cache="default"} 0.5', body)
+
+    async def test_async_cache_lookups_are_counted(self):
+        await cache.aset("k", 1)
+        await cache.aget("k")
+        await cache.aget("missing")
+        await cache.aget_many(["k", "other"])
+
+        body = render()
+        self.assertIn('cache_requests_total{cache="default",result="hit"} 2.0', body)
+        self.assertIn('cache_requests_total{cache="default",result="miss"} 2.0', body)
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_token_required_when_configured(self):
+        url = reverse("metrics:metrics")
+        self.assertEqual(self.client.get(url).status_code, 403)
+        response = self.client.get(url, headers={"Authorization": "Bearer s3cret"})
+        self.assertEqual(response.status_code, 200)
+
+
+class MmapStoreTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.store = MmapStore(self.dir)
+        patcher = patch("metrics.store._store", self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_sums_processes_and_drops_dead_gauges(self):
+        hits = counter("test_hits", "Test counter.")
+        busy = gauge("test_busy", "Test gauge.")
+        hits.inc(2)
+        busy.inc()
+
+        # another worker that has since exited
+        other = MmapedDict(os.path.join(self.dir, "999999999.db"))
+        other.write(encode_key("test_hits", "_total", {}), 3)
+        other.write(encode_key("test_busy", "", {}), 5)
+        other.close()
+
+        samples = collect()
+        self.assertEqual(samples["test_hits"][("_total", ())], 5)
+        self.assertEqual(samples["test_busy"][("", ())], 1)
+
+    def test_file_grows_and_reloads(self):
+        path = os.path.join(self.dir, "1.db")
+        d = MmapedDict(path)
+        for n in range(3000):
+            d.write(f"key-{n}-" + "x" * 20, n)
+        d.close()
+
+        reopened = MmapedDict(path)
+        self.assertEqual(reopened.read("key-2999-" + "x" * 20), 2999)
+        self.assertEqual(len(MmapedDict.read_file(path)), 3000)
+        reopened.close()
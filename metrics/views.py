@@ -0,0 +1,23 @@
+# metrics/views.py
+
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from .registry import render
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def metrics(request):
+    """
+    Prometheus scrape endpoint. With METRICS_TOKEN set, scrapers must send
+    ``Authorization: Bearer <token>``.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        sent = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(sent, token):
+            return HttpResponseForbidden("Forbidden")
+    return HttpResponse(render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from .models import Notification, OutboxEvent
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "product", "actor", "amount", "created_at", "claimed_at", "processed_at")
+    list_filter = ("kind",)
+    raw_id_fields = ("product", "actor", "previous_leader")
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ("user", "kind", "message", "created_at", "read_at")
+    list_filter = ("kind",)
+    raw_id_fields = ("user", "product")
@@ -0,0 +1,73 @@
+# notifications/models.py
+
+from django.contrib.auth.models import User
+from django.db import models
+
+from auctions.models import Product
+
+
+class OutboxEvent(models.Model):
+    """
+    Something watchers may need to hear about, recorded once on the write path.
+    The fan-out job turns batches of these into per-user notifications.
+    """
+    BID = "BID"
+    ENDING_SOON = "ENDING_SOON"
+    KIND_CHOICES = [
+        (BID, "New bid"),
+        (ENDING_SOON, "Ending soon"),
+    ]
+
+    kind = models.CharField(max_length=12, choices=KIND_CHOICES)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    # leader before this bid, i.e. the user who was just outbid
+    previous_leader = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    # the flush run fanning this event out; see outbox.claim
+    claimed_by = models.CharField(max_length=64, blank=True, default="")
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.kind} on {self.product_id}"
+
+
+class Notification(models.Model):
+    OUTBID = "OUTBID"
+    NEW_BID = "NEW_BID"
+    ENDING_SOON = "ENDING_SOON"
+    KIND_CHOICES = [
+        (OUTBID, "Outbid"),
+        (NEW_BID, "New bid"),
+        (ENDING_SOON, "Ending soon"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="notifications")
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+    kind = models.CharField(max_length=12, choices=KIND_CHOICES)
+    message = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "read_at", "created_at"], name="notif_inbox_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.message}"
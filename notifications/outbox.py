@@ -0,0 +1,194 @@
+# notifications/outbox.py
+
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from auctions.ending import ending_within
+from auctions.models import Product, Watchlist
+from jobs.queue import enqueue
+from .models import Notification, OutboxEvent
+from .sinks import get_sink
+
+COALESCE_WINDOW = getattr(settings, "NOTIFICATIONS_COALESCE_WINDOW", timedelta(seconds=30))
+ENDING_SOON_WINDOW = getattr(settings, "NOTIFICATIONS_ENDING_SOON_WINDOW", timedelta(minutes=15))
+FLUSH_TASK = "notifications.flush_outbox"
+CHUNK_SIZE = 1000
+# a claim older than this belongs to a flush that died; its events are retried
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def schedule_flush(delay=COALESCE_WINDOW):
+    """Queue one flush; everything recorded before it runs is coalesced into it."""
+    enqueue(FLUSH_TASK, delay=delay, unique_key=FLUSH_TASK)
+
+
+def record_bid(product, bidder, amount, previous_leader_id=None):
+    """
+    Called by place_bid: one outbox row, whatever the number of watchers.
+    """
+    OutboxEvent.objects.create(
+        kind=OutboxEvent.BID,
+        product=product,
+        actor=bidder,
+        previous_leader_id=previous_leader_id,
+        amount=amount,
+    )
+    schedule_flush()
+
+
+def sweep_ending_soon(now=None):
+    """
+    Record an ENDING_SOON event (once) for every auction closing within the window.
+    Candidates come from the cached per-minute buckets the homepage also uses.
+    """
+    candidates = {pk for pk, _, _ in ending_within(ENDING_SOON_WINDOW, now)}
+    if not candidates:
+        return 0
+    already = set(
+        OutboxEvent.objects
+        .filter(kind=OutboxEvent.ENDING_SOON, product_id__in=candidates)
+        .values_list("product_id", flat=True)
+    )
+    new_ids = sorted(candidates - already)
+    OutboxEvent.objects.bulk_create([
+        OutboxEvent(kind=OutboxEvent.ENDING_SOON, product_id=pk) for pk in new_ids
+    ])
+    if new_ids:
+        schedule_flush(delay=None)
+    return len(new_ids)
+
+
+def claim(batch_size, now=None):
+    """
+    Take up to ``batch_size`` unprocessed events for this flush run.
+    The pks are read first, then taken with a conditional UPDATE, so two
+    flushes running at once never fan out the same event.
+    """
+    now = now or timezone.now()
+    token = uuid.uuid4().hex
+    free = Q(processed_at__isnull=True) & (
+        Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - CLAIM_TIMEOUT)
+    )
+    pks = list(
+        OutboxEvent.objects.filter(free).order_by("pk").values_list("pk", flat=True)[:batch_size]
+    )
+    if not pks:
+        return []
+    OutboxEvent.objects.filter(free, pk__in=pks).update(claimed_by=token, claimed_at=now)
+    return list(OutboxEvent.objects.filter(claimed_by=token).order_by("pk"))
+
+
+def flush(batch_size=5000):
+    """
+    Fan a batch of outbox events out to per-user notifications.
+    - Events are grouped per product; each user gets at most one notification
+      per product per flush (outbid beats ending-soon beats new-bid).
+    - Watchers are streamed in chunks and written with bulk_create, then
+      handed to the configured sink (file/e-mail) chunk by chunk.
+    - The batch is claimed first (see claim); a flush that dies mid-way
+      leaves its events to be retried after CLAIM_TIMEOUT.
+    Returns the number of events processed.
+    """
+    events = claim(batch_size)
+    if not events:
+        return 0
+
+    by_product = defaultdict(list)
+    for event in events:
+        by_product[event.product_id].append(event)
+    products = Product.objects.only("title", "auction_end").in_bulk(list(by_product))
+
+    sink = get_sink()
+    for product_id, product_events in by_product.items():
+        product = products.get(product_id)
+        if product is not None:
+            _fan_out(product, product_events, sink)
+
+    OutboxEvent.objects.filter(pk__in=[e.pk for e in events]).update(
+        processed_at=timezone.now()
+    )
+    if len(events) == batch_size:
+        schedule_flush(delay=None)
+    return len(events)
+
+
+def _fan_out(product, events, sink):
+    bids = [e for e in events if e.kind == OutboxEvent.BID]
+    ending_soon = any(e.kind == OutboxEvent.ENDING_SOON for e in events)
+
+    leader = amount = None
+    outbid = set()
+    if bids:
+        latest = max(bids, key=lambda e: e.pk)
+        leader, amount = latest.actor_id, latest.amount
+        outbid = {e.previous_leader_id for e in bids if e.previous_leader_id} - {leader}
+
+    messages = {
+        Notification.OUTBID: f'You have been outbid on "{product.title}". Current bid: Rs. {amount}.',
+        Notification.ENDING_SOON: (
+            f'"{product.title}" ends at '
+            f'{timezone.localtime(product.auction_end):%H:%M}.'
+            if product.auction_end else ""
+        ),
+        Notification.NEW_BID: (
+            f'{len(bids)} new bids on "{product.title}", now Rs. {amount}.'
+            if len(bids) > 1
+            else f'New bid on "{product.title}": Rs. {amount}.'
+        ),
+    }
+
+    def kind_for(user_id):
+        if user_id == leader:
+            return None
+        if user_id in outbid:
+            return Notification.OUTBID
+        if ending_soon:
+            return Notification.ENDING_SOON
+        if bids:
+            return Notification.NEW_BID
+        return None
+
+    watchers = (
+        Watchlist.objects
+        .filter(product_id=product.pk)
+        .values_list("user_id", flat=True)
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    chunk = []
+    for user_id in _chain_unique(watchers, outbid):
+        kind = kind_for(user_id)
+        if kind is None:
+            continue
+        chunk.append(Notification(
+            user_id=user_id,
+            product_id=product.pk,
+            kind=kind,
+            message=messages[kind][:255],
+        ))
+        if len(chunk) >= CHUNK_SIZE:
+            _write(chunk, sink)
+            chunk = []
+    _write(chunk, sink)
+
+
+def _chain_unique(watchers, extra):
+    """Watchers first, then outbid users who aren't watching."""
+    seen = set()
+    for user_id in watchers:
+        seen.add(user_id)
+        yield user_id
+    for user_id in extra:
+        if user_id not in seen:
+            yield user_id
+
+
+def _write(chunk, sink):
+    if not chunk:
+        return
+    Notification.objects.bulk_create(chunk)
+    sink.send(chunk)
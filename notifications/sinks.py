@@ -0,0 +1,70 @@
+# notifications/sinks.py
+
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+
+class NullSink:
+    def send(self, notifications):
+        pass
+
+
+class FileSink:
+    """Append notifications as JSON lines to one file per day."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def send(self, notifications):
+        if not notifications:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"notifications-{timezone.now():%Y%m%d}.jsonl"
+        with path.open("a", encoding="utf-8") as fh:
+            fh.writelines(
+                json.dumps({
+                    "user": n.user_id,
+                    "product": n.product_id,
+                    "kind": n.kind,
+                    "message": n.message,
+                }) + "\n"
+                for n in notifications
+            )
+
+
+class EmailSink:
+    """Send one e-mail per notification over a single backend connection."""
+
+    def send(self, notifications):
+        emails = dict(
+            User.objects
+            .filter(pk__in={n.user_id for n in notifications})
+            .exclude(email="")
+            .values_list("pk", "email")
+        )
+        messages = [
+            EmailMessage(
+                subject=n.message[:78],
+                body=n.message,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[emails[n.user_id]],
+            )
+            for n in notifications
+            if n.user_id in emails
+        ]
+        if messages:
+            get_connection().send_messages(messages)
+
+
+def get_sink():
+    kind = getattr(settings, "NOTIFICATIONS_SINK", "file")
+    if kind == "email":
+        return EmailSink()
+    if kind == "file":
+        return FileSink(settings.NOTIFICATIONS_DIR)
+    return NullSink()
@@ -0,0 +1,14 @@
+from datetime import timedelta
+
+from jobs.queue import task
+from . import outbox
+
+
+@task()
+def flush_outbox(batch_size=5000):
+    return outbox.flush(batch_size=batch_size)
+
+
+@task(every=timedelta(minutes=1))
+def sweep_ending_soon():
+    return outbox.sweep_ending_soon()
@@ -0,0 +1,99 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from auctions.models import Product, Watchlist
+from jobs.models import Job
+from . import outbox
+from .models import Notification, OutboxEvent
+
+
+@override_settings(NOTIFICATIONS_SINK="none")
+class FanOutTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user("seller")
+        cls.auction = Product.objects.create(
+            seller=cls.seller,
+            title="Clock",
+            price=900,
+            listing_type="BID",
+            starting_bid=10,
+            min_increment=1,
+            auction_end=timezone.now() + timedelta(hours=2),
+        )
+        cls.watchers = User.objects.bulk_create([User(username=f"w{n}") for n in range(30)])
+        Watchlist.objects.bulk_create([Watchlist(user=u, product=cls.auction) for u in cls.watchers])
+        cls.alice = User.objects.create_user("alice")
+        cls.bob = User.objects.create_user("bob")
+
+    def setUp(self):
+        cache.clear()
+
+    def bid(self, user, amount):
+        self.client.force_login(user)
+        self.client.post(reverse("auctions:place_bid", args=[self.auction.pk]), {"amount": amount})
+
+    def test_bid_records_one_event_and_one_job(self):
+        self.bid(self.alice, "20")
+        self.bid(self.bob, "30")
+
+        self.assertEqual(OutboxEvent.objects.count(), 2)
+        self.assertEqual(Job.objects.filter(task=outbox.FLUSH_TASK).count(), 1)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_flush_coalesces_per_user(self):
+        self.bid(self.alice, "20")
+        self.bid(self.bob, "30")
+        self.bid(self.alice, "40")
+        self.bid(self.bob, "50")
+
+        # claim (3), product, watchers, notifications, mark processed
+        with self.assertNumQueries(7):
+            self.assertEqual(outbox.flush(), 4)
+
+        by_user = dict(Notification.objects.values_list("user__username", "kind"))
+        self.assertEqual(len(by_user), 31)
+        self.assertEqual(by_user["alice"], Notification.OUTBID)
+        self.assertNotIn("bob", by_user)
+        self.assertEqual(by_user["w0"], Notification.NEW_BID)
+        self.assertIn("4 new bids", Notification.objects.filter(user__username="w0").get().message)
+        self.assertEqual(outbox.flush(), 0)
+
+    def test_claimed_events_are_not_fanned_out_twice(self):
+        self.bid(self.alice, "20")
+        self.bid(self.bob, "30")
+        # another flush is still fanning these out
+        self.assertEqual(len(outbox.claim(batch_size=10)), 2)
+        self.assertEqual(outbox.flush(), 0)
+        self.assertFalse(Notification.objects.exists())
+
+        # ...until its claim goes stale, e.g. because it died
+        OutboxEvent.objects.update(claimed_at=timezone.now() - outbox.CLAIM_TIMEOUT - timedelta(seconds=1))
+        self.assertEqual(outbox.flush(), 2)
+        self.assertEqual(outbox.flush(), 0)
+
+    def test_ending_soon_is_recorded_once(self):
+        soon = timezone.now() + timedelta(minutes=5)
+        Product.objects.filter(pk=self.auction.pk).update(auction_end=soon)
+
+        self.assertEqual(outbox.sweep_ending_soon(), 1)
+        self.assertEqual(outbox.sweep_ending_soon(), 0)
+        outbox.flush()
+
+        self.assertEqual(
+            Notification.objects.filter(kind=Notification.ENDING_SOON).count(), 30
+        )
+
+    def test_inbox_marks_read(self):
+        Notification.objects.create(user=self.alice, product=self.auction, kind="NEW_BID", message="hi")
+        self.client.force_login(self.alice)
+
+        response = self.client.get(reverse("notifications:inbox"))
+
+        self.assertContains(response, "<strong>hi</strong>", html=True)
+        self.assertIsNotNone(Notification.objects.get().read_at)
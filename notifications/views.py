@@ -0,0 +1,28 @@
+# notifications/views.py
+
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import render
+from django.utils import timezone
+
+from .models import Notification
+
+
+@login_required
+def inbox(request):
+    """
+    Latest notifications for the current user; showing them marks them read.
+    """
+    items = list(
+        Notification.objects
+        .filter(user=request.user)
+        .select_related("product")[:50]
+    )
+    unread = [n.pk for n in items if n.read_at is None]
+    if unread:
+        Notification.objects.filter(pk__in=unread).update(read_at=timezone.now())
+
+    return render(
+        request,
+        "notifications/inbox.html",
+        {"items": items, "unread": set(unread)},
+    )
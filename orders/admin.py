@@ -1,7 +1,18 @@
 from django.contrib import admin
-from django.contrib import admin
+
+from core.exports import export_csv, export_jsonl
 from .models import Order, OrderItem
-admin.site.register(Order)
-admin.site.register(OrderItem)
 
-# Register your models here.
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "total", "created_at")
+    list_select_related = ("user",)
+    actions = [export_csv, export_jsonl]
+
+
+@admin.register(OrderItem)
+class OrderItemAdmin(admin.ModelAdmin):
+    list_display = ("id", "order", "product", "quantity", "price")
+    list_select_related = ("product",)
+    actions = [export_csv, export_jsonl]
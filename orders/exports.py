@@ -0,0 +1,33 @@
+# orders/exports.py
+
+from core.exports import Dataset, register
+from .models import Order, OrderItem
+
+register(Dataset(
+    name="orders",
+    model=Order,
+    columns={
+        "id": "id",
+        "user": "user__username",
+        "total": "total",
+        "created_at": "created_at",
+    },
+    owner="user",
+))
+
+register(Dataset(
+    name="order-items",
+    model=OrderItem,
+    columns={
+        "id": "id",
+        "order_id": "order_id",
+        "product_id": "product_id",
+        "product_slug": "product__slug",
+        "product": "product__title",
+        "quantity": "quantity",
+        "price": "price",
+        "ordered_at": "order__created_at",
+    },
+    owner="order__user",
+    date_field="order__created_at",
+))
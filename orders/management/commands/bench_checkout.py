@@ -0,0 +1,105 @@
+import statistics
+import threading
+import time
+import uuid
+from queue import Empty, Queue
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections, connection
+
+from cart.models import CartItem
+from catalog.models import Category, Product
+from orders.models import Order, OrderItem
+from orders.services import OutOfStock, place_order
+
+
+class Command(BaseCommand):
+    help = 'Run concurrent checkouts against one hot SKU and check for overselling.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--buyers', type=int, default=200)
+        parser.add_argument('--stock', type=int, default=50)
+        parser.add_argument('--quantity', type=int, default=1)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--keep', action='store_true', help='Keep the generated rows.')
+
+    def handle(self, *args, **opts):
+        tag = uuid.uuid4().hex[:8]
+        category, _ = Category.objects.get_or_create(name='Benchmark', slug='benchmark')
+        product = Product.objects.create(
+            category=category, title=f'Hot SKU {tag}', slug=f'hot-sku-{tag}',
+            price=100, stock=opts['stock'],
+        )
+        User.objects.bulk_create([
+            User(username=f'bench-{tag}-{n}') for n in range(opts['buyers'])
+        ])
+        users = list(User.objects.filter(username__startswith=f'bench-{tag}-'))
+        CartItem.objects.bulk_create([
+            CartItem(user=u, product=product, quantity=opts['quantity']) for u in users
+        ])
+
+        queue = Queue()
+        for u in users:
+            queue.put(u)
+        results = {'ok': 0, 'out_of_stock': 0, 'errors': 0}
+        latencies = []
+        lock = threading.Lock()
+
+        def worker():
+            try:
+                while True:
+                    try:
+                        user = queue.get_nowait()
+                    except Empty:
+                        return
+                    started = time.perf_counter()
+                    items = list(CartItem.objects.select_related('product').filter(user=user))
+                    try:
+                        place_order(user, items)
+                        outcome = 'ok'
+                    except OutOfStock:
+                        outcome = 'out_of_stock'
+                    except OperationalError:
+                        outcome = 'errors'
+                    with lock:
+                        results[outcome] += 1
+                        latencies.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(opts['threads'])]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+        close_old_connections()
+
+        product.refresh_from_db()
+        sold = sum(OrderItem.objects.filter(product=product).values_list('quantity', flat=True))
+        oversold = max(sold - opts['stock'], 0)
+        latencies.sort()
+
+        self.stdout.write(
+            f"checkouts={len(latencies)} ok={results['ok']} "
+            f"out_of_stock={results['out_of_stock']} errors={results['errors']}"
+        )
+        self.stdout.write(
+            f'elapsed={elapsed:.2f}s throughput={len(latencies) / elapsed:.1f}/s '
+            f'p50={statistics.median(latencies) * 1000:.1f}ms '
+            f'p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms'
+        )
+        self.stdout.write(f"sold={sold} final_stock={product.stock} oversold={oversold}")
+
+        if not opts['keep']:
+            Order.objects.filter(user__in=users).delete()
+            CartItem.objects.filter(user__in=users).delete()
+            User.objects.filter(username__startswith=f'bench-{tag}-').delete()
+            product.delete()
+
+        if oversold or sold + product.stock != opts['stock']:
+            self.stderr.write(self.style.ERROR('Stock accounting is inconsistent!'))
+        else:
+            self.stdout.write(self.style.SUCCESS('No oversells.'))
@@ -0,0 +1,6 @@
+# orders/metrics.py
+
+from metrics.registry import counter
+
+ORDERS = counter("orders", "Orders placed through checkout.")
+CHECKOUT_FAILURES = counter("checkout_failures", "Checkouts that did not place an order.", ["reason"])
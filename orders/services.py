@@ -0,0 +1,89 @@
+# orders/services.py
+
+from django.db import transaction
+from django.db.models import F
+
+from cart.models import CartItem
+from catalog.models import Product, Reservation
+from .models import Order, OrderItem
+
+
+class OutOfStock(Exception):
+    """
+    Raised by place_order when one or more cart lines could not be fulfilled.
+    ``failed_lines`` holds the offending CartItem objects.
+    """
+
+    def __init__(self, failed_lines):
+        self.failed_lines = failed_lines
+        super().__init__(
+            "Not enough stock for: "
+            + ", ".join(str(i.product_id) for i in failed_lines)
+        )
+
+
+def place_order(user, items):
+    """
+    Turn cart lines into an order without overselling.
+
+    - Cart lines (with ``product`` selected) are read by the caller, so the
+      transaction starts with a write and holds locks for as short as possible.
+    - Lines backed by a cart reservation convert their hold: the units are
+      already set aside, so the stock UPDATE cannot fail under contention.
+    - Other lines take stock with a conditional UPDATE
+      (``stock - reserved >= qty``) so they never eat into someone's hold.
+    - Rows are touched in product-id order, so concurrent checkouts always
+      lock them in the same order.
+    - Any failed line rolls the whole order back and raises OutOfStock.
+    - Order items are written with one bulk_create.
+    """
+    lines = sorted(items, key=lambda i: i.product_id)
+    holds = {
+        h.product_id: h
+        for h in Reservation.objects.filter(
+            user=user, product_id__in=[i.product_id for i in lines]
+        )
+    }
+
+    with transaction.atomic():
+        failed = []
+        for item in lines:
+            held = 0
+            hold = holds.get(item.product_id)
+            # matching on quantity too: a hold extended since we read it is
+            # left alone and the line simply competes for free stock
+            if hold and Reservation.objects.filter(pk=hold.pk, quantity=hold.quantity).delete()[0]:
+                held = hold.quantity
+            needed = max(item.quantity - held, 0)
+
+            taken = (
+                Product.objects
+                .filter(
+                    pk=item.product_id,
+                    is_active=True,
+                    stock__gte=F("reserved") + needed,
+                )
+                .update(
+                    stock=F("stock") - item.quantity,
+                    reserved=F("reserved") - held,
+                )
+            )
+            if not taken:
+                failed.append(item)
+        if failed:
+            raise OutOfStock(failed)
+
+        total = sum(i.product.price * i.quantity for i in lines)
+        order = Order.objects.create(user=user, total=total)
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product_id=i.product_id,
+                quantity=i.quantity,
+                price=i.product.price,
+            )
+            for i in lines
+        ])
+        CartItem.objects.filter(pk__in=[i.pk for i in lines]).delete()
+
+    return order
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.mail import send_mail
+
+from jobs.queue import task
+from .models import Order
+
+
+@task()
+def send_receipt(order_id):
+    order = Order.objects.select_related('user').filter(pk=order_id).first()
+    if not order or not order.user.email:
+        return
+    lines = [
+        f'{i.product.title} × {i.quantity} — Rs. {i.price}'
+        for i in order.items.select_related('product')
+    ]
+    send_mail(
+        f'Your order #{order.pk}',
+        '\n'.join(lines + [f'Total: Rs. {order.total}']),
+        settings.DEFAULT_FROM_EMAIL,
+        [order.user.email],
+    )
@@ -1,3 +1,97 @@
-from django.test import TestCase
+import threading
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from cart.models import CartItem
+from catalog import inventory
+from catalog.models import Category, Product, Reservation
+from .models import Order, OrderItem
+from .services import OutOfStock, place_order
+
+
+def make_product(slug, stock, price=100):
+    category, _ = Category.objects.get_or_create(name="General", slug="general")
+    return Product.objects.create(category=category, title=slug, slug=slug, price=price, stock=stock)
+
+
+class CheckoutTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("buyer", password="pw")
+        cls.a = make_product("a", stock=5)
+        cls.b = make_product("b", stock=1)
+
+    def test_checkout_decrements_stock_and_clears_cart(self):
+        CartItem.objects.create(user=self.user, product=self.a, quantity=2)
+        CartItem.objects.create(user=self.user, product=self.b, quantity=1)
+        self.client.force_login(self.user)
+
+        response = self.client.post(reverse("orders:checkout"))
+
+        order = Order.objects.get(user=self.user)
+        self.assertRedirects(response, reverse("orders:order_success", args=[order.id]))
+        self.assertEqual(order.total, 300)
+        self.assertEqual(order.items.count(), 2)
+        self.assertEqual(Product.objects.get(pk=self.a.pk).stock, 3)
+        self.assertEqual(Product.objects.get(pk=self.b.pk).stock, 0)
+        self.assertFalse(CartItem.objects.filter(user=self.user).exists())
+
+    def test_failed_line_rolls_back_whole_order(self):
+        CartItem.objects.create(user=self.user, product=self.a, quantity=2)
+        CartItem.objects.create(user=self.user, product=self.b, quantity=3)
+        items = list(CartItem.objects.select_related("product").filter(user=self.user))
+
+        with self.assertRaises(OutOfStock) as ctx:
+            place_order(self.user, items)
+
+        self.assertEqual([i.product_id for i in ctx.exception.failed_lines], [self.b.pk])
+        self.assertEqual(Product.objects.get(pk=self.a.pk).stock, 5)
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(CartItem.objects.filter(user=self.user).count(), 2)
+
+    def test_held_lines_convert_and_free_lines_respect_holds(self):
+        other = User.objects.create_user("other")
+        inventory.reserve(other, self.b.pk)
+        CartItem.objects.create(user=other, product=self.b, quantity=1)
+        CartItem.objects.create(user=self.user, product=self.b, quantity=1)
+
+        # the only unit of b is held by "other"
+        items = list(CartItem.objects.select_related("product").filter(user=self.user))
+        with self.assertRaises(OutOfStock):
+            place_order(self.user, items)
+
+        items = list(CartItem.objects.select_related("product").filter(user=other))
+        place_order(other, items)
+
+        b = Product.objects.get(pk=self.b.pk)
+        self.assertEqual((b.stock, b.reserved), (0, 0))
+        self.assertFalse(Reservation.objects.exists())
+
+
+class ConcurrentCheckoutTests(TransactionTestCase):
+    def test_hot_sku_is_never_oversold(self):
+        product = make_product("hot", stock=3)
+        users = [User.objects.create_user(f"u{n}") for n in range(12)]
+        for u in users:
+            CartItem.objects.create(user=u, product=product, quantity=1)
+
+        def buy(user):
+            try:
+                items = list(CartItem.objects.select_related("product").filter(user=user))
+                place_order(user, items)
+            except OutOfStock:
+                pass
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=buy, args=(u,)) for u in users]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(OrderItem.objects.filter(product=product).count(), 3)
+        self.assertEqual(Product.objects.get(pk=product.pk).stock, 0)
@@ -1,24 +1,44 @@
 from django.shortcuts import render
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect, render, get_object_or_404
-from django.db import transaction
 from cart.models import CartItem
-from .models import Order, OrderItem
+from core.idempotency import idempotent
+from jobs.queue import enqueue
+from catalog.models import Product
+from .metrics import CHECKOUT_FAILURES, ORDERS
+from .models import Order
+from .services import OutOfStock, place_order
 
 @login_required
-@transaction.atomic
+@idempotent('checkout')
 def checkout(request):
     items = list(CartItem.objects.select_related('product').filter(user=request.user))
     if not items:
+        if request.method == 'POST':
+            CHECKOUT_FAILURES.inc(reason='empty_cart')
         return render(request, 'orders/checkout.html', {'empty': True})
     total = sum(i.product.price * i.quantity for i in items)
+    failed_ids = set()
     if request.method == 'POST':
-        order = Order.objects.create(user=request.user, total=total)
-        for i in items:
-            OrderItem.objects.create(order=order, product=i.product, quantity=i.quantity, price=i.product.price)
-        CartItem.objects.filter(user=request.user).delete()
-        return redirect('orders:order_success', order_id=order.id)
-    return render(request, 'orders/checkout.html', {'items': items, 'total': total})
+        try:
+            order = place_order(request.user, items)
+        except OutOfStock as exc:
+            CHECKOUT_FAILURES.inc(reason='out_of_stock')
+            failed_ids = {i.product_id for i in exc.failed_lines}
+            available = Product.objects.in_bulk(failed_ids)
+            for i in exc.failed_lines:
+                left = available[i.product_id].available if i.product_id in available else 0
+                messages.error(
+                    request,
+                    f'Only {left} of "{i.product.title}" left '
+                    f'(you asked for {i.quantity}).',
+                )
+        else:
+            ORDERS.inc()
+            enqueue('orders.send_receipt', {'order_id': order.id})
+            return redirect('orders:order_success', order_id=order.id)
+    return render(request, 'orders/checkout.html', {'items': items, 'total': total, 'failed_ids': failed_ids})
 
 @login_required
 def order_success(request, order_id):